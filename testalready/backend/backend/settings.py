@@ -38,12 +38,16 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'rest_framework.authtoken',
     'savedate',
     'corsheaders'
 ]
 
 
 MIDDLEWARE = [
+    'savedate.log.RequestIdMiddleware',
+    'savedate.tracing.TracingMiddleware',
+    'savedate.memory_profile.MemoryProfileMiddleware',
     'corsheaders.middleware.CorsMiddleware',                    
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -52,6 +56,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'savedate.routers.ReplicaRoutingMiddleware',
+    'savedate.slow_queries.SlowQueryViewMiddleware',
 ]
 
 
@@ -126,3 +132,281 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# REST framework
+# Browsers logged into the admin use their session; API clients send
+# "Authorization: Token <key>" with a key from POST /api/token/.
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.TokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+}
+
+
+# SaveDate events (Server-Sent Events)
+# "local" fans out within one process; "sqlite" shares events between worker
+# processes through SAVEDATE_EVENTS_DB.
+
+SAVEDATE_EVENTS_BROKER = 'local'
+
+SAVEDATE_EVENTS_DB = BASE_DIR / 'events.sqlite3'
+
+SAVEDATE_EVENTS_QUEUE_SIZE = 100
+
+SAVEDATE_EVENTS_HISTORY = 1000
+
+SAVEDATE_EVENTS_HEARTBEAT = 15
+
+
+# SaveDate change feed
+# The feed only serves changes older than this many seconds: updated_at is
+# set when a write starts, so a slow transaction can commit a change older
+# than the cursor a client already holds. Keep it above the longest write
+# transaction.
+
+SAVEDATE_FEED_SAFETY_LAG = 5
+
+# Tombstones of deleted and archived invitations are deleted after this many
+# days by `manage.py prune_tombstones`. A client whose feed cursor is older
+# is told to reset and read the feed from the start.
+SAVEDATE_TOMBSTONE_RETENTION_DAYS = 30
+
+
+# SaveDate archive
+# Invitations created longer ago than this are moved to the archive table by
+# `manage.py archive_savedates`.
+
+SAVEDATE_ARCHIVE_AFTER_DAYS = 180
+
+
+# SaveDate background tasks
+# Queued in the BackgroundTask table and run by a thread pool in each process
+# (or by `manage.py run_tasks`). EAGER runs them inline, e.g. for debugging.
+
+SAVEDATE_TASKS_EAGER = False
+
+SAVEDATE_TASKS_CONCURRENCY = 4
+
+SAVEDATE_TASKS_MAX_ATTEMPTS = 3
+
+SAVEDATE_TASKS_POLL_INTERVAL = 1.0
+
+SAVEDATE_TASKS_LEASE_SECONDS = 300
+
+# Finished tasks are deleted after this many days by `manage.py prune_tasks`.
+SAVEDATE_TASKS_KEEP_DONE_DAYS = 7
+
+SAVEDATE_TASKS_KEEP_FAILED_DAYS = 30
+
+
+# SaveDate read replicas
+# DATABASES aliases that serve reads of safe requests; writes always go to
+# "default". Replicas trailing the primary by more than MAX_LAG seconds are
+# skipped, and a client is pinned to the primary for PIN_SECONDS after a write.
+# Locally, SQLite copies refreshed by `manage.py sync_replicas` stand in, e.g.:
+#
+# DATABASES['replica'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': BASE_DIR / 'replica.sqlite3',
+#     'TEST': {'MIRROR': 'default'},
+# }
+# SAVEDATE_DB_REPLICAS = ['replica']
+
+DATABASE_ROUTERS = ['savedate.sharding.ShardRouter', 'savedate.routers.PrimaryReplicaRouter']
+
+SAVEDATE_DB_REPLICAS = []
+
+SAVEDATE_DB_REPLICA_MAX_LAG = 10
+
+SAVEDATE_DB_REPLICA_CHECK_INTERVAL = 5
+
+SAVEDATE_DB_PIN_SECONDS = 15
+
+# Cache holding the per-user pins. It must be shared by every worker process,
+# which the local-memory "default" cache is not. The file cache below is
+# shared on one host; use Redis or Memcached when workers run on several.
+# (Not a database cache: its reads would be routed to the replicas.)
+SAVEDATE_DB_PIN_CACHE = 'savedate_pins'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'savedate_pins': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'pin_cache',
+    },
+}
+
+
+# SaveDate shards
+# DATABASES aliases, starting with "default", that SaveDate rows are spread
+# over by a hash of their id; each shard also holds the stats and tasks
+# written with its rows. Run `manage.py migrate --database <alias>` for each.
+
+SAVEDATE_SHARDS = ['default']
+
+
+# SaveDate view counts
+# Views of an invitation are added up in memory by each worker and flushed to
+# the ViewCount table in one batch every this many seconds; a crashed worker
+# loses at most one interval of views. None turns view counting off.
+
+SAVEDATE_VIEW_FLUSH_INTERVAL = 5
+
+
+# SaveDate database maintenance
+# Every this many seconds each process refreshes the planner statistics and
+# frees unused pages of the SQLite databases (see savedate/maintenance.py),
+# waiting until no request has finished for SAVEDATE_MAINTENANCE_IDLE_SECONDS.
+# None leaves it to `manage.py maintain_db`, e.g. from cron.
+
+SAVEDATE_MAINTENANCE_INTERVAL = None
+
+SAVEDATE_MAINTENANCE_IDLE_SECONDS = 60
+
+
+# SaveDate static snapshots
+# Directory where each invitation is also written as <id>.html and <id>.json,
+# by a background task after every create or update, so a file server or
+# reverse proxy can serve guests without Django. None turns snapshots off.
+
+SAVEDATE_SNAPSHOT_DIR = None
+
+
+# SaveDate pre-forking server
+# Seconds a connection to `manage.py serve` may sit idle (or send its request
+# that slowly) before its worker drops it; --timeout overrides it.
+
+SAVEDATE_SERVE_TIMEOUT = 30
+
+
+# SaveDate slow-query log
+# Statements slower than this many milliseconds are logged with their query
+# plan to slow_queries.log (rotated at 10 MB, 5 files kept). None disables it.
+
+SAVEDATE_SLOW_QUERY_MS = 100
+
+
+# SaveDate request tracing
+# Fraction of requests traced (requests with a sampled W3C traceparent header
+# always are); spans go to traces.jsonl. None disables tracing entirely.
+
+SAVEDATE_TRACE_SAMPLE_RATE = 0.0
+
+
+# SaveDate memory profiling
+# Fraction of requests run under tracemalloc; requests whose X-Memory-Profile
+# header equals SAVEDATE_MEMORY_PROFILE_KEY (if set) always are. Peaks and top
+# allocation sites per stage go to memory_profiles.jsonl. None disables it.
+
+SAVEDATE_MEMORY_PROFILE_RATE = None
+
+SAVEDATE_MEMORY_PROFILE_KEY = ''
+
+
+# Logging
+# Loggers only write to in-memory queues; background listener threads do the
+# file I/O. A full queue drops records instead of blocking the request.
+# Records are JSON lines carrying the X-Request-ID of their request.
+
+SAVEDATE_LOG_QUEUE_SIZE = 10000
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'savedate.log.JsonFormatter'},
+        'slow_query': {'format': '%(asctime)s %(message)s'},
+        'message': {'format': '%(message)s'},
+    },
+    # Queue handlers reference their targets by name, so the targets' names
+    # must sort first.
+    'handlers': {
+        'json_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'savedate.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'json',
+        },
+        'queue': {
+            '()': 'savedate.log.QueueListenerHandler',
+            'handlers': ['cfg://handlers.json_file'],
+            'queue_size': SAVEDATE_LOG_QUEUE_SIZE,
+        },
+        'slow_queries_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'slow_queries.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'slow_query',
+        },
+        'slow_queries_queue': {
+            '()': 'savedate.log.QueueListenerHandler',
+            'handlers': ['cfg://handlers.slow_queries_file'],
+            'queue_size': SAVEDATE_LOG_QUEUE_SIZE,
+        },
+        'traces_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'traces.jsonl',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'message',
+        },
+        'traces_queue': {
+            '()': 'savedate.log.QueueListenerHandler',
+            'handlers': ['cfg://handlers.traces_file'],
+            'queue_size': SAVEDATE_LOG_QUEUE_SIZE,
+        },
+        'memory_profiles_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'memory_profiles.jsonl',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'message',
+        },
+        'memory_profiles_queue': {
+            '()': 'savedate.log.QueueListenerHandler',
+            'handlers': ['cfg://handlers.memory_profiles_file'],
+            'queue_size': SAVEDATE_LOG_QUEUE_SIZE,
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'savedate': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'savedate.slow_queries': {
+            'handlers': ['slow_queries_queue'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'savedate.tracing': {
+            'handlers': ['traces_queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'savedate.memory_profile': {
+            'handlers': ['memory_profiles_queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,44 @@
+"""
+API-only settings profile for pods that serve nothing but ``/api/``.
+
+Select it with ``DJANGO_SETTINGS_MODULE=backend.settings_api``. Compared to
+``backend.settings`` it drops the admin, sessions, messages, static files and
+template machinery, and runs only the middleware the JSON API needs. Those
+apps are neither installed, routed nor checked. DRF itself still imports a few
+admin and messages modules, but the session machinery is never loaded.
+
+Measure the difference with ``python benchmarks/settings_profiles.py``.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'django.contrib.contenttypes',
+    'django.contrib.auth',
+    'rest_framework.authtoken',
+    'savedate',
+    'corsheaders',
+]
+
+MIDDLEWARE = [
+    'savedate.log.RequestIdMiddleware',
+    'savedate.tracing.TracingMiddleware',
+    'savedate.memory_profile.MemoryProfileMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'savedate.routers.ReplicaRoutingMiddleware',
+    'savedate.slow_queries.SlowQueryViewMiddleware',
+]
+
+ROOT_URLCONF = 'backend.urls_api'
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['rest_framework.parsers.JSONParser'],
+    # Session authentication needs the session middleware this profile drops.
+    'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework.authentication.TokenAuthentication'],
+    'UNAUTHENTICATED_USER': None,
+}
@@ -17,7 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include  
 
+from savedate.views import save_date_page
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('savedate.urls')), 
+    path('i/<uuid:pk>', save_date_page, name='save-date-page'),
 ]
@@ -0,0 +1,10 @@
+"""
+URL configuration for the API-only settings profile (``backend.settings_api``).
+
+Same API routes as ``backend.urls`` without the admin.
+"""
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/', include('savedate.urls')),
+]
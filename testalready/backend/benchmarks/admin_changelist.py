@@ -0,0 +1,63 @@
+"""
+Query count and latency of the SaveDate admin changelist at scale.
+
+    python benchmarks/admin_changelist.py --rows 1000000
+
+Seeds a scratch SQLite database, runs ANALYZE, then requests the changelist
+unfiltered, searched by city, filtered by date and on a deep page. Pass --db to reuse a seeded file.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import migrate, seed, setup_django, timed  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", help="Reuse this SQLite file instead of a temporary one.")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    setup_django(db_path, ALLOWED_HOSTS=["*"], DEBUG=False)
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from savedate.models import SaveDate
+
+    migrate()
+    existing = SaveDate.objects.count()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing:,} rows into {db_path}")
+        seed(args.rows - existing)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    user, _ = get_user_model().objects.get_or_create(username="bench", defaults={"is_staff": True, "is_superuser": True})
+    client = Client()
+    client.force_login(user)
+    url = "/admin/savedate/savedate/"
+
+    cases = [
+        ("unfiltered", {}),
+        ("search city", {"q": "Recife"}),
+        ("search id", {"q": str(SaveDate.objects.values_list("pk", flat=True).first())}),
+        ("date filter", {"created_at__gte": "2000-01-01 00:00:00+00:00"}),
+        ("page 50", {"p": "50"}),
+    ]
+    print(f"\n{'case':<16}{'queries':>8}{'best ms':>10}")
+    for name, params in cases:
+        with CaptureQueriesContext(connection) as queries:
+            best, response = timed(lambda: client.get(url, params), repeat=3)
+        assert response.status_code == 200, response.status_code
+        print(f"{name:<16}{len(queries) // 3:>8}{best * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
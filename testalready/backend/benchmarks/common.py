@@ -0,0 +1,76 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Every benchmark runs against a scratch SQLite file, never ``db.sqlite3``.
+"""
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CITIES = [
+    "São Paulo", "Rio de Janeiro", "Belo Horizonte", "Recife", "Salvador",
+    "Fortaleza", "Curitiba", "Porto Alegre", "Manaus", "Belém",
+    "Goiânia", "Campinas", "Natal", "Florianópolis", "Vitória",
+]
+
+
+def setup_django(db_path, settings_module="backend.settings", **overrides):
+    """Configure Django against ``db_path`` and apply ``overrides`` to settings."""
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = str(db_path)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+
+def migrate(database="default"):
+    from django.core.management import call_command
+    call_command("migrate", database=database, verbosity=0)
+
+
+def make_save_date(i):
+    from savedate.models import SaveDate
+    return SaveDate(
+        id=uuid.uuid4(),
+        title=f"Evento {i}",
+        event_subtitle="Uma celebração de amor",
+        event_summary="Venha celebrar conosco este momento especial " * 4,
+        event_times=[{"label": "Cerimônia", "time": "14:00"}, {"label": "Festa", "time": "20:00"}],
+        event_venue="Salão de Festas",
+        event_address=f"Rua das Flores, {i}",
+        event_city=CITIES[i % len(CITIES)],
+    )
+
+
+def seed(rows, batch_size=5000, using="default", report=True):
+    """Bulk insert ``rows`` invitations (no signals, so no stats or tasks)."""
+    from django.db import transaction
+    from savedate.models import SaveDate
+
+    started = time.perf_counter()
+    for start in range(0, rows, batch_size):
+        with transaction.atomic(using=using):
+            SaveDate.objects.using(using).bulk_create(
+                [make_save_date(i) for i in range(start, min(start + batch_size, rows))]
+            )
+        if report and (start // batch_size) % 20 == 0:
+            print(f"  seeded {min(start + batch_size, rows):,}/{rows:,}", flush=True)
+    return time.perf_counter() - started
+
+
+def timed(func, repeat=5):
+    """Run ``func`` ``repeat`` times; return (best seconds, last result)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
@@ -0,0 +1,85 @@
+"""
+Serializer versus pre-rendered JSON for SaveDate reads.
+
+    python benchmarks/rendered_reads.py --rows 1000
+
+Seeds a scratch SQLite database and, for the list and for a single invitation,
+times building the JSON body by running ``SaveDateReadSerializer`` and
+``JSONRenderer`` over full rows against joining the stored ``rendered_json``,
+then the same two endpoints end to end. Both bodies are checked to be equal.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import migrate, seed, setup_django, timed  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", help="Reuse this SQLite file instead of a temporary one.")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    setup_django(db_path, ALLOWED_HOSTS=["*"], DEBUG=False, SAVEDATE_VIEW_FLUSH_INTERVAL=None)
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from rest_framework.renderers import JSONRenderer
+    from savedate.models import SaveDate
+    from savedate.rendering import render_list
+    from savedate.serializers import SaveDateReadSerializer
+
+    migrate()
+    existing = SaveDate.objects.count()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing:,} rows into {db_path}")
+        seed(args.rows - existing)
+
+    # The seeded rows have no owner; give them one so the list endpoint shows them.
+    user, _ = get_user_model().objects.get_or_create(username="bench")
+    SaveDate.objects.filter(owner=None).update(owner=user)
+
+    ordering = ("-created_at", "-id")
+    rows = SaveDate.objects.order_by(*ordering)
+    one = rows.first().pk
+
+    def serialized_list():
+        return JSONRenderer().render(SaveDateReadSerializer(rows.all(), many=True).data)
+
+    def rendered_list():
+        return render_list(rows.values_list("rendered_json", flat=True)).encode()
+
+    def serialized_one():
+        return JSONRenderer().render(SaveDateReadSerializer(SaveDate.objects.get(pk=one)).data)
+
+    def rendered_one():
+        return SaveDate.objects.values_list("rendered_json", flat=True).get(pk=one).encode()
+
+    assert serialized_list() == rendered_list(), "stored JSON differs from the serializer's"
+    assert serialized_one() == rendered_one(), "stored JSON differs from the serializer's"
+
+    client = Client()
+    client.force_login(user)
+    cases = [
+        ("list serializer", serialized_list),
+        ("list rendered", rendered_list),
+        ("detail serializer", serialized_one),
+        ("detail rendered", rendered_one),
+        ("GET list", lambda: client.get("/api/save-date/")),
+        ("GET detail", lambda: client.get(f"/api/save-date/{one}/")),
+    ]
+    print(f"\n{args.rows:,} rows")
+    print(f"{'case':<20}{'best ms':>10}")
+    for name, func in cases:
+        best, _ = timed(func, repeat=args.repeat)
+        print(f"{name:<20}{best * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
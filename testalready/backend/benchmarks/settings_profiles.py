@@ -0,0 +1,116 @@
+"""
+Cold start and per-request overhead of the full and API-only settings profiles.
+
+    python benchmarks/settings_profiles.py [--starts 10] [--requests 2000]
+
+Cold start: wall time of fresh interpreters that import ``backend.wsgi``.
+Per request: mean time through the WSGI application, all middleware included,
+of ``GET /api/save-date/changes/?limit=0`` (rejected before touching the
+database, so mostly middleware and framework cost) and of ``?limit=1`` against
+an empty scratch database.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = ["backend.settings", "backend.settings_api"]
+
+
+def child(settings_module, db_path, requests):
+    """Runs in a fresh interpreter; prints one JSON line of measurements."""
+    started = time.perf_counter()
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    from django.conf import settings
+    settings.DATABASES["default"]["NAME"] = db_path
+    import backend.wsgi
+    import_seconds = time.perf_counter() - started
+
+    from io import BytesIO
+    from wsgiref.util import setup_testing_defaults
+
+    def request(query):
+        environ = {"PATH_INFO": "/api/save-date/changes/", "QUERY_STRING": query, "wsgi.input": BytesIO()}
+        setup_testing_defaults(environ)
+        body = backend.wsgi.application(environ, lambda status, headers: None)
+        b"".join(body)
+        body.close()
+
+    def per_request_us(query):
+        for _ in range(50):
+            request(query)
+        started = time.perf_counter()
+        for _ in range(requests):
+            request(query)
+        return (time.perf_counter() - started) / requests * 1e6
+
+    print(json.dumps({
+        "import_ms": import_seconds * 1000,
+        # limit=0 is rejected before any query: framework + middleware cost only.
+        "probe_us": per_request_us("limit=0"),
+        "request_us": per_request_us("limit=1"),
+        "middleware": len(settings.MIDDLEWARE),
+        "modules": len(sys.modules),
+    }))
+
+
+def run_child(settings_module, db_path, requests):
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", settings_module, "--db", db_path, "--requests", str(requests)],
+        check=True, capture_output=True, text=True, cwd=BACKEND_DIR,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--starts", type=int, default=10, help="Fresh interpreters per profile.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests timed per interpreter.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.db, args.requests)
+        return
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    subprocess.run(
+        [sys.executable, "-c",
+         "import os, sys, django; sys.path.insert(0, '.');"
+         "os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings';"
+         "from django.conf import settings;"
+         f"settings.DATABASES['default']['NAME'] = {db_path!r};"
+         "django.setup();"
+         "from django.core.management import call_command; call_command('migrate', verbosity=0)"],
+        check=True, cwd=BACKEND_DIR,
+    )
+
+    print(f"{'profile':<24}{'middleware':>11}{'modules':>9}{'import ms':>11}{'process ms':>12}"
+          f"{'probe us':>10}{'request us':>12}")
+    results = {profile: [] for profile in PROFILES}
+    for _ in range(args.starts):
+        # Interleaved so machine-wide drift affects both profiles alike.
+        for profile in PROFILES:
+            results[profile].append(run_child(profile, db_path, args.requests))
+    for profile, runs in results.items():
+        print(
+            f"{profile:<24}{runs[0]['middleware']:>11}{runs[0]['modules']:>9}"
+            f"{statistics.median(r['import_ms'] for r in runs):>11.1f}"
+            f"{statistics.median(r['process_ms'] for r in runs):>12.1f}"
+            f"{statistics.median(r['probe_us'] for r in runs):>10.1f}"
+            f"{statistics.median(r['request_us'] for r in runs):>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
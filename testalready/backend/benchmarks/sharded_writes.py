@@ -0,0 +1,118 @@
+"""
+Create throughput of the SaveDate API as the number of SQLite shards grows.
+
+    python benchmarks/sharded_writes.py [--shards 1 2 4 8] [--processes 8] [--seconds 10]
+
+For each shard count, fresh SQLite files are migrated and ``--processes``
+worker processes POST invitations through the full create view (row, city
+stats and audit task in one transaction on the row's shard) for
+``--seconds``. Reports committed creates per second and lock errors.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import CITIES  # noqa: E402
+
+
+def databases(directory, shards):
+    return {
+        "default" if i == 0 else f"shard{i}": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(directory, f"shard{i}.sqlite3"),
+            "OPTIONS": {"timeout": 30},
+        }
+        for i in range(shards)
+    }
+
+
+def setup(directory, shards):
+    from benchmarks.common import setup_django
+
+    dbs = databases(directory, shards)
+    setup_django(
+        dbs["default"]["NAME"], DATABASES=dbs, SAVEDATE_SHARDS=list(dbs), ALLOWED_HOSTS=["*"], DEBUG=False
+    )
+    return list(dbs)
+
+
+def writer(directory, shards, start_at, seconds, worker):
+    """Runs in a spawned process: POST invitations until the deadline."""
+    setup(directory, shards)
+    from django.contrib.auth import get_user_model
+    from django.db import DatabaseError
+    from django.test import Client
+    from rest_framework.authtoken.models import Token
+    from savedate import tasks
+
+    # Leave the queued audit tasks in the tables; do not run them here.
+    tasks._runner = tasks.TaskRunner()
+    user, _ = get_user_model().objects.get_or_create(username=f"bench-{worker}")
+    token, _ = Token.objects.get_or_create(user=user)
+    client = Client(HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Token {token.key}")
+    created = errors = i = 0
+    time.sleep(max(start_at - time.time(), 0))
+    deadline = start_at + seconds
+    while time.time() < deadline:
+        i += 1
+        try:
+            response = client.post("/api/save-date/", {
+                "title": f"Evento {worker}-{i}",
+                "event_summary": "Venha celebrar conosco este momento especial",
+                "event_times": [{"label": "Cerimônia", "time": "14:00"}],
+                "event_venue": "Salão de Festas",
+                "event_address": f"Rua das Flores, {i}",
+                "event_city": CITIES[i % len(CITIES)],
+            }, content_type="application/json")
+        except DatabaseError:
+            errors += 1
+            continue
+        if response.status_code == 201:
+            created += 1
+        else:
+            errors += 1
+    return created, errors
+
+
+def run(shards, processes, seconds):
+    directory = tempfile.mkdtemp()
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        pool.apply(migrate_all, (directory, shards))
+    start_at = time.time() + 3  # Time for every worker to import Django.
+    with context.Pool(processes) as pool:
+        results = pool.starmap(writer, [(directory, shards, start_at, seconds, w) for w in range(processes)])
+    created = sum(c for c, _ in results)
+    errors = sum(e for _, e in results)
+    return created / seconds, errors
+
+
+def migrate_all(directory, shards):
+    from django.core.management import call_command
+
+    for alias in setup(directory, shards):
+        call_command("migrate", database=alias, verbosity=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--processes", type=int, default=8, help="Concurrent writer processes.")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{'shards':>7}{'creates/s':>12}{'speedup':>9}{'errors':>8}")
+    baseline = None
+    for shards in args.shards:
+        rate, errors = run(shards, args.processes, args.seconds)
+        baseline = baseline or rate
+        print(f"{shards:>7}{rate:>12.0f}{rate / baseline:>9.2f}{errors:>8}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
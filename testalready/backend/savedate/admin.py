@@ -1,3 +1,194 @@
-from django.contrib import admin
+import uuid
 
-# Register your models here.
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ALL_VAR, ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import HttpResponseRedirect
+from django.utils.functional import cached_property
+
+from . import updates
+from .models import SaveDate, normalize_key
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def estimate_row_count(model, using):
+    """
+    Cheap row-count estimate for ``model``'s table, or None if unavailable.
+
+    SQLite: the row count ANALYZE stored in ``sqlite_stat1``, falling back to
+    ``MAX(rowid)`` (one index probe; over-counts after deletes).
+    PostgreSQL: the planner's ``reltuples``.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            try:
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+                row = cursor.fetchone()
+            except Exception:
+                row = None
+            if row and row[0]:
+                return int(row[0].split()[0])
+            cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")
+            return cursor.fetchone()[0] or 0
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return row[0]
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never counts a large table exactly.
+
+    Unfiltered lists use :func:`estimate_row_count`; filtered lists count at
+    most ``count_limit`` rows, so the last page number is approximate on very
+    large result sets but the changelist stays fast.
+    """
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None:
+                return estimate
+        return queryset[:self.count_limit].count()
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist that pages by keyset on the default ``(-created_at, -id)``
+    ordering: the next page starts after the last row shown (``?after=``),
+    so deep pages cost the same as the first one instead of an ever larger
+    OFFSET. Sorting by a column, or "Show all", falls back to numbered pages.
+    """
+    cursor_var = "after"
+
+    def __init__(self, request, *args, **kwargs):
+        self.keyset = ORDER_VAR not in request.GET and ALL_VAR not in request.GET
+        self.cursor = request.GET.get(self.cursor_var) if self.keyset else None
+        self.next_page_url = None
+        super().__init__(request, *args, **kwargs)
+        self.first_page_url = self.get_query_string()
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(self.cursor_var, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Changing the filters, search or ordering starts from the first page.
+        return super().get_query_string(new_params, [*(remove or []), self.cursor_var])
+
+    def get_results(self, request):
+        if not self.keyset:
+            return super().get_results(request)
+        queryset = self.queryset
+        if self.cursor:
+            try:
+                created_at, pk = decode_cursor(self.cursor)
+            except InvalidCursor as exc:
+                raise IncorrectLookupParameters(exc) from exc
+            self.queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+        self.page_num = 1
+        super().get_results(request)
+        # Actions such as "select all" still act on every matching row.
+        self.queryset = queryset
+
+        rows = list(self.result_list)
+        if self.multi_page and len(rows) == self.list_per_page:
+            last = rows[-1]
+            self.next_page_url = self.get_query_string(
+                {self.cursor_var: encode_cursor(last.created_at, last.pk)}
+            )
+
+
+class SaveDateAdminForm(forms.ModelForm):
+    """
+    The change form, carrying the version it was opened at so an edit never
+    overwrites a change made in the meantime.
+    """
+    expected_version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["expected_version"].initial = self.instance.version
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.instance.pk and cleaned_data.get("expected_version") != self.instance.version:
+            raise forms.ValidationError(
+                "This invitation was changed by someone else after you opened it. "
+                "Reload the page and make your changes again."
+            )
+        return cleaned_data
+
+
+@admin.register(SaveDate)
+class SaveDateAdmin(admin.ModelAdmin):
+    form = SaveDateAdminForm
+    list_display = ("title", "event_city", "event_venue", "created_at", "version")
+    list_filter = ("created_at",)
+    search_fields = ("event_city",)
+    search_help_text = "City name (case and accents are ignored) or invitation id."
+    ordering = ("-created_at", "-id")
+    readonly_fields = ("id", "created_at", "updated_at", "version")
+    # A plain id input instead of a <select> listing every user.
+    raw_id_fields = ("owner",)
+    list_per_page = 100
+    paginator = EstimatedCountPaginator
+    # Skips the second, unfiltered COUNT(*) the changelist would run.
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith("_changelist"):
+            # The large columns are not displayed in the list.
+            queryset = queryset.defer("event_summary", "event_times")
+        return queryset
+
+    def save_model(self, request, obj, form, change):
+        """
+        Edits go through the API's versioned update (``savedate.updates``):
+        they bump the version, move the city stats and refresh the snapshot.
+        New invitations are saved normally.
+        """
+        if not change:
+            return super().save_model(request, obj, form, change)
+        changes = {name: form.cleaned_data[name] for name in form.changed_data if name != "expected_version"}
+        if not changes:
+            return
+        obj.update_conflict = updates.update(obj.pk, changes, form.cleaned_data["expected_version"]) is None
+
+    def response_change(self, request, obj):
+        if getattr(obj, "update_conflict", False):
+            self.message_user(
+                request, "This invitation was changed by someone else; nothing was saved.", messages.ERROR
+            )
+            return HttpResponseRedirect(request.path)
+        return super().response_change(request, obj)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Only index-backed lookups: an id, or a city matched through
+        ``city_key``. The default ``icontains`` search would scan the whole table.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        try:
+            return queryset.filter(pk=uuid.UUID(search_term)), False
+        except ValueError:
+            return queryset.filter(city_key=normalize_key(search_term)), False
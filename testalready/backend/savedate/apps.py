@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class SavedateConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'savedate'
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from django.db.backends.signals import connection_created
+
+        from . import maintenance, signals, slow_queries, tracing  # noqa: F401
+
+        connection_created.connect(slow_queries.install, dispatch_uid="savedate.slow_queries")
+        connection_created.connect(tracing.install, dispatch_uid="savedate.tracing")
+        request_finished.connect(maintenance.request_finished, dispatch_uid="savedate.maintenance")
@@ -0,0 +1,246 @@
+"""
+Fan-out of SaveDate events to Server-Sent Events subscribers.
+
+Every process owns one :class:`EventHub`. Subscribers are cheap: an idle SSE
+connection is a bounded ``asyncio.Queue`` registered in the hub, with no thread
+or polling of its own. Publishing goes through a broker:
+
+- ``LocalBroker`` hands events straight to the hub (single process).
+- ``SQLiteBroker`` appends events to a shared SQLite file and runs one poller
+  thread per process that feeds new rows into the local hub. It stands in for
+  a real broker when several worker processes serve the stream.
+
+Events carry the id of the user whose invitation they describe, and a
+subscription only receives its own user's events (plus control events such
+as ``reset``, which have no owner).
+
+A subscriber that falls ``SAVEDATE_EVENTS_QUEUE_SIZE`` events behind is
+disconnected instead of buffering without limit; it reconnects with
+``Last-Event-ID`` and catches up from the hub's recent history.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from collections import deque, namedtuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+Event = namedtuple("Event", ["id", "type", "data", "owner"], defaults=[None])
+
+# Queued to a subscriber that overflowed; its stream ends and the client reconnects.
+OVERFLOW = object()
+
+
+def format_sse(event):
+    return f"id: {event.id}\nevent: {event.type}\ndata: {event.data}\n\n"
+
+
+class Subscription:
+    def __init__(self, hub, backlog, maxsize, owner=None):
+        self.hub = hub
+        self.owner = owner
+        self.loop = asyncio.get_running_loop()
+        self.backlog = deque(backlog)
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _deliver(self, event):
+        # Runs on the subscriber's event loop.
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self):
+        """Return the next event, or ``OVERFLOW`` when the consumer fell behind."""
+        if self.backlog:
+            return self.backlog.popleft()
+        return await self.queue.get()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def wants(self, event):
+        return event.owner in (None, self.owner)
+
+
+class EventHub:
+    def __init__(self, history=1000, queue_size=100):
+        self.queue_size = queue_size
+        self.history = deque(maxlen=history)
+        self.subscribers = set()
+        self.last_id = 0
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, data, event_id=None, owner=None):
+        """Record an event and schedule its delivery to its subscribers. Thread-safe."""
+        with self._lock:
+            if event_id is None:
+                event_id = self.last_id + 1
+            elif event_id <= self.last_id:
+                return None
+            self.last_id = event_id
+            event = Event(event_id, event_type, data, owner)
+            self.history.append(event)
+            for subscription in self.subscribers:
+                if not subscription.wants(event):
+                    continue
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+                except RuntimeError:
+                    # The subscriber's loop is closed; it is dropped on close().
+                    pass
+        return event
+
+    def subscribe(self, last_event_id=None, owner=None):
+        """
+        Register a subscriber to ``owner``'s events on the running event loop.
+
+        With ``last_event_id`` the subscription first replays the events
+        published after it. If those events already fell out of the history,
+        the replay starts with a ``reset`` event telling the client to reload.
+        """
+        with self._lock:
+            backlog = []
+            if last_event_id is not None and last_event_id < self.last_id:
+                oldest = self.history[0].id if self.history else self.last_id + 1
+                if last_event_id < oldest - 1:
+                    backlog.append(Event(self.last_id, "reset", "{}"))
+                backlog.extend(
+                    event for event in self.history
+                    if event.id > last_event_id and event.owner in (None, owner)
+                )
+            subscription = Subscription(self, backlog, self.queue_size, owner)
+            self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self.subscribers.discard(subscription)
+
+
+class LocalBroker:
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, event_type, data, owner=None):
+        self.hub.publish(event_type, data, owner=owner)
+
+    def subscribe(self, last_event_id=None, owner=None):
+        return self.hub.subscribe(last_event_id, owner)
+
+
+class SQLiteBroker:
+    def __init__(self, hub, path, poll_interval=0.5, retain=10000):
+        self.hub = hub
+        self.path = str(path)
+        self.poll_interval = poll_interval
+        self.retain = retain
+        self._poller = None
+        self._stopped = threading.Event()
+        self._loaded = threading.Event()
+        self._lock = threading.Lock()
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL, data TEXT NOT NULL, owner INTEGER)"
+            )
+            # Event logs created before events carried their owner.
+            if "owner" not in {row[1] for row in conn.execute("PRAGMA table_info(events)")}:
+                conn.execute("ALTER TABLE events ADD COLUMN owner INTEGER")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def publish(self, event_type, data, owner=None):
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO events (type, data, owner) VALUES (?, ?, ?)", (event_type, data, owner)
+                )
+                if cursor.lastrowid % 1000 == 0:
+                    conn.execute("DELETE FROM events WHERE id <= ?", (cursor.lastrowid - self.retain,))
+        finally:
+            conn.close()
+
+    def subscribe(self, last_event_id=None, owner=None):
+        self._ensure_poller()
+        return self.hub.subscribe(last_event_id, owner)
+
+    def _ensure_poller(self):
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="savedate-events-poller", daemon=True)
+                self._poller.start()
+        # Wait for the initial history load so replays are complete.
+        self._loaded.wait(timeout=5)
+
+    def _poll(self):
+        conn = self._connect()
+        try:
+            (max_id,) = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()
+            last_id = max(max_id - self.hub.history.maxlen, 0)
+            while not self._stopped.is_set():
+                try:
+                    rows = conn.execute(
+                        "SELECT id, type, data, owner FROM events WHERE id > ? ORDER BY id LIMIT 500", (last_id,)
+                    ).fetchall()
+                except sqlite3.Error:
+                    logger.exception("Failed to poll the SaveDate event log")
+                    rows = []
+                for event_id, event_type, data, owner in rows:
+                    self.hub.publish(event_type, data, event_id=event_id, owner=owner)
+                    last_id = event_id
+                self._loaded.set()
+                if len(rows) < 500:
+                    self._stopped.wait(self.poll_interval)
+        finally:
+            conn.close()
+
+    def close(self):
+        self._stopped.set()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            hub = EventHub(
+                history=getattr(settings, "SAVEDATE_EVENTS_HISTORY", 1000),
+                queue_size=getattr(settings, "SAVEDATE_EVENTS_QUEUE_SIZE", 100),
+            )
+            if getattr(settings, "SAVEDATE_EVENTS_BROKER", "local") == "sqlite":
+                _broker = SQLiteBroker(
+                    hub,
+                    settings.SAVEDATE_EVENTS_DB,
+                    poll_interval=getattr(settings, "SAVEDATE_EVENTS_POLL_INTERVAL", 0.5),
+                )
+            else:
+                _broker = LocalBroker(hub)
+        return _broker
+
+
+def publish_created(data, owner):
+    """Publish ``owner``'s ``savedate.created`` event carrying the serialized invitation."""
+    try:
+        get_broker().publish("savedate.created", json.dumps(data, separators=(",", ":"), default=str), owner)
+    except Exception:
+        logger.exception("Failed to publish savedate.created event")
@@ -0,0 +1,188 @@
+"""
+Non-blocking, structured logging.
+
+``QueueListenerHandler`` is the only handler loggers write to: it tags each
+record with the current request id and puts it on a bounded in-memory queue,
+and a background ``QueueListener`` thread passes it on to the real (file)
+handlers. A request never waits on log I/O; when the queue is full the record
+is dropped and counted, and the listener later logs how many were lost.
+
+``JsonFormatter`` writes one JSON object per line, including the request id
+and any ``extra`` fields. ``RequestIdMiddleware`` assigns the id (or accepts
+a sane ``X-Request-ID`` from the proxy) and returns it in the response.
+"""
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_request_id = contextvars.ContextVar("savedate_request_id", default=None)
+
+# Attributes every LogRecord has; anything else came from ``extra``.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Copy the current request id onto the record, in the logging thread."""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            # django.request logs after the middleware returned, but passes the request.
+            request = getattr(record, "request", None)
+            record.request_id = getattr(request, "request_id", None) or _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _warn(msg, *args):
+    # Straight to stderr: the queue is not drained any more and the targets
+    # may be the ones that are stuck.
+    logging.lastResort.handle(logging.makeLogRecord({
+        "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING", "msg": msg, "args": args,
+    }))
+
+
+class _Listener(QueueListener):
+    def stop(self, timeout=5):
+        # Wait for room: a full queue must not lose the stop signal, but a
+        # stalled target must not hang the process at exit either.
+        try:
+            self.queue.put(self._sentinel, timeout=timeout)
+        except queue.Full:
+            _warn("Logging queue still full after %ss; the queued log records are lost", timeout)
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            _warn("Log handlers still busy after %ss; the queued log records are lost", timeout)
+        self._thread = None
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Queue records for ``handlers``, which run on a background thread.
+
+    Configured from ``LOGGING`` with ``'()': 'savedate.log.QueueListenerHandler'``
+    and ``'handlers': ['cfg://handlers.<name>', ...]``; the referenced handlers
+    must sort before this one by name so they are already built.
+    """
+
+    def __init__(self, handlers, queue_size=10000):
+        # dictConfig resolves cfg:// references on item access, not iteration.
+        handlers = [handlers[i] for i in range(len(handlers))]
+        for handler in handlers:
+            if not isinstance(handler, logging.Handler):
+                raise ValueError(f"Handler {handler!r} is not configured yet; give it a name sorting earlier.")
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.addFilter(RequestIdFilter())
+        self.targets = list(handlers)
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._unreported = 0
+        self._lock = threading.Lock()
+        self._start()
+        os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def _start(self):
+        self.listener = _Listener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+
+    def _restart_in_child(self):
+        # The listener thread does not survive fork(); give the child its own.
+        if self.listener is None:
+            return
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._start()
+
+    def prepare(self, record):
+        # Only merge the arguments now, as they may change later; exceptions
+        # are formatted by the target handlers, off the request thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        with self._lock:
+            if self._unreported:
+                try:
+                    self.queue.put_nowait(self._dropped_record(self._unreported))
+                    self._unreported = 0
+                except queue.Full:
+                    pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                self._unreported += 1
+
+    def _dropped_record(self, count):
+        return logging.makeLogRecord({
+            "name": __name__,
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": "Logging queue full: dropped %d log records",
+            "args": (count,),
+            "request_id": None,
+        })
+
+    def close(self):
+        # Flushes what is still queued; runs from logging.shutdown() at exit.
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super().close()
+
+
+class RequestIdMiddleware:
+    """Give every request a correlation id, available to all its log records."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER, "")
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        token = _request_id.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response[REQUEST_ID_HEADER] = request_id
+        return response
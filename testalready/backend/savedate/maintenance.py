@@ -0,0 +1,224 @@
+"""
+SQLite maintenance: planner statistics and freeing unused pages.
+
+As invitations are created, updated and archived, the statistics the query
+planner relies on go stale and deleted rows leave free pages behind. ``run``
+refreshes the statistics (``ANALYZE`` with a bounded ``analysis_limit``, then
+``PRAGMA optimize``) and returns free pages to the filesystem with
+``PRAGMA incremental_vacuum`` in small slices, pausing between them and
+stopping after a time budget, so writers only ever wait for one slice. It
+returns a report with the file size, free pages and a few representative
+query timings before and after.
+
+Incremental vacuum needs ``auto_vacuum = INCREMENTAL``, which an existing
+database only gets through one full ``VACUUM``: run
+``manage.py maintain_db --enable-incremental`` once, at a quiet time.
+
+Besides ``manage.py maintain_db``, each process can run maintenance itself
+every ``SAVEDATE_MAINTENANCE_INTERVAL`` seconds, once no request has finished
+for ``SAVEDATE_MAINTENANCE_IDLE_SECONDS``. A lock file next to the database
+keeps processes sharing it from running (or repeating) the same maintenance.
+"""
+import atexit
+import fcntl
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .models import SaveDate
+from .sharding import shard_aliases
+
+logger = logging.getLogger(__name__)
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+def _pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def _probes(using):
+    """
+    Reads shaped like the endpoints': each walks an index and stops after 50
+    rows, so a probe costs the same at any table size. The keyed ones use the
+    newest invitation's city and owner, so they hit rows that exist.
+    """
+    rows = SaveDate.objects.using(using)
+    newest = rows.order_by("-created_at", "-id")
+    sample = newest.values("city_key", "owner_id").first() or {"city_key": "", "owner_id": None}
+    return {
+        "newest": lambda: list(newest.values_list("rendered_json", flat=True)[:50]),
+        "by_city": lambda: list(
+            newest.filter(city_key=sample["city_key"]).values_list("rendered_json", flat=True)[:50]
+        ),
+        "by_owner": lambda: list(
+            newest.filter(owner_id=sample["owner_id"]).values_list("rendered_json", flat=True)[:50]
+        ),
+        "changes": lambda: list(rows.order_by("updated_at", "id").values_list("rendered_json", flat=True)[:50]),
+    }
+
+
+def measure(using):
+    """File size, free pages and best-of-three timings of typical queries on ``using``."""
+    connection = connections[using]
+    page_size = _pragma(connection, "page_size")
+    page_count = _pragma(connection, "page_count")
+    timings = {}
+    for name, query in _probes(using).items():
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            query()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = round(best * 1000, 3)
+    return {
+        "size_bytes": page_size * page_count,
+        "page_count": page_count,
+        "free_pages": _pragma(connection, "freelist_count"),
+        "query_ms": timings,
+    }
+
+
+def enable_incremental_vacuum(using):
+    """Switch ``using`` to ``auto_vacuum = INCREMENTAL``; rewrites the whole file."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("VACUUM")
+
+
+def run(using, vacuum_pages=500, vacuum_seconds=5.0, pause=0.05, analysis_limit=1000):
+    """
+    Refresh planner statistics and free up to ``vacuum_seconds`` worth of
+    pages, ``vacuum_pages`` per slice; returns the report.
+    """
+    connection = connections[using]
+    report = {"database": using, "before": measure(using), "steps_ms": {}}
+
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+        cursor.execute("ANALYZE")
+        cursor.execute("PRAGMA optimize")
+    report["steps_ms"]["analyze"] = round((time.perf_counter() - started) * 1000, 3)
+
+    mode = AUTO_VACUUM_MODES.get(_pragma(connection, "auto_vacuum"), "unknown")
+    report["auto_vacuum"] = mode
+    freed = 0
+    started = time.perf_counter()
+    if mode == "incremental":
+        deadline = time.monotonic() + vacuum_seconds
+        free_pages = _pragma(connection, "freelist_count")
+        while free_pages and time.monotonic() < deadline:
+            with connection.cursor() as cursor:
+                cursor.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})")
+            remaining = _pragma(connection, "freelist_count")
+            freed += free_pages - remaining
+            free_pages = remaining
+            time.sleep(pause)
+    report["steps_ms"]["vacuum"] = round((time.perf_counter() - started) * 1000, 3)
+    report["freed_pages"] = freed
+
+    report["after"] = measure(using)
+    return report
+
+
+class MaintenanceScheduler:
+    def __init__(self, interval=None, idle_seconds=60.0):
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.last_request = time.monotonic()
+        self._last_runs = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def touch(self):
+        """Note a finished request, starting the scheduler on the first one."""
+        self.last_request = time.monotonic()
+        if self._thread is None:
+            self.start()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="savedate-maintenance", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(min(self.interval, self.idle_seconds)):
+            if time.monotonic() - self.last_request < self.idle_seconds:
+                continue
+            for alias in shard_aliases():
+                try:
+                    self.run_if_due(alias)
+                except Exception:
+                    logger.exception("Database maintenance of %s failed", alias)
+            close_old_connections()
+
+    def run_if_due(self, alias):
+        """Run maintenance on ``alias`` unless it ran within the interval; returns the report or None."""
+        connection = connections[alias]
+        if connection.vendor != "sqlite":
+            return None
+        name = str(connection.settings_dict["NAME"])
+        if connection.is_in_memory_db() or not name:
+            return self._run_unlocked(alias)
+
+        with open(f"{name}.maintenance", "a+") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+            # The file holds the time of the last run by any process.
+            lock_file.seek(0)
+            last_run = float(lock_file.read() or "-inf")
+            if time.time() - last_run < self.interval:
+                return None
+            report = self._maintain(alias)
+            lock_file.truncate(0)
+            lock_file.write(str(time.time()))
+            return report
+
+    def _run_unlocked(self, alias):
+        if time.monotonic() - self._last_runs.get(alias, float("-inf")) < self.interval:
+            return None
+        self._last_runs[alias] = time.monotonic()
+        return self._maintain(alias)
+
+    def _maintain(self, alias):
+        report = run(alias)
+        logger.info("Database maintenance of %s done", alias, extra={"maintenance": report})
+        return report
+
+    def _reset_in_child(self):
+        self._last_runs = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+
+scheduler = MaintenanceScheduler(
+    getattr(settings, "SAVEDATE_MAINTENANCE_INTERVAL", None),
+    getattr(settings, "SAVEDATE_MAINTENANCE_IDLE_SECONDS", 60.0),
+)
+atexit.register(scheduler.stop)
+os.register_at_fork(after_in_child=scheduler._reset_in_child)
+
+
+def request_finished(sender, **kwargs):
+    if scheduler.interval is not None:
+        scheduler.touch()
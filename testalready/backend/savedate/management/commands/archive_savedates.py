@@ -0,0 +1,75 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from savedate import stats, tombstones
+from savedate.models import ArchivedSaveDate, SaveDate
+from savedate.sharding import shard_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Move SaveDate invitations older than the archive threshold into the "
+        "archive table, in small batches so each write transaction stays short."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int,
+                            default=getattr(settings, "SAVEDATE_ARCHIVE_AFTER_DAYS", 180),
+                            help="Archive invitations created more than this many days ago.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows moved per transaction.")
+        parser.add_argument("--sleep", type=float, default=0.1,
+                            help="Seconds to pause between batches so writers can take the lock.")
+        parser.add_argument("--max-batches", type=int, help="Stop after this many batches.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        fields = [f.attname for f in ArchivedSaveDate._meta.concrete_fields if f.name != "archived_at"]
+        moved = batches = 0
+        started = time.monotonic()
+
+        for alias in shard_aliases():
+            save_dates = SaveDate.objects.using(alias)
+            while options["max_batches"] is None or batches < options["max_batches"]:
+                # The archive lives on default: its insert commits before the
+                # shard's delete, and a rerun after a crash in between skips
+                # the rows already copied.
+                with transaction.atomic(using=alias), transaction.atomic():
+                    # Oldest first, via the created_at index; the batch is re-read
+                    # inside the transaction so a concurrent update is not lost.
+                    rows = list(
+                        save_dates.filter(created_at__lt=cutoff)
+                        .order_by("created_at")
+                        .values(*fields)[:options["batch_size"]]
+                    )
+                    if not rows:
+                        break
+                    now = timezone.now()
+                    ArchivedSaveDate.objects.bulk_create(
+                        [ArchivedSaveDate(archived_at=now, **row) for row in rows],
+                        ignore_conflicts=True,
+                    )
+                    # A move, not a deletion: archived invitations keep counting.
+                    # The change feed still reports them gone, with one insert
+                    # for the batch instead of one per row.
+                    with stats.suspended(), tombstones.suspended():
+                        save_dates.filter(pk__in=[row["id"] for row in rows]).delete()
+                    tombstones.leave(((row["id"], row["owner_id"]) for row in rows), alias)
+
+                moved += len(rows)
+                batches += 1
+                if len(rows) < options["batch_size"]:
+                    break
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} invitations created before {cutoff:%Y-%m-%d} "
+            f"in {batches} batches ({time.monotonic() - started:.1f}s)."
+        ))
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from savedate import updates
+from savedate.models import ArchivedSaveDate, SaveDate
+from savedate.sharding import shard_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Give the invitations that have no owner, created before invitations "
+        "belonged to users, to one user, so they show up in that user's "
+        "listings again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--owner", required=True, help="Username of the user receiving the invitations.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows read per query.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        User = get_user_model()
+        try:
+            owner = User.objects.get(**{User.USERNAME_FIELD: options["owner"]})
+        except User.DoesNotExist:
+            raise CommandError(f"User not found: {options['owner']}")
+
+        assigned = skipped = 0
+        for alias in shard_aliases():
+            unowned = SaveDate.objects.using(alias).filter(owner=None).order_by("pk")
+            last_pk = None
+            while True:
+                batch = unowned if last_pk is None else unowned.filter(pk__gt=last_pk)
+                rows = list(batch.values_list("pk", "version")[:options["batch_size"]])
+                if not rows:
+                    break
+                for pk, version in rows:
+                    # The versioned update bumps updated_at, so the change
+                    # feed and the snapshots pick the rows up too.
+                    if updates.update(pk, {"owner": owner}, version) is None:
+                        skipped += 1
+                    else:
+                        assigned += 1
+                last_pk = rows[-1][0]
+        archived = ArchivedSaveDate.objects.filter(owner=None).update(owner=owner)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Assigned {assigned} invitations and {archived} archived ones to {options['owner']}."
+        ))
+        if skipped:
+            self.stdout.write(f"{skipped} invitations changed while running were skipped; run the command again.")
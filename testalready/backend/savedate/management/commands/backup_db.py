@@ -0,0 +1,80 @@
+import gzip
+import os
+import shutil
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from savedate.sqlite_utils import copy_database, integrity_errors
+
+
+class Command(BaseCommand):
+    help = (
+        "Take a consistent backup of a live SQLite database with the online "
+        "backup API, copying a few pages at a time so writers are not blocked, "
+        "then check the copy's integrity."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", help="File to write; '.gz' is appended with --compress.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Alias of the database to back up.")
+        parser.add_argument("--pages", type=int, default=256,
+                            help="Pages copied per step; the database is only locked during a step.")
+        parser.add_argument("--sleep", type=float, default=0.05, help="Seconds to pause between steps.")
+        parser.add_argument("--compress", action="store_true", help="gzip the backup once it is verified.")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite":
+            raise CommandError(f"Database '{options['database']}' is not SQLite; use the database's own backup tools.")
+        if connection.in_atomic_block:
+            # SQLite answers every backup step with BUSY while the source
+            # connection holds a write transaction.
+            raise CommandError("Cannot back up from inside a transaction.")
+        if options["pages"] < 1:
+            raise CommandError("--pages must be at least 1.")
+
+        target = options["target"]
+        final = f"{target}.gz" if options["compress"] else target
+        if os.path.exists(final):
+            raise CommandError(f"{final} already exists.")
+        # Copy next to the target and only move it into place once verified.
+        partial = f"{target}.partial"
+        leftovers = (partial, f"{partial}.gz")
+        self._remove(leftovers)
+
+        def progress(remaining, total):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{total - remaining}/{total} pages")
+
+        started = time.monotonic()
+        try:
+            # Through Django's connection, so in-memory and test databases work too.
+            connection.ensure_connection()
+            pages = copy_database(
+                connection.connection, partial, pages=options["pages"], sleep=options["sleep"], progress=progress
+            )
+            elapsed = time.monotonic() - started
+            errors = integrity_errors(partial)
+            if errors:
+                raise CommandError("The backup failed its integrity check:\n" + "\n".join(errors[:20]))
+            if options["compress"]:
+                with open(partial, "rb") as src, gzip.open(f"{partial}.gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                os.remove(partial)
+                partial = f"{partial}.gz"
+            os.replace(partial, final)
+        finally:
+            self._remove(leftovers)
+
+        size = os.path.getsize(final)
+        self.stdout.write(self.style.SUCCESS(
+            f"Backed up {pages} pages to {final} ({size / 1024:.0f} KiB) in {elapsed:.2f}s, "
+            f"{pages / max(elapsed, 1e-6):.0f} pages/s."
+        ))
+
+    def _remove(self, paths):
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,257 @@
+import csv
+import json
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from savedate import snapshots, stats
+from savedate.models import SaveDate
+from savedate.sharding import group_by_shard
+
+# Namespace for deterministic primary keys: re-importing the same record of the
+# same source always yields the same id, so a resumed run can never duplicate
+# rows that were committed right before a crash.
+IMPORT_NAMESPACE = uuid.UUID("8f4c9a52-3c1e-4f0a-9a57-1f0d2b6f7e11")
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _validate_chunk(chunk):
+    """
+    Validate a chunk of ``(record_no, raw)`` pairs with SaveDateWriteSerializer.
+
+    Runs inside the worker processes, so it only returns plain picklable data:
+    ``("ok", record_no, validated_data)`` or ``("error", record_no, raw, errors)``.
+    """
+    from savedate.serializers import SaveDateWriteSerializer
+
+    results = []
+    for record_no, raw in chunk:
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError as exc:
+                results.append(("error", record_no, raw, {"non_field_errors": [f"Invalid JSON: {exc}"]}))
+                continue
+        if not isinstance(raw, dict):
+            results.append(("error", record_no, raw, {"non_field_errors": ["Record must be an object."]}))
+            continue
+
+        data = dict(raw)
+        # CSV cells are strings, so event_times arrives JSON-encoded.
+        if isinstance(data.get("event_times"), str):
+            try:
+                data["event_times"] = json.loads(data["event_times"])
+            except ValueError:
+                pass
+
+        serializer = SaveDateWriteSerializer(data=data)
+        if serializer.is_valid():
+            validated = dict(serializer.validated_data)
+            validated["event_times"] = [dict(item) for item in validated["event_times"]]
+            results.append(("ok", record_no, validated))
+        else:
+            results.append(("error", record_no, raw, json.loads(json.dumps(serializer.errors))))
+    return results
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream SaveDate records from an NDJSON or CSV file, validate them in a "
+        "process pool and insert the valid ones in batched transactions. "
+        "Rejected records are written to a sidecar file and the run can be "
+        "resumed from its checkpoint after a crash."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON (.ndjson/.jsonl) or CSV file to import.")
+        parser.add_argument("--owner", required=True, help="Username of the user the invitations are imported for.")
+        parser.add_argument("--format", choices=["ndjson", "csv"], help="Input format (default: from file extension).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Validation processes. 0 validates inline in this process.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Records sent to a worker at a time.")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Records per write transaction.")
+        parser.add_argument("--rejects", help="Sidecar file for rejected records (default: <path>.rejects.ndjson).")
+        parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint.json).")
+        parser.add_argument("--source-key", help="Key used to derive deterministic ids (default: file name and size).")
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over.")
+        parser.add_argument("--progress-every", type=float, default=5.0, help="Seconds between progress reports.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+        if options["chunk_size"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--chunk-size and --batch-size must be positive.")
+
+        User = get_user_model()
+        try:
+            self.owner = User.objects.get(**{User.USERNAME_FIELD: options["owner"]})
+        except User.DoesNotExist:
+            raise CommandError(f"User not found: {options['owner']}")
+
+        fmt = options["format"] or ("csv" if path.lower().endswith(".csv") else "ndjson")
+        rejects_path = options["rejects"] or f"{path}.rejects.ndjson"
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint.json"
+        source_key = options["source_key"] or f"{os.path.basename(path)}:{os.path.getsize(path)}"
+
+        checkpoint = {"source_key": source_key, "records": 0, "rejects_bytes": 0}
+        if not options["restart"] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding="utf-8") as fh:
+                saved = json.load(fh)
+            if saved.get("source_key") != source_key:
+                raise CommandError(
+                    f"Checkpoint {checkpoint_path} belongs to a different source; use --restart to discard it."
+                )
+            checkpoint = saved
+            self.stdout.write(f"Resuming after record {checkpoint['records']}.")
+
+        self.path = path
+        self.checkpoint_path = checkpoint_path
+        self.source_key = source_key
+        self.checkpoint = checkpoint
+        self.imported = 0
+        self.rejected = 0
+        self.processed = 0
+        self.progress_every = options["progress_every"]
+
+        # Drop reject lines written after the last checkpoint so a resumed run
+        # does not report them twice.
+        self.rejects_fh = open(rejects_path, "a+b")
+        self.rejects_fh.truncate(checkpoint["rejects_bytes"])
+        self.rejects_fh.seek(0, os.SEEK_END)
+
+        self.started = self.last_report = time.monotonic()
+        try:
+            chunks = self._chunks(self._records(path, fmt, checkpoint["records"]), options["chunk_size"])
+            self._run(chunks, options)
+        finally:
+            self.rejects_fh.close()
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {self.processed} records in {elapsed:.1f}s "
+            f"({self.processed / elapsed if elapsed else 0:.0f} rec/s), "
+            f"{self.imported} imported, {self.rejected} rejected."
+        ))
+        if self.rejected:
+            self.stdout.write(f"Rejected records written to {rejects_path}.")
+        os.remove(checkpoint_path)
+
+    def _records(self, path, fmt, skip):
+        """Yield ``(record_no, raw)`` pairs lazily, skipping already committed records."""
+        with open(path, newline="", encoding="utf-8") as fh:
+            if fmt == "csv":
+                rows = csv.DictReader(fh)
+            else:
+                rows = (line for line in fh if line.strip())
+            for record_no, raw in enumerate(rows, start=1):
+                if record_no > skip:
+                    yield record_no, raw
+
+    @staticmethod
+    def _chunks(records, size):
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _run(self, chunks, options):
+        self.batch = []
+        self.batch_rejects = []
+        self.batch_last_record = self.checkpoint["records"]
+
+        if options["workers"] <= 0:
+            for chunk in chunks:
+                self._consume(_validate_chunk(chunk), options["batch_size"])
+            self._flush()
+            return
+
+        # Keep a fixed window of chunks in flight: memory stays bounded no
+        # matter how large the file is, and results are consumed in file order
+        # so the checkpoint is always a simple record count.
+        window = options["workers"] * 2
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker) as pool:
+            for chunk in chunks:
+                pending.append(pool.submit(_validate_chunk, chunk))
+                if len(pending) >= window:
+                    self._consume(pending.popleft().result(), options["batch_size"])
+            while pending:
+                self._consume(pending.popleft().result(), options["batch_size"])
+        self._flush()
+
+    def _consume(self, results, batch_size):
+        for result in results:
+            if result[0] == "ok":
+                _, record_no, validated = result
+                record_id = uuid.uuid5(IMPORT_NAMESPACE, f"{self.source_key}:{record_no}")
+                self.batch.append(SaveDate(id=record_id, owner=self.owner, **validated))
+            else:
+                _, record_no, raw, errors = result
+                self.batch_rejects.append({"record": record_no, "data": raw, "errors": errors})
+            self.batch_last_record = record_no
+            self.processed += 1
+
+        if len(self.batch) + len(self.batch_rejects) >= batch_size:
+            self._flush()
+        self._report_progress()
+
+    def _flush(self):
+        """Commit the current batch, then persist rejects and the checkpoint."""
+        for alias, rows in group_by_shard(self.batch).items():
+            save_dates = SaveDate.objects.using(alias)
+            with transaction.atomic(using=alias):
+                # Rows committed just before a crash are already there; skip
+                # them so neither the table nor the city stats double count.
+                existing = set(
+                    save_dates.filter(pk__in=[obj.pk for obj in rows]).values_list("pk", flat=True)
+                )
+                new_rows = [obj for obj in rows if obj.pk not in existing]
+                save_dates.bulk_create(new_rows, ignore_conflicts=True)
+                # bulk_create sends no post_save, so stats and snapshots are updated here.
+                stats.record_created(new_rows, alias)
+                snapshots.schedule_many([obj.pk for obj in new_rows], alias)
+            self.imported += len(new_rows)
+        self.rejected += len(self.batch_rejects)
+
+        for reject in self.batch_rejects:
+            self.rejects_fh.write((json.dumps(reject, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.rejects_fh.flush()
+        os.fsync(self.rejects_fh.fileno())
+
+        self.checkpoint["records"] = self.batch_last_record
+        self.checkpoint["rejects_bytes"] = self.rejects_fh.tell()
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(self.checkpoint, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+        self.batch = []
+        self.batch_rejects = []
+
+    def _report_progress(self):
+        now = time.monotonic()
+        if now - self.last_report < self.progress_every:
+            return
+        self.last_report = now
+        elapsed = now - self.started
+        self.stdout.write(
+            f"{self.processed} records processed ({self.processed / elapsed:.0f} rec/s): "
+            f"{self.imported} imported, {self.rejected} rejected."
+        )
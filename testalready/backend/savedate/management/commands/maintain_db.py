@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from savedate import maintenance
+from savedate.sharding import shard_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh SQLite planner statistics (ANALYZE, PRAGMA optimize) and free "
+        "unused pages with incremental vacuum in bounded slices, on every "
+        "shard. Prints size, free pages and query timings before and after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", action="append", dest="databases",
+                            help="Only this alias; may be repeated. Defaults to every shard.")
+        parser.add_argument("--vacuum-pages", type=int, default=500, help="Pages freed per slice.")
+        parser.add_argument("--vacuum-seconds", type=float, default=5.0,
+                            help="Stop vacuuming after this long; the next run goes on.")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to pause between slices.")
+        parser.add_argument("--enable-incremental", action="store_true",
+                            help="Switch databases to auto_vacuum=INCREMENTAL first (one full VACUUM).")
+
+    def handle(self, *args, **options):
+        aliases = options["databases"] or shard_aliases()
+        for alias in aliases:
+            if alias not in connections:
+                raise CommandError(f"Unknown database '{alias}'.")
+            if connections[alias].vendor != "sqlite":
+                raise CommandError(f"Database '{alias}' is not SQLite.")
+
+        for alias in aliases:
+            if options["enable_incremental"]:
+                self.stdout.write(f"Enabling incremental vacuum on '{alias}'; rewriting the file.")
+                maintenance.enable_incremental_vacuum(alias)
+            report = maintenance.run(
+                alias,
+                vacuum_pages=options["vacuum_pages"],
+                vacuum_seconds=options["vacuum_seconds"],
+                pause=options["pause"],
+            )
+            self.stdout.write(json.dumps(report))
+            before, after = report["before"], report["after"]
+            if report["auto_vacuum"] != "incremental":
+                self.stderr.write(
+                    f"'{alias}' has auto_vacuum={report['auto_vacuum']}, so no pages were freed; "
+                    "run once with --enable-incremental."
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"'{alias}': {before['size_bytes'] / 1024:.0f} -> {after['size_bytes'] / 1024:.0f} KiB, "
+                f"{before['free_pages']} -> {after['free_pages']} free pages."
+            ))
@@ -0,0 +1,60 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from savedate.models import BackgroundTask
+from savedate.sharding import shard_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete finished background tasks: done ones after a week and failed "
+        "ones after a month by default, in small batches on every shard."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--done-days", type=int,
+                            default=getattr(settings, "SAVEDATE_TASKS_KEEP_DONE_DAYS", 7),
+                            help="Delete done tasks last updated more than this many days ago.")
+        parser.add_argument("--failed-days", type=int,
+                            default=getattr(settings, "SAVEDATE_TASKS_KEEP_FAILED_DAYS", 30),
+                            help="Delete failed tasks last updated more than this many days ago.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per statement.")
+        parser.add_argument("--sleep", type=float, default=0.1,
+                            help="Seconds to pause between batches so writers can take the lock.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        now = timezone.now()
+        cutoffs = {
+            BackgroundTask.DONE: now - timedelta(days=options["done_days"]),
+            BackgroundTask.FAILED: now - timedelta(days=options["failed_days"]),
+        }
+        deleted = dict.fromkeys(cutoffs, 0)
+
+        for alias in shard_aliases():
+            tasks = BackgroundTask.objects.using(alias)
+            for task_status, cutoff in cutoffs.items():
+                while True:
+                    # Finished rows are never updated again, so a batch read
+                    # outside a transaction cannot delete live work.
+                    pks = list(
+                        tasks.filter(status=task_status, updated_at__lt=cutoff)
+                        .values_list("pk", flat=True)[:options["batch_size"]]
+                    )
+                    if not pks:
+                        break
+                    tasks.filter(pk__in=pks, status=task_status).delete()
+                    deleted[task_status] += len(pks)
+                    if len(pks) < options["batch_size"]:
+                        break
+                    time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted[BackgroundTask.DONE]} done and {deleted[BackgroundTask.FAILED]} failed tasks."
+        ))
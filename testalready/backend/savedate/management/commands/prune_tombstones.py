@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from savedate.models import SaveDateTombstone
+from savedate.sharding import shard_aliases
+from savedate.tombstones import retained_since
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete tombstones older than SAVEDATE_TOMBSTONE_RETENTION_DAYS, in "
+        "small batches on every shard. Feed cursors older than that are reset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per statement.")
+        parser.add_argument("--sleep", type=float, default=0.1,
+                            help="Seconds to pause between batches so writers can take the lock.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        cutoff = retained_since()
+        deleted = 0
+        for alias in shard_aliases():
+            tombstones = SaveDateTombstone.objects.using(alias)
+            while True:
+                # Oldest first, via the deleted_at index.
+                pks = list(
+                    tombstones.filter(deleted_at__lt=cutoff)
+                    .order_by("deleted_at")
+                    .values_list("pk", flat=True)[:options["batch_size"]]
+                )
+                if not pks:
+                    break
+                tombstones.filter(pk__in=pks, deleted_at__lt=cutoff).delete()
+                deleted += len(pks)
+                if len(pks) < options["batch_size"]:
+                    break
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones from before {cutoff:%Y-%m-%d}."))
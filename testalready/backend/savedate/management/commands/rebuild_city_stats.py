@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from savedate import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-city invitation statistics from the SaveDate and archive tables."
+
+    def handle(self, *args, **options):
+        cities, days = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {cities} cities over {days} city-days."))
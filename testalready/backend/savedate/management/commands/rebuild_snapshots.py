@@ -0,0 +1,89 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from savedate import snapshots
+from savedate.models import SaveDate
+from savedate.sharding import shard_aliases
+
+
+def _write_chunk(root, chunk):
+    """Write the snapshots of a chunk of ``rendered_json`` strings; runs in the worker processes."""
+    return sum(snapshots.write(rendered, root) for rendered in chunk)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite the static snapshot of every SaveDate in SAVEDATE_SNAPSHOT_DIR "
+        "using a process pool, then remove the snapshots of invitations that "
+        "no longer exist."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Writer processes. 0 writes inline in this process.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Invitations sent to a worker at a time.")
+
+    def handle(self, *args, **options):
+        if not snapshots.enabled():
+            raise CommandError("SAVEDATE_SNAPSHOT_DIR is not set.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        root = snapshots.directory()
+        root.mkdir(parents=True, exist_ok=True)
+        started = time.time()
+        ids = set()
+        written = 0
+        chunks = self._chunks(ids, options["chunk_size"])
+        if options["workers"] <= 0:
+            written = sum(_write_chunk(root, chunk) for chunk in chunks)
+        else:
+            # A bounded window of chunks in flight keeps memory flat.
+            window = options["workers"] * 2
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+                for chunk in chunks:
+                    pending.append(pool.submit(_write_chunk, root, chunk))
+                    if len(pending) >= window:
+                        written += pending.popleft().result()
+                while pending:
+                    written += pending.popleft().result()
+
+        removed = self._prune(root, ids, started)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} of {len(ids)} snapshots and removed {removed} orphaned ones "
+            f"in {time.time() - started:.1f}s."
+        ))
+
+    def _chunks(self, ids, size):
+        chunk = []
+        for alias in shard_aliases():
+            rows = SaveDate.objects.using(alias).order_by("pk").values_list("pk", "rendered_json")
+            for pk, rendered in rows.iterator(chunk_size=size):
+                ids.add(str(pk))
+                chunk.append(rendered)
+                if len(chunk) == size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def _prune(self, root, ids, started):
+        """Remove snapshots of missing rows, and temporary files left by crashed writers."""
+        orphans = set()
+        for path in Path(root).iterdir():
+            # Anything newer may belong to a row created during the rebuild.
+            if path.stat().st_mtime >= started:
+                continue
+            if path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)
+            elif path.suffix in snapshots.SUFFIXES and path.stem not in ids:
+                orphans.add(path.stem)
+        for pk in orphans:
+            snapshots.invalidate(pk, root=root)
+        return len(orphans)
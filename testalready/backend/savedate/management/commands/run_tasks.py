@@ -0,0 +1,38 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from savedate.tasks import TaskRunner
+
+
+class Command(BaseCommand):
+    help = "Run queued SaveDate background tasks in a dedicated process."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4, help="Worker threads.")
+        parser.add_argument("--once", action="store_true", help="Run the tasks that are due now, then exit.")
+        parser.add_argument("--stats-every", type=float, default=60.0, help="Seconds between metrics reports.")
+
+    def handle(self, *args, **options):
+        runner = TaskRunner(concurrency=options["concurrency"])
+        if options["once"]:
+            count = runner.run_pending()
+            self.stdout.write(f"Ran {count} tasks.")
+            self._report(runner)
+            return
+
+        runner.start()
+        self.stdout.write(f"Running background tasks with {options['concurrency']} threads. Ctrl-C to stop.")
+        try:
+            while True:
+                time.sleep(options["stats_every"])
+                self._report(runner)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping; waiting for running tasks to finish.")
+        finally:
+            runner.stop()
+
+    def _report(self, runner):
+        for name, stats in sorted(runner.metrics().items()):
+            self.stdout.write(f"{name}: {json.dumps({k: round(v, 2) for k, v in stats.items()})}")
@@ -0,0 +1,47 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from savedate.prefork import PreforkServer
+from savedate.routers import pins_are_per_process, replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the API from pre-forked workers that share one warmed-up copy "
+        "of the application. SIGHUP reloads gracefully; SIGTERM stops."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="127.0.0.1:8000", help="host:port to listen on (port 0 picks one).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument("--max-requests", type=int, default=1000,
+                            help="Restart a worker after this many requests; 0 never does.")
+        parser.add_argument("--max-requests-jitter", type=int, default=50,
+                            help="Add up to this many requests to each worker's limit.")
+        parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                            help="Seconds workers get to finish their requests on shutdown.")
+        parser.add_argument("--timeout", type=float, default=getattr(settings, "SAVEDATE_SERVE_TIMEOUT", 30.0),
+                            help="Seconds a connection may stay idle before it is closed.")
+
+    def handle(self, *args, **options):
+        host, _, port = options["bind"].rpartition(":")
+        if not host or not port.isdigit():
+            raise CommandError("--bind must be host:port.")
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+        if options["workers"] > 1 and replica_aliases() and pins_are_per_process():
+            raise CommandError(
+                "SAVEDATE_DB_PIN_CACHE is a local-memory cache, so a user's pin to the primary "
+                "would only hold in one worker; use a shared cache or --workers 1."
+            )
+        PreforkServer(
+            (host.strip("[]"), int(port)),
+            workers=options["workers"],
+            max_requests=options["max_requests"],
+            max_requests_jitter=options["max_requests_jitter"],
+            graceful_timeout=options["graceful_timeout"],
+            request_timeout=options["timeout"],
+            stdout=self.stdout,
+        ).run()
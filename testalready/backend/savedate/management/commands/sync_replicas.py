@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from savedate.routers import replica_aliases
+from savedate.sqlite_utils import copy_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the SQLite stand-in replicas listed in SAVEDATE_DB_REPLICAS "
+        "with a consistent copy of the primary database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float,
+                            help="Keep copying every this many seconds, simulating replication lag.")
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            raise CommandError("No replicas configured in SAVEDATE_DB_REPLICAS.")
+        for alias in [DEFAULT_DB_ALIAS, *aliases]:
+            if connections[alias].vendor != "sqlite":
+                raise CommandError(f"Database '{alias}' is not SQLite; use the database's own replication.")
+
+        source = connections[DEFAULT_DB_ALIAS].settings_dict["NAME"]
+        while True:
+            started = time.monotonic()
+            for alias in aliases:
+                pages = copy_database(source, connections[alias].settings_dict["NAME"])
+                self.stdout.write(f"Copied {pages} pages to '{alias}'.")
+            self.stdout.write(self.style.SUCCESS(f"Replicas synced in {time.monotonic() - started:.2f}s."))
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,157 @@
+"""
+Per-request memory profiling with ``tracemalloc``.
+
+``MemoryProfileMiddleware`` runs a request under ``tracemalloc`` when it is
+sampled: a fraction ``SAVEDATE_MEMORY_PROFILE_RATE`` of requests, plus every
+request whose ``X-Memory-Profile`` header matches
+``SAVEDATE_MEMORY_PROFILE_KEY``. Views mark stages with ``stage(name)``; for
+each stage, and for the whole request, the profile records the peak memory
+and the source lines still holding the most memory allocated during it (the
+list view marks its ``query`` and ``render`` stages). Profiles are written
+as JSON lines to the ``savedate.memory_profile`` logger, which ``LOGGING``
+sends to ``memory_profiles.jsonl``.
+
+``tracemalloc`` is process-wide and slows everything it traces, so one request
+per process is profiled at a time; sampled requests arriving meanwhile run
+normally. A rate of ``None`` removes the middleware, and outside a profiled
+request ``stage`` only checks a context variable.
+"""
+import contextvars
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+exporter = logging.getLogger("savedate.memory_profile")
+
+HEADER = "X-Memory-Profile"
+TOP_SITES = 10
+
+_current = contextvars.ContextVar("savedate_memory_profile", default=None)
+_lock = threading.Lock()
+
+# Allocations by the profiler itself, and one-off module imports.
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def _kib(size):
+    return round(size / 1024, 1)
+
+
+def snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+
+def top_sites(baseline):
+    """The lines holding the most memory allocated since ``baseline`` was taken."""
+    return [
+        {"site": str(diff.traceback[0]), "size_kb": _kib(diff.size_diff), "count": diff.count_diff}
+        for diff in snapshot().compare_to(baseline, "lineno")[:TOP_SITES]
+        if diff.size_diff > 0
+    ]
+
+
+class Profile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.baseline = snapshot()
+        self.start_size = tracemalloc.get_traced_memory()[0]
+        self.peak = self.start_size
+        self.stages = {}
+
+    def observe_peak(self):
+        """Fold the peak since the last reset into the request's and reset it."""
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        tracemalloc.reset_peak()
+        return current, peak
+
+
+@contextmanager
+def stage(name):
+    """Record peak memory and top allocation sites of a stage of a profiled request."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    # Snapshot first, so its own memory is not part of the stage's peak.
+    baseline = snapshot()
+    before, _ = profile.observe_peak()
+    try:
+        yield
+    finally:
+        current, peak = profile.observe_peak()
+        profile.stages[name] = {
+            "peak_kb": _kib(peak - before),
+            "retained_kb": _kib(current - before),
+            "top": top_sites(baseline),
+        }
+
+
+class MemoryProfileMiddleware:
+    """
+    Profile the memory of sampled requests.
+
+    Disabled when ``SAVEDATE_MEMORY_PROFILE_RATE`` is ``None``.
+    """
+
+    def __init__(self, get_response):
+        if getattr(settings, "SAVEDATE_MEMORY_PROFILE_RATE", None) is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def sampled(self, request):
+        key = getattr(settings, "SAVEDATE_MEMORY_PROFILE_KEY", "")
+        if key and secrets.compare_digest(request.headers.get(HEADER, ""), key):
+            return True
+        return random.random() < settings.SAVEDATE_MEMORY_PROFILE_RATE
+
+    def __call__(self, request):
+        if not self.sampled(request) or not _lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.profile(request)
+        finally:
+            _lock.release()
+
+    def profile(self, request):
+        # Leave tracing alone if the process was started with it on (-X tracemalloc).
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profile = Profile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+            profile.observe_peak()
+            entry = {
+                "request_id": getattr(request, "request_id", None),
+                "method": request.method,
+                "path": request.path,
+                "route": request.resolver_match.route if request.resolver_match else None,
+                "status": response.status_code,
+                "duration_ms": round((time.perf_counter() - profile.started) * 1000, 3),
+                "peak_kb": _kib(profile.peak - profile.start_size),
+                "stages": profile.stages,
+                "top": top_sites(profile.baseline),
+            }
+        finally:
+            _current.reset(token)
+            if started_here:
+                tracemalloc.stop()
+        exporter.info(json.dumps(entry, ensure_ascii=False))
+        response["X-Memory-Peak-KB"] = str(entry["peak_kb"])
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0002_remove_savedate_event_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='savedate',
+            index=models.Index(fields=['updated_at', 'id'], name='savedate_updated_id_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:56
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0003_savedate_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSaveDate',
+            fields=[
+                ('title', models.CharField(help_text='Main title of the event.', max_length=255, validators=[django.core.validators.MinLengthValidator(3)])),
+                ('event_subtitle', models.CharField(blank=True, help_text='Optional subtitle for the event.', max_length=255, null=True)),
+                ('event_summary', models.TextField(help_text='A short description or summary of the event.', validators=[django.core.validators.MinLengthValidator(10)])),
+                ('event_times', models.JSONField(blank=True, default=dict, help_text='Array of event times, each with label and time in 24-hour format.')),
+                ('event_venue', models.CharField(help_text='Venue name, e.g., Grand Ballroom.', max_length=255, validators=[django.core.validators.MinLengthValidator(3)])),
+                ('event_address', models.CharField(help_text='Street address of the venue.', max_length=255, validators=[django.core.validators.MinLengthValidator(3)])),
+                ('event_city', models.CharField(help_text='City where the event takes place.', max_length=100, validators=[django.core.validators.MinLengthValidator(2)])),
+                ('id', models.UUIDField(editable=False, help_text='Identifier of the original Save the Date invitation.', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='savedate',
+            index=models.Index(fields=['created_at'], name='savedate_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedsavedate',
+            index=models.Index(fields=['created_at'], name='archived_created_at_idx'),
+        ),
+    ]
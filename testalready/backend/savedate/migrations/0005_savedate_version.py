@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0004_archivedsavedate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedsavedate',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Incremented on every update; used for optimistic concurrency (ETag/If-Match).'),
+        ),
+        migrations.AddField(
+            model_name='savedate',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Incremented on every update; used for optimistic concurrency (ETag/If-Match).'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:58
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_city_stats(apps, schema_editor):
+    CityStats = apps.get_model('savedate', 'CityStats')
+    CityDailyStats = apps.get_model('savedate', 'CityDailyStats')
+    daily = Counter()
+    for model_name in ('SaveDate', 'ArchivedSaveDate'):
+        rows = (
+            apps.get_model('savedate', model_name).objects
+            .annotate(day=TruncDate('created_at'))
+            .values('event_city', 'day')
+            .annotate(n=Count('pk'))
+            .order_by()
+        )
+        for row in rows:
+            daily[(row['event_city'], row['day'])] += row['n']
+    totals = Counter()
+    for (event_city, _), n in daily.items():
+        totals[event_city] += n
+    CityDailyStats.objects.bulk_create(
+        [CityDailyStats(event_city=city, day=day, count=n) for (city, day), n in daily.items()],
+        batch_size=1000,
+    )
+    CityStats.objects.bulk_create(
+        [CityStats(event_city=city, total=n) for city, n in totals.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0006_backgroundtask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CityStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_city', models.CharField(max_length=100, unique=True)),
+                ('total', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CityDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_city', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='city_daily_stats_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event_city', 'day'), name='city_daily_stats_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_city_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0007_city_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='savedate',
+            name='savedate_created_at_idx',
+        ),
+        migrations.AddIndex(
+            model_name='savedate',
+            index=models.Index(fields=['created_at', 'id'], name='savedate_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedate',
+            index=models.Index(fields=['event_city', 'created_at', 'id'], name='savedate_city_created_idx'),
+        ),
+    ]
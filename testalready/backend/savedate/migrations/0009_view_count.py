@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0008_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewCount',
+            fields=[
+                ('save_date_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('views', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
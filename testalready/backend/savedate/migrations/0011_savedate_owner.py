@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0010_savedate_rendered_json'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedsavedate',
+            name='owner',
+            field=models.ForeignKey(db_constraint=False, db_index=False, help_text='User who created the invitation; the listing only shows their own.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(class)ss', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='savedate',
+            name='owner',
+            field=models.ForeignKey(db_constraint=False, db_index=False, help_text='User who created the invitation; the listing only shows their own.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(class)ss', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='savedate',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='savedate_owner_created_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:41
+
+import savedate.models
+from django.conf import settings
+from django.db import migrations, models
+from savedate.models import normalize_key
+
+
+def backfill(model_name):
+    def fill_city_keys(apps, schema_editor):
+        model = apps.get_model('savedate', model_name)
+        rows = model.objects.using(schema_editor.connection.alias)
+        batch = []
+        for row in rows.only('pk', 'event_city').order_by('pk').iterator(chunk_size=1000):
+            row.city_key = normalize_key(row.event_city)
+            batch.append(row)
+            if len(batch) == 1000:
+                rows.bulk_update(batch, ['city_key'])
+                batch = []
+        rows.bulk_update(batch, ['city_key'])
+    return fill_city_keys
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0011_savedate_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='savedate',
+            name='savedate_city_created_idx',
+        ),
+        migrations.AddField(
+            model_name='archivedsavedate',
+            name='city_key',
+            field=savedate.models.NormalizedKeyField(default='', editable=False, help_text='event_city without case or accents, for indexed lookups.', max_length=100, source='event_city'),
+        ),
+        migrations.AddField(
+            model_name='savedate',
+            name='city_key',
+            field=savedate.models.NormalizedKeyField(default='', editable=False, help_text='event_city without case or accents, for indexed lookups.', max_length=100, source='event_city'),
+        ),
+        # The model_name hint lets ShardRouter run each backfill on every
+        # database that holds the table, not only on default.
+        migrations.RunPython(backfill('SaveDate'), migrations.RunPython.noop, hints={'model_name': 'savedate'}),
+        migrations.RunPython(
+            backfill('ArchivedSaveDate'), migrations.RunPython.noop, hints={'model_name': 'archivedsavedate'}
+        ),
+        migrations.AddIndex(
+            model_name='savedate',
+            index=models.Index(fields=['city_key', 'created_at', 'id'], name='savedate_citykey_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedate',
+            index=models.Index(fields=['owner', 'city_key', 'created_at', 'id'], name='savedate_owner_city_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0012_city_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedsavedate',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='archived_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedate',
+            index=models.Index(fields=['owner', 'updated_at', 'id'], name='savedate_owner_updated_idx'),
+        ),
+    ]
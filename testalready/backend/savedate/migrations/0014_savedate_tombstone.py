@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('savedate', '0013_owner_scoped_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaveDateTombstone',
+            fields=[
+                ('save_date_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('owner', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'deleted_at', 'save_date_id'], name='tombstone_owner_deleted_idx')],
+            },
+        ),
+    ]
@@ -1,10 +1,49 @@
+import unicodedata
 import uuid 
 from django.db import models
 from django.conf import settings  
+from django.utils import timezone
 from django.core.validators import MinLengthValidator, URLValidator
 
+from .sharding import SaveDateQuerySet
 
-class SaveDate(models.Model):
+
+def normalize_key(value):
+    """
+    Case-, accent- and spacing-insensitive form of ``value``, used for
+    lookups: "  SÃO   Paulo" -> "sao paulo".
+    """
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    unaccented = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(unaccented.casefold().split())
+
+
+class NormalizedKeyField(models.CharField):
+    """
+    ``normalize_key`` of the ``source`` field, recomputed on every save and
+    bulk create. ``QuerySet.update()`` callers must set it themselves.
+    """
+
+    def __init__(self, *args, source=None, **kwargs):
+        self.source = source
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["source"] = self.source
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = normalize_key(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class BaseSaveDate(models.Model):
+    """
+    Fields shared by live invitations and their archived copies.
+    """
     id = models.UUIDField(
         primary_key=True,
         default=uuid.uuid4,
@@ -12,6 +51,18 @@ class SaveDate(models.Model):
         help_text="Unique identifier for this Save the Date invitation."
     )
 
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="%(class)ss",
+        # Users live on "default" while invitations may live on any shard,
+        # so there is no database constraint; SaveDate indexes it with created_at.
+        db_constraint=False,
+        db_index=False,
+        help_text="User who created the invitation; the listing only shows their own."
+    )
+
     title = models.CharField(
         max_length=255,
         validators=[MinLengthValidator(3)],
@@ -54,10 +105,222 @@ class SaveDate(models.Model):
         help_text="City where the event takes place."
     )
 
+    city_key = NormalizedKeyField(
+        source="event_city",
+        max_length=100,
+        default="",
+        help_text="event_city without case or accents, for indexed lookups."
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-   
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Incremented on every update; used for optimistic concurrency (ETag/If-Match)."
+    )
+
+    class Meta:
+        abstract = True
+
     def __str__(self):
         return f"{self.title} - {self.event_venue}"
+
+
+class RenderedJSONField(models.TextField):
+    """
+    The row's API representation, re-rendered by ``savedate.rendering`` on
+    every save and bulk create.
+
+    Must be the model's last field, so that it renders the values the other
+    fields' ``pre_save`` just set (``updated_at``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("editable", False)
+        kwargs.setdefault("default", "")
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        from .rendering import render
+
+        value = render(model_instance)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class SaveDate(BaseSaveDate):
+    """
+    A live ("hot") Save the Date invitation.
+    """
+    rendered_json = RenderedJSONField(
+        help_text="Pre-rendered API JSON of this invitation, served by the list and detail endpoints."
+    )
+
+    objects = SaveDateQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves the change feed: rows are walked in (updated_at, id) order.
+            models.Index(fields=["updated_at", "id"], name="savedate_updated_id_idx"),
+            # Lets the archiver find the oldest rows and the admin changelist
+            # page in (created_at, id) order without a table scan or sort.
+            models.Index(fields=["created_at", "id"], name="savedate_created_id_idx"),
+            # City search in the admin, already in changelist order.
+            models.Index(fields=["city_key", "created_at", "id"], name="savedate_citykey_created_idx"),
+            # One owner's listing, newest first: O(their rows) at any table size.
+            models.Index(fields=["owner", "created_at", "id"], name="savedate_owner_created_idx"),
+            # The same listing filtered with ?city=.
+            models.Index(fields=["owner", "city_key", "created_at", "id"], name="savedate_owner_city_idx"),
+            # One owner's change feed, in (updated_at, id) order.
+            models.Index(fields=["owner", "updated_at", "id"], name="savedate_owner_updated_idx"),
+        ]
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields:
+            # Whatever changed, the stored rendering changes with it, and so
+            # does the updated_at (auto_now) it renders.
+            update_fields = {*update_fields, "updated_at", "rendered_json"}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class ArchivedSaveDate(BaseSaveDate):
+    """
+    An invitation moved out of the hot table by ``archive_savedates``.
+
+    Keeps the original id and timestamps, so the fields are plain copies
+    rather than generated values.
+    """
+    id = models.UUIDField(
+        primary_key=True,
+        editable=False,
+        help_text="Identifier of the original Save the Date invitation."
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], name="archived_created_at_idx"),
+            # One owner's archive listing, newest first.
+            models.Index(fields=["owner", "created_at", "id"], name="archived_owner_created_idx"),
+        ]
     
+
+
+class SaveDateTombstone(models.Model):
+    """
+    Marks an invitation that left the hot table, deleted or archived, so the
+    change feed can tell clients to drop it.
+
+    Written on the invitation's shard by ``savedate.tombstones``.
+    """
+    save_date_id = models.UUIDField(primary_key=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+        db_constraint=False,
+        db_index=False,
+    )
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # One owner's deletions in change feed order.
+            models.Index(fields=["owner", "deleted_at", "save_date_id"], name="tombstone_owner_deleted_idx"),
+            # Retention: the oldest tombstones of every owner.
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.save_date_id} deleted at {self.deleted_at}"
+
+
+class BackgroundTask(models.Model):
+    """
+    A unit of deferred work queued by ``savedate.tasks.enqueue``.
+
+    ``run_after`` is both the retry schedule of a pending task and the lease
+    expiry of a running one: a task whose worker died is picked up again once
+    its lease runs out.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="task_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class CityStats(models.Model):
+    """
+    Running number of invitations per ``event_city``, maintained by
+    ``savedate.stats`` on every create and delete.
+    """
+    event_city = models.CharField(max_length=100, unique=True)
+    total = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.event_city}: {self.total}"
+
+
+class CityDailyStats(models.Model):
+    """
+    Number of invitations created per ``event_city`` and day.
+    """
+    event_city = models.CharField(max_length=100)
+    day = models.DateField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event_city", "day"], name="city_daily_stats_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["day"], name="city_daily_stats_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_city} {self.day}: {self.count}"
+
+
+class ViewCount(models.Model):
+    """
+    How often a Save the Date invitation was opened.
+
+    Written only by ``savedate.view_counts``, which adds up views in memory and
+    flushes them in batches; not a foreign key, so counts survive archiving.
+    """
+    save_date_id = models.UUIDField(primary_key=True)
+    views = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.save_date_id}: {self.views}"
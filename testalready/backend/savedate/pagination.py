@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+import uuid
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import CursorPagination
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp, pk):
+    """Encode a ``(timestamp, id)`` position as an opaque, URL-safe token."""
+    raw = json.dumps([timestamp.isoformat(), str(pk)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Decode a token produced by :func:`encode_cursor` into ``(datetime, UUID)``."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        timestamp, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        parsed = parse_datetime(timestamp)
+        if parsed is None:
+            raise ValueError(timestamp)
+        return parsed, uuid.UUID(pk)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise InvalidCursor("Invalid cursor.") from exc
+
+
+class ArchiveCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the archive, newest invitations first.
+    """
+    ordering = ("-created_at", "-id")
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = "page_size"
@@ -0,0 +1,332 @@
+"""
+A pre-forking WSGI server for ``manage.py serve``.
+
+The parent process loads and warms the whole application once (settings,
+URLconf, views, serializer fields, the database backend), freezes the
+garbage collector so those objects are never written to again, and then
+forks the workers. Every worker starts warm and shares the parent's memory
+copy-on-write, so neither the first requests nor each extra worker pay for
+the imports again.
+
+Each worker serves one connection at a time from the shared listening socket
+and exits after ``max_requests`` (plus a random jitter, so they do not all
+restart at once); the parent starts a replacement. A connection idle for
+``request_timeout`` seconds is dropped, so slow or stalled clients cannot
+hold on to a worker. Signals to the parent:
+
+* ``SIGTERM``/``SIGINT``: stop accepting, let running requests finish, exit.
+* ``SIGHUP``: graceful reload. The parent re-executes itself with the same
+  socket, so new code and settings are loaded; the old workers keep serving
+  until the new ones are up and then finish their request and exit.
+
+The HTTP side is the standard library's ``wsgiref``: HTTP/1.0, one request
+per connection, no TLS and no buffering of slow clients. Keep it on a
+private address behind a reverse proxy that terminates TLS, keeps client
+connections alive and buffers requests and responses.
+"""
+import gc
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import time
+
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from django.apps import apps
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.urls import get_resolver
+
+from . import maintenance, tasks, view_counts
+
+logger = logging.getLogger(__name__)
+
+# Passed to the re-executed parent on SIGHUP.
+SOCKET_FD_ENV = "SAVEDATE_SERVE_FD"
+OLD_WORKERS_ENV = "SAVEDATE_SERVE_OLD_WORKERS"
+
+
+def warm_up():
+    """
+    Load everything a first request would, and return the WSGI application.
+
+    Database connections are opened to load and initialise the backends,
+    then closed: a connection must never be shared across fork().
+    """
+    from rest_framework import serializers
+    from rest_framework.settings import api_settings
+
+    application = get_wsgi_application()
+    # Imports every view module and compiles the URL patterns.
+    get_resolver().reverse_dict
+    for model in apps.get_models():
+        model._meta.get_fields()
+    for setting in api_settings.defaults:
+        getattr(api_settings, setting)
+    for serializer in _subclasses(serializers.ModelSerializer):
+        if serializer.__module__.startswith("savedate."):
+            serializer().fields
+    for connection in connections.all():
+        connection.ensure_connection()
+    connections.close_all()
+    return application
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def shutdown_worker():
+    """
+    Flush and stop what a worker holds before ``os._exit()``, which skips the
+    atexit hooks: buffered view counts, background threads, open database
+    connections and queued log records.
+    """
+    view_counts.counter.stop()
+    maintenance.scheduler.stop()
+    tasks.stop_runner()
+    connections.close_all()
+    logging.shutdown()
+
+
+class WorkerRequestHandler(WSGIRequestHandler):
+    """
+    wsgiref's request handler, one request per connection, with a socket
+    timeout (the server's ``request_timeout``) and requests logged instead of
+    written to stderr.
+    """
+
+    def setup(self):
+        self.timeout = self.server.request_timeout
+        super().setup()
+
+    def handle(self):
+        try:
+            super().handle()
+        except TimeoutError:
+            # An idle or trickling client; give the worker back.
+            pass
+
+    def get_environ(self):
+        # X-Forwarded_For and X-Forwarded-For would both become
+        # HTTP_X_FORWARDED_FOR; drop the underscore spelling, as WSGI
+        # servers commonly do.
+        for name in {name for name in self.headers if "_" in name}:
+            del self.headers[name]
+        return super().get_environ()
+
+    def log_message(self, format, *args):
+        logger.info("%s %s", self.address_string(), format % args)
+
+
+class WorkerServer(WSGIServer):
+    """wsgiref's WSGIServer, counting the requests it handles."""
+
+    request_queue_size = 128
+    # How long handle_request() waits for a connection.
+    timeout = 1.0
+
+    def __init__(self, *args, ipv6=False, request_timeout=30.0, **kwargs):
+        if ipv6:
+            self.address_family = socket.AF_INET6
+        super().__init__(*args, **kwargs)
+        self.request_timeout = request_timeout
+        self.requests = 0
+
+    def process_request(self, request, client_address):
+        self.requests += 1
+        super().process_request(request, client_address)
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            # The client went away mid-response.
+            return
+        logger.exception("Error serving %s", client_address)
+
+
+class PreforkServer:
+    def __init__(self, address, workers, max_requests=1000, max_requests_jitter=50, graceful_timeout=30,
+                 request_timeout=30, stdout=None):
+        self.address = address
+        self.workers = workers
+        self.request_timeout = request_timeout
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.stdout = stdout or sys.stdout
+        self.children = {}
+        self.stopping = False
+        self.reloading = False
+        self._wakeup = None
+
+    def log(self, message):
+        self.stdout.write(message)
+        self.stdout.flush()
+
+    def run(self):
+        started = time.monotonic()
+        gc.disable()
+        application = warm_up()
+        self.server = self._listen()
+        self.server.set_app(application)
+        # Objects surviving the warm-up are never collected or moved, so the
+        # collector does not touch (and copy) their pages in the workers.
+        gc.freeze()
+        host, port = self.server.socket.getsockname()[:2]
+        self.log(f"Warmed up in {time.monotonic() - started:.2f}s; listening on http://{host}:{port}/")
+
+        self._install_signals()
+        for _ in range(self.workers):
+            self._spawn()
+        self._retire_old_workers()
+        while True:
+            self._wait()
+            if self.stopping:
+                self._stop()
+                return
+            if self.reloading:
+                self._reload()
+            self._reap()
+            while len(self.children) < self.workers and not self.stopping:
+                self._spawn()
+
+    def _listen(self):
+        host, port = self.address
+        ipv6 = ":" in host
+        inherited = os.environ.pop(SOCKET_FD_ENV, None)
+        options = {"ipv6": ipv6, "request_timeout": self.request_timeout}
+        if inherited is None:
+            server = WorkerServer((host, port), WorkerRequestHandler, **options)
+        else:
+            server = WorkerServer((host, port), WorkerRequestHandler, bind_and_activate=False, **options)
+            server.socket.close()
+            server.socket = socket.socket(fileno=int(inherited))
+            server.server_address = server.socket.getsockname()
+            server.server_name, server.server_port = host, server.server_address[1]
+            server.setup_environ()
+        # Idle workers poll the socket; whoever loses the race for a
+        # connection gets EAGAIN instead of blocking in accept().
+        server.socket.setblocking(False)
+        return server
+
+    def _install_signals(self):
+        read, write = os.pipe()
+        os.set_blocking(write, False)
+        self._wakeup = read
+        signal.set_wakeup_fd(write)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_reload(self, signum, frame):
+        self.reloading = True
+
+    def _wait(self):
+        if self.stopping or self.reloading:
+            return
+        if select.select([self._wakeup], [], [], 1.0)[0]:
+            os.read(self._wakeup, 1024)
+
+    def _spawn(self):
+        limit = self.max_requests + random.randint(0, self.max_requests_jitter) if self.max_requests else 0
+        pid = os.fork()
+        if pid:
+            self.children[pid] = limit
+            return
+        try:
+            status = Worker(self.server, limit).run()
+        except BaseException:
+            logger.exception("Worker %s crashed", os.getpid())
+            status = 1
+        finally:
+            # Never return into the parent's code further up the stack.
+            try:
+                shutdown_worker()
+            finally:
+                os._exit(status)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            if self.children.pop(pid, None) is not None and not self.stopping:
+                code = os.waitstatus_to_exitcode(status)
+                if code:
+                    self.log(f"Worker {pid} exited with {code}; starting a replacement.")
+                else:
+                    self.log(f"Worker {pid} recycled after its request limit.")
+
+    def _signal_children(self, pids, signum=signal.SIGTERM):
+        for pid in pids:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _stop(self):
+        self.log("Shutting down; waiting for running requests.")
+        self._signal_children(list(self.children))
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        self._signal_children(list(self.children), signal.SIGKILL)
+        self._reap()
+        self.server.server_close()
+
+    def _reload(self):
+        self.log("Reloading.")
+        signal.set_wakeup_fd(-1)
+        fd = self.server.socket.fileno()
+        os.set_inheritable(fd, True)
+        os.environ[SOCKET_FD_ENV] = str(fd)
+        os.environ[OLD_WORKERS_ENV] = ",".join(str(pid) for pid in self.children)
+        sys.stdout.flush()
+        # exec keeps our pid, so the old workers stay our children and keep
+        # serving while the new code warms up.
+        os.execv(sys.executable, sys.orig_argv)
+
+    def _retire_old_workers(self):
+        old = os.environ.pop(OLD_WORKERS_ENV, "")
+        if old:
+            self._signal_children(int(pid) for pid in old.split(","))
+            self.log("Reloaded; the previous workers are finishing their requests.")
+
+
+class Worker:
+    def __init__(self, server, max_requests):
+        self.server = server
+        self.max_requests = max_requests
+        self.alive = True
+        self.parent = os.getppid()
+
+    def run(self):
+        gc.enable()
+        signal.set_wakeup_fd(-1)
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._on_stop)
+        for signum in (signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        while self.alive and os.getppid() == self.parent:
+            self.server.handle_request()
+            if self.max_requests and self.server.requests >= self.max_requests:
+                break
+        connections.close_all()
+        return 0
+
+    def _on_stop(self, signum, frame):
+        self.alive = False
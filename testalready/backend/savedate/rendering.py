@@ -0,0 +1,64 @@
+"""
+Pre-rendered API JSON of SaveDate rows.
+
+Every save renders the row through ``SaveDateReadSerializer`` once and stores
+the bytes the API would send in ``SaveDate.rendered_json`` (see
+``RenderedJSONField``). The list and detail endpoints then answer by joining
+the stored strings instead of serializing each row per request.
+
+``manage.py check_rendered_json`` reports rows whose stored JSON no longer
+matches a fresh rendering, e.g. after the serializer changed, and ``--fix``
+rewrites them.
+"""
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .serializers import SaveDateReadSerializer
+
+_renderer = JSONRenderer()
+
+
+def render(save_date):
+    """The JSON ``SaveDateReadSerializer`` + ``JSONRenderer`` produce for the row."""
+    return _renderer.render(SaveDateReadSerializer(save_date).data).decode()
+
+
+def render_list(rendered):
+    """Join already rendered objects into a JSON array."""
+    return "[" + ",".join(rendered) + "]"
+
+
+class PrerenderedResponse(Response):
+    """
+    A Response carrying its JSON body already rendered.
+
+    The stored body is sent as is when the client negotiated plain JSON;
+    other renderers (the browsable API, indented JSON) render ``data``, which
+    is parsed from the body on first access.
+    """
+
+    def __init__(self, content, **kwargs):
+        self.prerendered = content.encode() if isinstance(content, str) else content
+        self._data = None
+        super().__init__(None, **kwargs)
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self.prerendered)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, "accepted_renderer", None)
+        media_type = getattr(self, "accepted_media_type", None) or ""
+        if type(renderer) is not JSONRenderer or "indent" in media_type:
+            return super().rendered_content
+        self["Content-Type"] = self.content_type or renderer.media_type
+        return self.prerendered
@@ -0,0 +1,210 @@
+"""
+Primary/replica database routing.
+
+Writes always go to ``default``. Reads go to one of the aliases listed in
+``SAVEDATE_DB_REPLICAS`` only inside a safe (GET/HEAD/OPTIONS) request, as
+marked by ``ReplicaRoutingMiddleware``; background tasks, management commands
+and the write path itself keep reading the primary.
+
+Read-your-writes: after a write the middleware pins the writer's following
+requests to the primary for ``SAVEDATE_DB_PIN_SECONDS``. The pin is a
+short-lived cookie and, for an authenticated user, an entry keyed by their id
+in the ``SAVEDATE_DB_PIN_CACHE`` cache, so it also holds for token clients
+that drop cookies and for the user's other devices.
+
+Lag: each process checks every ``SAVEDATE_DB_REPLICA_CHECK_INTERVAL`` seconds
+how far each replica trails the primary, measured as the difference between
+their newest ``SaveDate.updated_at``. Replicas further behind than
+``SAVEDATE_DB_REPLICA_MAX_LAG`` seconds, or that cannot be queried, are
+skipped; with none left, reads fall back to the primary.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = "savedate_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_use_replica = contextvars.ContextVar("savedate_use_replica", default=False)
+
+
+def _pin_key(user_id):
+    return f"savedate:primary-until:{user_id}"
+
+
+def _user_id(request):
+    """
+    Id of the user making ``request``, or None. Runs before DRF authenticates
+    the request, so a token is looked up here.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    keyword, _, key = request.headers.get("Authorization", "").partition(" ")
+    if keyword == "Token" and key.strip():
+        from rest_framework.authtoken.models import Token
+
+        return Token.objects.filter(key=key.strip()).values_list("user_id", flat=True).first()
+    return None
+
+
+def replica_aliases():
+    return getattr(settings, "SAVEDATE_DB_REPLICAS", [])
+
+
+def pin_cache():
+    return caches[getattr(settings, "SAVEDATE_DB_PIN_CACHE", "savedate_pins")]
+
+
+def pins_are_per_process():
+    """Whether the pin cache lives in each process's memory, unseen by the others."""
+    return isinstance(pin_cache(), LocMemCache)
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Let reads inside the block go to a replica (or force the primary)."""
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaHealth:
+    """Per-process cache of which replicas are currently fresh enough to read."""
+
+    def __init__(self):
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias):
+        interval = getattr(settings, "SAVEDATE_DB_REPLICA_CHECK_INTERVAL", 5)
+        now = time.monotonic()
+        with self._lock:
+            checked_at, healthy = self._checked.get(alias, (None, False))
+            if checked_at is not None and now - checked_at < interval:
+                return healthy
+            # Claim the check so concurrent requests keep using the last answer.
+            self._checked[alias] = (now, healthy if checked_at is not None else False)
+        healthy = self.check(alias)
+        with self._lock:
+            self._checked[alias] = (time.monotonic(), healthy)
+        return healthy
+
+    def check(self, alias):
+        max_lag = getattr(settings, "SAVEDATE_DB_REPLICA_MAX_LAG", 10)
+        try:
+            lag = self.lag(alias)
+        except DatabaseError:
+            logger.warning("Replica %s is unavailable, reading from the primary", alias, exc_info=True)
+            return False
+        if lag > max_lag:
+            logger.warning("Replica %s is %.1fs behind, reading from the primary", alias, lag)
+            return False
+        return True
+
+    def lag(self, alias):
+        """Seconds between the newest write on the primary and on ``alias``."""
+        primary = self._newest_update(DEFAULT_DB_ALIAS)
+        replica = self._newest_update(alias)
+        if primary is None:
+            return 0.0
+        if replica is None:
+            return float("inf")
+        return max((primary - replica).total_seconds(), 0.0)
+
+    def _newest_update(self, alias):
+        from .models import SaveDate
+
+        connection = connections[alias]
+        table = connection.ops.quote_name(SaveDate._meta.db_table)
+        with connection.cursor() as cursor:
+            # Served from the (updated_at, id) index.
+            cursor.execute(f"SELECT MAX(updated_at) FROM {table}")
+            value = cursor.fetchone()[0]
+        if isinstance(value, str):
+            value = parse_datetime(value)
+        return value
+
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+
+health = ReplicaHealth()
+
+
+class PrimaryReplicaRouter:
+    """Send reads to a fresh replica when allowed; everything else to ``default``."""
+
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        replicas = [alias for alias in replica_aliases() if health.is_healthy(alias)]
+        if not replicas:
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data, so rows from any alias may be related.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema by being copied from the primary.
+        return db not in replica_aliases()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allow replica reads for safe requests and pin clients after their writes.
+
+    Disabled when no replicas are configured.
+    """
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        allowed = request.method in SAFE_METHODS and not self.is_pinned(request)
+        with use_replica(allowed):
+            response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_seconds = getattr(settings, "SAVEDATE_DB_PIN_SECONDS", 15)
+            until = int(time.time() + pin_seconds)
+            response.set_cookie(PIN_COOKIE, str(until), max_age=pin_seconds, httponly=True, samesite="Lax")
+            # DRF has authenticated the request by now, whatever the scheme.
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                self.cache.set(_pin_key(user.pk), until, pin_seconds)
+        return response
+
+    @property
+    def cache(self):
+        return pin_cache()
+
+    def is_pinned(self, request):
+        try:
+            if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        user_id = _user_id(request)
+        return user_id is not None and self.cache.get(_pin_key(user_id), 0) > time.time()
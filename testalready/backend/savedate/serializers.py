@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import SaveDate
+from rest_framework.fields import empty
+from . import tracing
+from .models import ArchivedSaveDate, SaveDate
 
 
 class EventTimeSerializer(serializers.Serializer):
@@ -10,18 +12,28 @@ class EventTimeSerializer(serializers.Serializer):
     )
 
 
+class EventTimeListSerializer(serializers.ListSerializer):
+    """
+    Validates the list of event times, traced as one span for all children.
+    """
+    def run_validation(self, data=empty):
+        count = len(data) if isinstance(data, list) else 0
+        with tracing.span("EventTimeSerializer", {"savedate.event_times": count}):
+            return super().run_validation(data)
+
+
 class SaveDateWriteSerializer(serializers.ModelSerializer):
     """
-    Serializer for writing SaveDate data (used in POST).
+    Serializer for writing SaveDate data (used in POST, PUT and PATCH).
     """
-    event_times = serializers.ListSerializer(
+    event_times = EventTimeListSerializer(
         child=EventTimeSerializer(),
         allow_empty=False
     )
 
     class Meta:
         model = SaveDate
-        exclude = ["id", "created_at", "updated_at"]
+        exclude = ["id", "owner", "city_key", "created_at", "updated_at", "version", "rendered_json"]
 
    
 
@@ -31,4 +43,13 @@ class SaveDateReadSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = SaveDate
-        fields = "__all__"
+        exclude = ["owner", "city_key", "rendered_json"]
+
+
+class ArchivedSaveDateReadSerializer(serializers.ModelSerializer):
+    """
+    Serializer for reading archived SaveDate data (used in GET).
+    """
+    class Meta:
+        model = ArchivedSaveDate
+        exclude = ["owner", "city_key"]
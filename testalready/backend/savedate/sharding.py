@@ -0,0 +1,150 @@
+"""
+Hash sharding of SaveDate rows across several databases.
+
+``SAVEDATE_SHARDS`` lists the DATABASES aliases that hold SaveDate rows,
+starting with ``default``; a row lives on ``shard_for(id)``. Everything a
+create writes in its transaction lives on the same shard: the row, its
+per-city stats and its background tasks. Its view count is flushed there
+too, as is its tombstone once it is deleted. Stats are therefore partial
+per shard and summed by the readers; the archive and auth tables stay on
+``default``.
+
+With one shard (the default) every helper here is a no-op, so the replica
+router keeps deciding where reads go.
+"""
+import heapq
+from collections import defaultdict
+from itertools import islice
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, models
+
+SHARDED_MODELS = {"savedate", "savedatetombstone", "citystats", "citydailystats", "backgroundtask", "viewcount"}
+
+
+def shard_aliases():
+    aliases = list(getattr(settings, "SAVEDATE_SHARDS", None) or [DEFAULT_DB_ALIAS])
+    if aliases[0] != DEFAULT_DB_ALIAS:
+        raise ImproperlyConfigured("SAVEDATE_SHARDS must start with 'default'.")
+    return aliases
+
+
+def is_sharded():
+    return len(shard_aliases()) > 1
+
+
+def shard_for(pk):
+    """Alias of the database holding the SaveDate with id ``pk``."""
+    aliases = shard_aliases()
+    if len(aliases) == 1:
+        return aliases[0]
+    return aliases[UUID(str(pk)).int % len(aliases)]
+
+
+def group_by_shard(save_dates):
+    """``{alias: [save_date, ...]}`` for instances with their ids set."""
+    groups = defaultdict(list)
+    for save_date in save_dates:
+        groups[shard_for(save_date.pk)].append(save_date)
+    return groups
+
+
+def on_shards(queryset):
+    """The querysets that together cover ``queryset`` on every shard."""
+    if not is_sharded():
+        return [queryset]
+    return [queryset.using(alias) for alias in shard_aliases()]
+
+
+def for_pk(queryset, pk):
+    """``queryset`` restricted to the shard that holds ``pk``."""
+    if not is_sharded():
+        return queryset
+    return queryset.using(shard_for(pk))
+
+
+def merged(queryset, ordering, limit=None):
+    """
+    Run ``queryset`` on every shard and k-way merge the results by ``ordering``.
+
+    Each shard returns at most ``limit`` rows already sorted by its index, so
+    the merge reads O(shards * limit) rows and the result matches what one
+    database holding every row would return. ``ordering`` must be unique
+    (end with the primary key) and go in one direction.
+    """
+    descending = {field.startswith("-") for field in ordering}
+    if len(descending) != 1:
+        raise ValueError("merged() needs every ordering field in the same direction.")
+    reverse = descending.pop()
+    fields = [field.lstrip("-") for field in ordering]
+
+    queryset = queryset.order_by(*ordering)
+    if limit is not None:
+        queryset = queryset[:limit]
+    shards = on_shards(queryset)
+    if len(shards) == 1:
+        return list(shards[0])
+
+    def key(obj):
+        return tuple(getattr(obj, field) for field in fields)
+
+    rows = heapq.merge(*(list(shard) for shard in shards), key=key, reverse=reverse)
+    return list(islice(rows, limit))
+
+
+class SaveDateQuerySet(models.QuerySet):
+    """Sends creates to the shard of each row unless ``using()`` chose one."""
+
+    def create(self, **kwargs):
+        if self._db is not None or not is_sharded():
+            return super().create(**kwargs)
+        obj = self.model(**kwargs)
+        # Without an explicit alias, save() asks ShardRouter with the instance.
+        obj.save(force_insert=True)
+        return obj
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if self._db is not None or not is_sharded():
+            return super().bulk_create(objs, *args, **kwargs)
+        objs = list(objs)
+        for alias, shard_objs in group_by_shard(objs).items():
+            self.using(alias).bulk_create(shard_objs, *args, **kwargs)
+        return objs
+
+
+class ShardRouter:
+    """
+    Route SaveDate instances to their shard and keep the sharded tables off
+    the other apps' migrations on the extra shards.
+
+    Must come before ``PrimaryReplicaRouter`` in ``DATABASE_ROUTERS``.
+    """
+
+    def _for_instance(self, model, hints):
+        if model._meta.label_lower != "savedate.savedate" or not is_sharded():
+            return None
+        instance = hints.get("instance")
+        # Assigning an owner asks about the SaveDate with the user as instance.
+        if not isinstance(instance, model) or instance.pk is None:
+            return None
+        return shard_for(instance.pk)
+
+    def db_for_read(self, model, **hints):
+        return self._for_instance(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._for_instance(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # An invitation on any shard may point at its owner on default.
+        if is_sharded() and "savedate.savedate" in {obj1._meta.label_lower, obj2._meta.label_lower}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == DEFAULT_DB_ALIAS or db not in shard_aliases():
+            return None
+        # Data migrations (no model_name) only ever run on default.
+        return app_label == "savedate" and model_name in SHARDED_MODELS
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import snapshots, stats, tombstones
+from .models import SaveDate
+
+
+@receiver(post_save, sender=SaveDate)
+def count_created_save_date(sender, instance, created, raw=False, using=None, **kwargs):
+    if created and not raw:
+        stats.record_created([instance], using)
+
+
+@receiver(post_delete, sender=SaveDate)
+def count_deleted_save_date(sender, instance, using=None, **kwargs):
+    if not stats.is_suspended():
+        stats.record_deleted([instance], using)
+
+
+@receiver(post_save, sender=SaveDate)
+def refresh_snapshot(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        snapshots.schedule(instance.pk, instance.version, using)
+
+
+@receiver(post_delete, sender=SaveDate)
+def leave_tombstone(sender, instance, using=None, **kwargs):
+    # The archiver writes its batch's tombstones itself.
+    if not tombstones.is_suspended():
+        tombstones.leave([(instance.pk, instance.owner_id)], using)
+
+
+@receiver(post_delete, sender=SaveDate)
+def remove_snapshot(sender, instance, using=None, **kwargs):
+    snapshots.deleted(instance.pk, using)
@@ -0,0 +1,102 @@
+"""
+Slow-query log.
+
+Every database connection gets an execute wrapper that times each statement.
+Statements slower than ``SAVEDATE_SLOW_QUERY_MS`` are logged to the
+``savedate.slow_queries`` logger as one JSON object carrying the SQL (with
+placeholders, never values), the shape of its parameters, the duration, the
+view being served and, on SQLite, the ``EXPLAIN QUERY PLAN`` taken right
+after the statement ran. ``None`` disables the log.
+
+``SlowQueryViewMiddleware`` records which view is running; queries outside a
+request are attributed to ``None``.
+"""
+import contextvars
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError
+
+logger = logging.getLogger("savedate.slow_queries")
+
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+_current_view = contextvars.ContextVar("savedate_current_view", default=None)
+
+
+def param_shape(params, many=False):
+    """Type names of ``params`` (or of the first row and the row count with ``many``)."""
+    if many:
+        params = list(params or [])
+        return {"rows": len(params), "first": param_shape(params[0]) if params else []}
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+def explain(connection, sql, params):
+    """``EXPLAIN QUERY PLAN`` rows for ``sql``, or ``None`` when not available."""
+    if connection.vendor != "sqlite" or not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    # A fresh backend cursor: it skips the execute wrappers and leaves the
+    # caller's cursor and its pending results alone.
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+    except DatabaseError as exc:
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        cursor.close()
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection by ``install``."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        threshold = getattr(settings, "SAVEDATE_SLOW_QUERY_MS", None)
+        if threshold is not None and duration_ms >= threshold:
+            connection = context["connection"]
+            plan_params = (list(params)[0] if params else None) if many else params
+            logger.warning(json.dumps({
+                "duration_ms": round(duration_ms, 3),
+                "database": connection.alias,
+                "view": _current_view.get(),
+                "sql": sql,
+                "params": param_shape(params, many),
+                "plan": explain(connection, sql, plan_params),
+            }, ensure_ascii=False))
+
+
+def install(sender, connection, **kwargs):
+    """``connection_created`` receiver adding the wrapper once per connection."""
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
+
+
+class SlowQueryViewMiddleware:
+    """Tag the slow queries of a request with the name of its view."""
+
+    def __init__(self, get_response):
+        if getattr(settings, "SAVEDATE_SLOW_QUERY_MS", None) is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _current_view.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        _current_view.set(match.view_name if match and match.view_name else view_func.__qualname__)
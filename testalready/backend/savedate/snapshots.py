@@ -0,0 +1,225 @@
+"""
+Static snapshots of SaveDate invitations.
+
+With ``SAVEDATE_SNAPSHOT_DIR`` set, every invitation is also kept as two
+files in that directory: ``<id>.json``, the exact body of the detail
+endpoint, and ``<id>.html``, a standalone guest page that reports each view
+to the hit endpoint with a beacon. A file server or reverse proxy can answer
+guests from them and fall back to Django's ``/i/<id>`` page, which renders
+the same HTML from the row, when a file is missing, e.g. (nginx)::
+
+    location ~ ^/i/(?<id>[0-9a-f-]+)$ {
+        root /srv/savedate/snapshots;
+        try_files /$id.html @django;
+    }
+    location @django {
+        proxy_pass http://127.0.0.1:8000;
+    }
+
+Every write of an invitation queues the ``savedate.write_snapshot`` task in
+the same transaction: ``SaveDate.save()`` (the API's create, the admin) from
+a ``post_save`` receiver, the versioned update of ``savedate.updates``, which
+runs no signals, itself, and writers that bypass both (bulk imports, the
+``check_rendered_json --fix`` repair) through :func:`schedule_many`. An
+update also removes the previous snapshot as soon as it commits, so a stale
+page is never served while the new one is pending. Deleting (or archiving)
+an invitation removes its files from a ``post_delete`` receiver.
+
+Files are replaced atomically (written to a temporary file, then renamed),
+and a snapshot never replaces one of a newer version, so tasks finishing out
+of order cannot bring back stale content. The version check and the replace
+hold a lock picked by the invitation's id. ``manage.py rebuild_snapshots``
+rewrites every snapshot in parallel and removes orphaned files.
+"""
+import fcntl
+import json
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+
+from .models import SaveDate
+from .sharding import shard_for
+from .tasks import enqueue, task
+
+SUFFIXES = (".html", ".json")
+
+LOCK_STRIPES = 256
+
+PAGE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<meta property="og:title" content="{title}">
+<meta property="og:description" content="{summary}">
+</head>
+<body>
+<main class="save-date">
+<h1>{title}</h1>
+<p class="summary">{summary}</p>
+<ul class="times">
+{times}
+</ul>
+<p class="venue">{venue}</p>
+<address>{address}<br>{city}</address>
+</main>
+<script>navigator.sendBeacon("{hit_url}");</script>
+</body>
+</html>
+"""
+
+
+def enabled():
+    return getattr(settings, "SAVEDATE_SNAPSHOT_DIR", None) is not None
+
+
+def directory():
+    return Path(settings.SAVEDATE_SNAPSHOT_DIR)
+
+
+def paths(pk, root=None):
+    root = Path(root or directory())
+    return [root / f"{pk}{suffix}" for suffix in SUFFIXES]
+
+
+def render_html(data):
+    """The guest page of an invitation, from its API JSON."""
+    return format_html(
+        PAGE,
+        title=data["title"],
+        summary=data["event_summary"],
+        times=format_html_join(
+            "\n", '<li><time>{}</time> {}</li>', ((item["time"], item["label"]) for item in data["event_times"])
+        ),
+        venue=data["event_venue"],
+        address=data["event_address"],
+        city=data["event_city"],
+        hit_url=reverse("save-date-hit", args=[data["id"]]),
+    )
+
+
+@contextmanager
+def _locked(root, pk):
+    # Serializes the version check and the replace of one invitation across
+    # processes. Invitations share one of LOCK_STRIPES lock files, picked by
+    # id, so writers of different invitations rarely wait on each other and
+    # lock files do not pile up.
+    locks = root / ".locks"
+    locks.mkdir(parents=True, exist_ok=True)
+    with open(locks / f"{uuid.UUID(str(pk)).int % LOCK_STRIPES}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def _write_atomic(path, content):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(content)
+        # mkstemp creates the file readable by its owner only.
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def stored_version(pk, root=None):
+    """Version of the invitation's current snapshot, or ``None`` if it has none."""
+    json_path = paths(pk, root)[1]
+    try:
+        with open(json_path, encoding="utf-8") as fh:
+            return json.load(fh)["version"]
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def write(rendered_json, root=None):
+    """Write the snapshot of a row's ``rendered_json``; returns False if a newer one exists."""
+    root = Path(root or directory())
+    data = json.loads(rendered_json)
+    html_path, json_path = paths(data["id"], root)
+    html = render_html(data).encode()
+    with _locked(root, data["id"]):
+        stored = stored_version(data["id"], root)
+        if stored is not None and stored > data["version"]:
+            return False
+        # The JSON goes last: its version is what later writers compare with.
+        _write_atomic(html_path, html)
+        _write_atomic(json_path, rendered_json.encode())
+    return True
+
+
+def invalidate(pk, below_version=None, root=None):
+    """Remove the invitation's snapshot, or only one older than ``below_version``."""
+    root = Path(root or directory())
+    with _locked(root, pk):
+        stored = stored_version(pk, root)
+        if below_version is not None and stored is not None and stored >= below_version:
+            return
+        for path in paths(pk, root):
+            path.unlink(missing_ok=True)
+
+
+def schedule(pk, version, using):
+    """
+    Queue writing the snapshot of row ``pk`` in the caller's transaction on
+    ``using``; once it commits, snapshots older than ``version`` are removed.
+    """
+    if not enabled():
+        return
+    pk = str(pk)
+    if version > 1:
+        transaction.on_commit(lambda: invalidate(pk, below_version=version), using=using)
+    enqueue("savedate.write_snapshot", using=using, save_date_id=pk)
+
+
+def schedule_many(pks, using):
+    """Queue one task writing the snapshots of the rows ``pks`` on ``using``."""
+    if enabled() and pks:
+        enqueue("savedate.write_snapshots", using=using, save_date_ids=[str(pk) for pk in pks])
+
+
+def deleted(pk, using):
+    """Remove the snapshot of a deleted row once the deletion commits."""
+    if enabled():
+        transaction.on_commit(lambda: invalidate(str(pk)), using=using)
+
+
+@task("savedate.write_snapshot")
+def write_snapshot(save_date_id):
+    # Always the row's current state, so a retried or late task is harmless.
+    rendered = (
+        SaveDate.objects.using(shard_for(save_date_id))
+        .filter(pk=save_date_id)
+        .values_list("rendered_json", flat=True)
+        .first()
+    )
+    if rendered is None:
+        invalidate(save_date_id)
+    else:
+        write(rendered)
+
+
+@task("savedate.write_snapshots")
+def write_snapshots(save_date_ids):
+    rendered = dict(
+        SaveDate.objects.using(shard_for(save_date_ids[0]))
+        .filter(pk__in=save_date_ids)
+        .values_list("pk", "rendered_json")
+    )
+    for save_date_id in save_date_ids:
+        pk = uuid.UUID(save_date_id)
+        if pk in rendered:
+            write(rendered[pk])
+        else:
+            invalidate(save_date_id)
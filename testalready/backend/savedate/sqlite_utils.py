@@ -0,0 +1,50 @@
+"""
+Helpers for copying live SQLite databases.
+"""
+import sqlite3
+import time
+
+
+def copy_database(source, target, pages=-1, sleep=0.0, progress=None):
+    """
+    Copy the SQLite database at ``source`` into ``target`` with the online
+    backup API.
+
+    The copy is a consistent snapshot even while other processes write to
+    ``source``. ``pages`` bounds how many pages are copied per step, and
+    ``sleep`` seconds are slept between steps so writers are not starved
+    (the backup API itself only sleeps when the source is busy or locked);
+    the defaults copy everything in one step. ``source`` may also be an open
+    ``sqlite3.Connection``, which is left open. ``progress(remaining, total)``
+    is called after every step. Returns the number of pages copied.
+    """
+    own_source = not isinstance(source, sqlite3.Connection)
+    source_conn = sqlite3.connect(source) if own_source else source
+    target_conn = sqlite3.connect(target)
+    copied = 0
+
+    def on_step(status, remaining, total):
+        nonlocal copied
+        copied = total - remaining
+        if progress is not None:
+            progress(remaining, total)
+        if sleep and remaining:
+            time.sleep(sleep)
+
+    try:
+        source_conn.backup(target_conn, pages=pages, progress=on_step, sleep=sleep)
+    finally:
+        target_conn.close()
+        if own_source:
+            source_conn.close()
+    return copied
+
+
+def integrity_errors(path):
+    """The problems ``PRAGMA integrity_check`` finds in the database at ``path``; empty if none."""
+    conn = sqlite3.connect(path)
+    try:
+        rows = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+    finally:
+        conn.close()
+    return [] if rows == ["ok"] else rows
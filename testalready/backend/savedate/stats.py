@@ -0,0 +1,122 @@
+"""
+Incrementally maintained per-city invitation statistics.
+
+``CityStats`` and ``CityDailyStats`` are adjusted in the same transaction as
+each create and delete, so the stats endpoint reads O(cities) rows instead of
+aggregating the whole SaveDate table. ``manage.py rebuild_city_stats``
+recomputes both tables from scratch.
+
+Archived invitations keep counting: the archiver moves rows inside
+``suspended()`` so the move is not seen as a deletion.
+
+With several shards each shard counts its own rows (archived rows are
+counted on ``default``), and readers sum over ``sharding.on_shards``.
+"""
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ArchivedSaveDate, CityDailyStats, CityStats, SaveDate
+from .sharding import shard_aliases
+
+_suspended = contextvars.ContextVar("savedate_stats_suspended", default=False)
+
+
+@contextmanager
+def suspended():
+    """Skip stats maintenance for rows deleted inside the block."""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def is_suspended():
+    return _suspended.get()
+
+
+def _bump(model, lookup, field, delta, using):
+    rows = model.objects.using(using)
+    updated = rows.filter(**lookup).update(**{field: F(field) + delta})
+    if updated or delta < 0:
+        return
+    try:
+        with transaction.atomic(using=using):
+            rows.create(**lookup, **{field: delta})
+    except IntegrityError:
+        # Another writer created the row first.
+        rows.filter(**lookup).update(**{field: F(field) + delta})
+
+
+def record(changes, using=DEFAULT_DB_ALIAS):
+    """
+    Apply ``{(event_city, day): delta}`` to both stats tables of the
+    database ``using`` atomically.
+    """
+    city_totals = Counter()
+    with transaction.atomic(using=using):
+        for (event_city, day), delta in changes.items():
+            if delta:
+                _bump(CityDailyStats, {"event_city": event_city, "day": day}, "count", delta, using)
+                city_totals[event_city] += delta
+        for event_city, delta in city_totals.items():
+            if delta:
+                _bump(CityStats, {"event_city": event_city}, "total", delta, using)
+
+
+def stats_key(event_city, created_at):
+    return event_city, timezone.localdate(created_at)
+
+
+def record_created(save_dates, using=DEFAULT_DB_ALIAS):
+    record(Counter(stats_key(s.event_city, s.created_at) for s in save_dates), using)
+
+
+def record_deleted(save_dates, using=DEFAULT_DB_ALIAS):
+    deleted = Counter(stats_key(s.event_city, s.created_at) for s in save_dates)
+    # Not -deleted: a Counter's unary minus drops the negative counts.
+    record({key: -count for key, count in deleted.items()}, using)
+
+
+def rebuild():
+    """Recompute both stats tables of every shard from the hot and archive tables."""
+    cities, city_days = set(), set()
+    for alias in shard_aliases():
+        sources = [SaveDate, ArchivedSaveDate] if alias == DEFAULT_DB_ALIAS else [SaveDate]
+        # Read and rewrite in one transaction, so rows written in between
+        # are neither lost nor counted twice.
+        with transaction.atomic(using=alias):
+            daily = Counter()
+            for model in sources:
+                rows = (
+                    model.objects.using(alias).annotate(day=TruncDate("created_at"))
+                    .values("event_city", "day")
+                    .annotate(n=Count("pk"))
+                    .order_by()
+                )
+                for row in rows:
+                    daily[(row["event_city"], row["day"])] += row["n"]
+
+            totals = Counter()
+            for (event_city, _), n in daily.items():
+                totals[event_city] += n
+
+            CityDailyStats.objects.using(alias).all().delete()
+            CityStats.objects.using(alias).all().delete()
+            CityDailyStats.objects.using(alias).bulk_create(
+                [CityDailyStats(event_city=city, day=day, count=n) for (city, day), n in daily.items()],
+                batch_size=1000,
+            )
+            CityStats.objects.using(alias).bulk_create(
+                [CityStats(event_city=city, total=n) for city, n in totals.items()],
+                batch_size=1000,
+            )
+        cities.update(totals)
+        city_days.update(daily)
+    return len(cities), len(city_days)
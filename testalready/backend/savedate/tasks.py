@@ -0,0 +1,325 @@
+"""
+In-process background tasks backed by the ``BackgroundTask`` table.
+
+``enqueue`` inserts a row in the caller's transaction, so a task exists if and
+only if the work that scheduled it was committed, and it survives restarts.
+A ``TaskRunner`` (started lazily in each process, or as a dedicated process
+with ``manage.py run_tasks``) claims due rows and runs them on a thread pool,
+retrying failures with exponential backoff.
+
+Tasks must be idempotent: a task whose worker dies mid-run is retried once its
+lease expires, unless that was its last attempt. While a task runs, its
+runner keeps pushing the lease back, so a long task is not taken over.
+
+With several shards a task is stored on the shard whose transaction queued
+it, and runners claim from every shard.
+"""
+import logging
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import BackgroundTask
+from .sharding import shard_aliases
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(name, max_attempts=None):
+    """Register ``func`` as the handler for tasks called ``name``."""
+    def decorator(func):
+        func.task_name = name
+        func.max_attempts = max_attempts
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, using=DEFAULT_DB_ALIAS, **payload):
+    """
+    Queue the task ``name`` with JSON-serializable keyword arguments.
+
+    The row joins the current transaction on the database ``using``; the local
+    runner is woken once it commits. With ``SAVEDATE_TASKS_EAGER`` the task
+    runs inline instead.
+    """
+    if name not in _registry:
+        raise KeyError(f"Unknown task: {name}")
+    if getattr(settings, "SAVEDATE_TASKS_EAGER", False):
+        _registry[name](**payload)
+        return None
+
+    handler = _registry[name]
+    background_task = BackgroundTask.objects.using(using).create(
+        name=name,
+        payload=payload,
+        max_attempts=handler.max_attempts or getattr(settings, "SAVEDATE_TASKS_MAX_ATTEMPTS", 3),
+    )
+    transaction.on_commit(lambda: get_runner().wake(), using=using)
+    return background_task
+
+
+class TaskRunner:
+    def __init__(self, concurrency=4, poll_interval=1.0, lease_seconds=300):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease_seconds)
+        self._executor = None
+        self._dispatcher = None
+        self._heartbeat = None
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._slots = threading.Semaphore(concurrency)
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+        self._claims = 0
+
+    def start(self):
+        if self._dispatcher is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="savedate-task")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="savedate-task-dispatcher", daemon=True)
+        self._dispatcher.start()
+        self._heartbeat = threading.Thread(target=self._beat, name="savedate-task-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def stop(self, wait=True):
+        self._stopped.set()
+        self._wake.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def wake(self):
+        self._wake.set()
+
+    def _dispatch(self):
+        while not self._stopped.is_set():
+            try:
+                claimed = self._dispatch_once()
+                close_old_connections()
+            except Exception:
+                logger.exception("Background task dispatcher failed")
+                claimed = []
+            if not claimed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _dispatch_once(self):
+        # Claim no more tasks than there are free workers: a claimed task
+        # waiting for a slot is not in _running, so its lease is not renewed.
+        self._slots.acquire()
+        free = 1
+        while free < self.concurrency and self._slots.acquire(blocking=False):
+            free += 1
+        submitted = 0
+        try:
+            claimed = self.claim(limit=free) if not self._stopped.is_set() else []
+            for background_task in claimed:
+                self._executor.submit(self._run_in_thread, background_task)
+                submitted += 1
+        finally:
+            for _ in range(free - submitted):
+                self._slots.release()
+        return claimed
+
+    def _beat(self):
+        # Renew well before expiry, on a thread of its own: the dispatcher
+        # waits for a free slot while every worker is busy.
+        while not self._stopped.wait(self.lease.total_seconds() / 3):
+            try:
+                self.renew_leases()
+                close_old_connections()
+            except Exception:
+                logger.exception("Background task heartbeat failed")
+
+    def renew_leases(self):
+        """Push back the lease of every task this runner is executing."""
+        with self._running_lock:
+            running = list(self._running)
+        by_alias = defaultdict(list)
+        for alias, pk, attempts in running:
+            by_alias[alias].append(Q(pk=pk, attempts=attempts))
+        now = timezone.now()
+        for alias, claims in by_alias.items():
+            # The attempts pin the renewal to this runner's claim.
+            BackgroundTask.objects.using(alias).filter(
+                Q(*claims, _connector=Q.OR), status=BackgroundTask.RUNNING
+            ).update(run_after=now + self.lease, updated_at=now)
+
+    def _run_in_thread(self, background_task):
+        try:
+            self.execute(background_task)
+        finally:
+            close_old_connections()
+            self._slots.release()
+
+    def claim(self, limit):
+        """Atomically take up to ``limit`` due tasks, including ones whose lease expired with attempts left."""
+        aliases = shard_aliases()
+        # Start from a different shard each time so none is starved.
+        start = self._claims % len(aliases)
+        self._claims += 1
+        claimed = []
+        for alias in aliases[start:] + aliases[:start]:
+            if len(claimed) >= limit:
+                break
+            claimed.extend(self._claim_from(alias, limit - len(claimed)))
+        return claimed
+
+    def _claim_from(self, alias, limit):
+        tasks = BackgroundTask.objects.using(alias)
+        now = timezone.now()
+        # A worker that died on the last attempt used it up.
+        tasks.filter(
+            status=BackgroundTask.RUNNING, run_after__lte=now, attempts__gte=F("max_attempts")
+        ).update(
+            status=BackgroundTask.FAILED,
+            last_error="The worker stopped before the last attempt finished.",
+            updated_at=now,
+        )
+        candidates = list(
+            tasks.filter(
+                Q(status=BackgroundTask.PENDING) | Q(status=BackgroundTask.RUNNING),
+                run_after__lte=now,
+                attempts__lt=F("max_attempts"),
+            ).order_by("run_after").values_list("pk", "status", "attempts")[:limit]
+        )
+        claimed = []
+        for pk, current_status, attempts in candidates:
+            # Conditional UPDATE: only one runner can win the claim.
+            won = tasks.filter(pk=pk, status=current_status, attempts=attempts).update(
+                status=BackgroundTask.RUNNING,
+                attempts=F("attempts") + 1,
+                run_after=now + self.lease,
+                updated_at=now,
+            )
+            if won:
+                claimed.append(tasks.get(pk=pk))
+        return claimed
+
+    def execute(self, background_task):
+        handler = _registry.get(background_task.name)
+        # Pinned to this claim: if the lease was lost and the task reclaimed,
+        # the later attempt owns the row and these updates match nothing.
+        tasks = BackgroundTask.objects.using(background_task._state.db).filter(
+            pk=background_task.pk, attempts=background_task.attempts
+        )
+        claim = (background_task._state.db, background_task.pk, background_task.attempts)
+        with self._running_lock:
+            self._running.add(claim)
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise KeyError(f"Unknown task: {background_task.name}")
+            handler(**background_task.payload)
+        except Exception:
+            duration_ms = (time.perf_counter() - started) * 1000
+            retry = background_task.attempts < background_task.max_attempts
+            tasks.update(
+                status=BackgroundTask.PENDING if retry else BackgroundTask.FAILED,
+                run_after=timezone.now() + timedelta(seconds=2 ** background_task.attempts),
+                last_error=traceback.format_exc(),
+                duration_ms=duration_ms,
+                updated_at=timezone.now(),
+            )
+            self._record(background_task.name, duration_ms, failed=True, retried=retry)
+            logger.warning(
+                "Task %s (%s) failed on attempt %s/%s",
+                background_task.name, background_task.pk, background_task.attempts, background_task.max_attempts,
+                exc_info=True,
+            )
+            return False
+        finally:
+            with self._running_lock:
+                self._running.discard(claim)
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        tasks.update(
+            status=BackgroundTask.DONE,
+            last_error="",
+            duration_ms=duration_ms,
+            updated_at=timezone.now(),
+        )
+        self._record(background_task.name, duration_ms)
+        return True
+
+    def run_pending(self):
+        """Claim and run every due task in the calling thread. Returns the count run."""
+        count = 0
+        while True:
+            claimed = self.claim(limit=self.concurrency)
+            if not claimed:
+                return count
+            for background_task in claimed:
+                self.execute(background_task)
+                count += 1
+
+    def _record(self, name, duration_ms, failed=False, retried=False):
+        with self._metrics_lock:
+            stats = self._metrics.setdefault(
+                name, {"runs": 0, "failures": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["runs"] += 1
+            stats["failures"] += failed
+            stats["retries"] += retried
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+
+    def metrics(self):
+        """Per-task counters and timings for this process."""
+        with self._metrics_lock:
+            return {
+                name: dict(stats, avg_ms=stats["total_ms"] / stats["runs"])
+                for name, stats in self._metrics.items()
+            }
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """Return this process's runner, starting it on first use."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = TaskRunner(
+                concurrency=getattr(settings, "SAVEDATE_TASKS_CONCURRENCY", 4),
+                poll_interval=getattr(settings, "SAVEDATE_TASKS_POLL_INTERVAL", 1.0),
+                lease_seconds=getattr(settings, "SAVEDATE_TASKS_LEASE_SECONDS", 300),
+            )
+            _runner.start()
+        return _runner
+
+
+def stop_runner():
+    """Stop this process's runner, if it was started, letting running tasks finish."""
+    with _runner_lock:
+        if _runner is not None:
+            _runner.stop()
+
+
+# ------------------ Tasks ------------------
+
+audit_logger = logging.getLogger("savedate.audit")
+
+
+@task("savedate.audit_created")
+def audit_created(save_date_id, title, event_city):
+    audit_logger.info("Save Date created", extra={"save_date_id": save_date_id, "title": title, "event_city": event_city})
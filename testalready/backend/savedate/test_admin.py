@@ -0,0 +1,144 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .admin import SaveDateAdmin
+from .models import CityStats, SaveDate
+from .rendering import render
+
+
+class SaveDateAdminTest(TestCase):
+    """Test cases for the SaveDate admin changelist."""
+
+    def setUp(self):
+        """Log in as a superuser and create invitations."""
+        self.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(self.user)
+        self.url = reverse("admin:savedate_savedate_changelist")
+        for city in ["São Paulo", "Recife", "Recife"]:
+            self.create_save_date(city)
+
+    def create_save_date(self, city):
+        return SaveDate.objects.create(
+            title="Test Event",
+            event_summary="Test description with more than 10 characters",
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Test Venue",
+            event_address="Test Address",
+            event_city=city,
+            owner=self.user,
+        )
+
+    def savedate_queries(self, queries):
+        return [q["sql"] for q in queries.captured_queries if "savedate_savedate" in q["sql"]]
+
+    def test_changelist_avoids_full_count_and_large_columns(self):
+        """The unfiltered list estimates its size and defers the big columns."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Recife")
+        sqls = self.savedate_queries(queries)
+        self.assertFalse(any("COUNT(*)" in sql for sql in sqls), sqls)
+        select = next(sql for sql in sqls if sql.startswith("SELECT") and "LIMIT" in sql)
+        self.assertNotIn('"event_summary"', select)
+        self.assertNotIn('"event_times"', select)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        """Adding rows does not add queries to the changelist."""
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+        for _ in range(20):
+            self.create_save_date("Natal")
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(self.url)
+
+        self.assertEqual(len(small), len(large))
+
+    def test_pages_by_keyset(self):
+        """Following "Next page" walks every row once, newest first, without OFFSET."""
+        seen, pages = [], 0
+        query_string = ""
+        with mock.patch.object(SaveDateAdmin, "list_per_page", 2), CaptureQueriesContext(connection) as queries:
+            while query_string is not None:
+                response = self.client.get(self.url + query_string)
+                seen += response.context["cl"].result_list
+                query_string = response.context["cl"].next_page_url
+                pages += 1
+                if query_string:
+                    self.assertContains(response, "Next page")
+
+        self.assertEqual(pages, 2)
+
+        self.assertEqual(seen, list(SaveDate.objects.order_by("-created_at", "-id")))
+        self.assertFalse(any("OFFSET" in sql for sql in self.savedate_queries(queries)))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {"after": "not-a-cursor"})
+        self.assertRedirects(response, f"{self.url}?e=1")
+
+    def test_search_is_exact_and_indexed(self):
+        """Search matches a city in any case or an id, without LIKE scans."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"q": "Recife"})
+
+        self.assertEqual(response.context["cl"].result_count, 2)
+        self.assertFalse(any("LIKE" in sql for sql in self.savedate_queries(queries)))
+
+        response = self.client.get(self.url, {"q": "  RECIFE "})
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+        save_date = SaveDate.objects.first()
+        response = self.client.get(self.url, {"q": str(save_date.pk)})
+        self.assertEqual(list(response.context["cl"].result_list), [save_date])
+
+    def test_change_form_still_loads_every_field(self):
+        """Deferral is limited to the changelist."""
+        save_date = SaveDate.objects.first()
+        response = self.client.get(reverse("admin:savedate_savedate_change", args=[save_date.pk]))
+        self.assertContains(response, save_date.event_summary)
+
+    def change_form_data(self, save_date, **changes):
+        data = {
+            "owner": save_date.owner_id,
+            "title": save_date.title,
+            "event_summary": save_date.event_summary,
+            "event_times": json.dumps(save_date.event_times),
+            "event_venue": save_date.event_venue,
+            "event_address": save_date.event_address,
+            "event_city": save_date.event_city,
+            "expected_version": save_date.version,
+        }
+        return {**data, **changes}
+
+    def test_edit_goes_through_the_versioned_update(self):
+        """An admin edit bumps the version, re-renders the row and moves the city stats."""
+        save_date = SaveDate.objects.get(event_city="São Paulo")
+        url = reverse("admin:savedate_savedate_change", args=[save_date.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, self.change_form_data(save_date, event_city="Natal"))
+
+        self.assertRedirects(response, self.url)
+        save_date.refresh_from_db()
+        self.assertEqual((save_date.version, save_date.city_key), (2, "natal"))
+        self.assertEqual(save_date.rendered_json, render(save_date))
+        self.assertEqual(
+            dict(CityStats.objects.filter(total__gt=0).values_list("event_city", "total")),
+            {"Natal": 1, "Recife": 2},
+        )
+
+    def test_stale_edit_is_rejected(self):
+        """A form opened before someone else's change saves nothing."""
+        save_date = SaveDate.objects.first()
+        url = reverse("admin:savedate_savedate_change", args=[save_date.pk])
+        response = self.client.post(url, self.change_form_data(save_date, title="Admin", expected_version=0))
+
+        self.assertContains(response, "changed by someone else")
+        save_date.refresh_from_db()
+        self.assertEqual((save_date.version, save_date.title), (1, "Test Event"))
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import ArchivedSaveDate, SaveDate
+
+
+class ArchiveSaveDatesTest(TestCase):
+    """Test cases for moving old invitations to the archive table."""
+
+    def setUp(self):
+        """Create two old invitations and a recent one."""
+        self.owner = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.old = [self.create_save_date(f"Evento Antigo {i}", days_ago=400 + i) for i in range(2)]
+        self.recent = self.create_save_date("Evento Recente", days_ago=1)
+
+    def create_save_date(self, title, days_ago):
+        save_date = SaveDate.objects.create(
+            title=title,
+            event_summary="Test description with more than 10 characters",
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Test Venue",
+            event_address="Test Address",
+            event_city="Test City",
+            owner=self.owner
+        )
+        SaveDate.objects.filter(pk=save_date.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        save_date.refresh_from_db()
+        return save_date
+
+    def test_moves_old_rows_in_batches(self):
+        """Old rows move to the archive with their id and timestamps intact."""
+        out = StringIO()
+        call_command("archive_savedates", older_than_days=180, batch_size=1, sleep=0, stdout=out)
+
+        self.assertIn("Archived 2 invitations", out.getvalue())
+        self.assertEqual(list(SaveDate.objects.values_list("pk", flat=True)), [self.recent.pk])
+        archived = ArchivedSaveDate.objects.get(pk=self.old[0].pk)
+        self.assertEqual(archived.title, self.old[0].title)
+        self.assertEqual(archived.created_at, self.old[0].created_at)
+        self.assertEqual(archived.updated_at, self.old[0].updated_at)
+        self.assertEqual(archived.owner, self.owner)
+        self.assertIsNotNone(archived.archived_at)
+
+    def test_max_batches_limits_a_run(self):
+        """--max-batches stops early; a later run picks up the rest."""
+        call_command("archive_savedates", batch_size=1, max_batches=1, sleep=0, stdout=StringIO())
+        self.assertEqual(ArchivedSaveDate.objects.count(), 1)
+
+        call_command("archive_savedates", batch_size=1, sleep=0, stdout=StringIO())
+        self.assertEqual(ArchivedSaveDate.objects.count(), 2)
+
+    def test_list_endpoints_split_hot_and_archive(self):
+        """The default list reads the hot table; archived rows have their own path."""
+        call_command("archive_savedates", sleep=0, stdout=StringIO())
+
+        hot = self.client.get(reverse("save-date"))
+        self.assertEqual([r["title"] for r in hot.data], ["Evento Recente"])
+
+        archive = self.client.get(reverse("save-date-archive"))
+        self.assertEqual(archive.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["title"] for r in archive.data["results"]], ["Evento Antigo 0", "Evento Antigo 1"])
+
+        detail = self.client.get(reverse("save-date-archive-detail", args=[self.old[1].pk]))
+        self.assertEqual(detail.data["id"], str(self.old[1].pk))
+
+    def test_archive_is_scoped_to_the_owner(self):
+        """Another user neither lists nor retrieves someone else's archived invitations."""
+        call_command("archive_savedates", sleep=0, stdout=StringIO())
+        self.client.force_authenticate(get_user_model().objects.create_user("bia"))
+
+        self.assertEqual(self.client.get(reverse("save-date-archive")).data["results"], [])
+        detail = self.client.get(reverse("save-date-archive-detail", args=[self.old[1].pk]))
+        self.assertEqual(detail.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,84 @@
+import gzip
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from .models import SaveDate
+
+
+class BackupDbCommandTest(TransactionTestCase):
+    """Test cases for the backup_db management command."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        for n in range(30):
+            SaveDate.objects.create(
+                title=f"Evento {n}",
+                event_summary="Test description with more than 10 characters",
+                event_times=[{"label": "Cerimônia", "time": "14:00"}],
+                event_venue="Test Venue",
+                event_address="Test Address",
+                event_city="Recife",
+            )
+
+    def backup(self, name, **options):
+        out = StringIO()
+        target = os.path.join(self.tmpdir.name, name)
+        call_command("backup_db", target, stdout=out, sleep=0, **options)
+        return target, out.getvalue()
+
+    def count_rows(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM savedate_savedate").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_backup_copies_in_steps(self):
+        """The copy holds every row and the report gives the page rate."""
+        target, out = self.backup("db.sqlite3", pages=1, verbosity=2)
+        self.assertEqual(self.count_rows(target), 30)
+        self.assertIn("pages/s", out)
+        self.assertGreater(out.count(" pages\n"), 1)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["db.sqlite3"])
+
+    def test_sleeps_between_steps(self):
+        """--sleep pauses after every step but the last, not only when the source is busy."""
+        with mock.patch("savedate.sqlite_utils.time.sleep") as sleep:
+            target = os.path.join(self.tmpdir.name, "db.sqlite3")
+            call_command("backup_db", target, stdout=StringIO(), pages=1, sleep=0.25)
+        conn = sqlite3.connect(target)
+        try:
+            (page_count,) = conn.execute("PRAGMA page_count").fetchone()
+        finally:
+            conn.close()
+
+        self.assertEqual(sleep.call_args_list, [mock.call(0.25)] * (page_count - 1))
+
+    def test_compressed_backup(self):
+        """--compress leaves only a gzip file that unpacks to the database."""
+        target, _ = self.backup("db.sqlite3", compress=True)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["db.sqlite3.gz"])
+        unpacked = os.path.join(self.tmpdir.name, "unpacked.sqlite3")
+        with gzip.open(f"{target}.gz") as src, open(unpacked, "wb") as dst:
+            dst.write(src.read())
+        self.assertEqual(self.count_rows(unpacked), 30)
+
+    def test_existing_target_is_kept(self):
+        """An existing backup is never overwritten."""
+        target, _ = self.backup("db.sqlite3")
+        with self.assertRaisesMessage(CommandError, "already exists"):
+            self.backup("db.sqlite3")
+        self.assertEqual(self.count_rows(target), 30)
+
+    def test_refuses_inside_a_transaction(self):
+        """Backing up through a connection holding a transaction fails instead of waiting forever."""
+        with self.assertRaisesMessage(CommandError, "inside a transaction"), transaction.atomic():
+            self.backup("db.sqlite3")
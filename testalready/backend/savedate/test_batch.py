@@ -0,0 +1,76 @@
+import json
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import SaveDate
+
+
+class SaveDateBatchTest(TestCase):
+    """Test cases for fetching many invitations by id."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.ana = User.objects.create_user("ana")
+        self.bia = User.objects.create_user("bia")
+        self.client = APIClient()
+        self.client.force_authenticate(self.ana)
+        self.save_dates = [
+            SaveDate.objects.create(
+                owner=self.ana,
+                title=f"Evento {i}",
+                event_summary="Test description with more than 10 characters",
+                event_times=[{"label": "Cerimônia", "time": "14:00"}],
+                event_venue="Test Venue",
+                event_address="Test Address",
+                event_city="Recife"
+            )
+            for i in range(3)
+        ]
+
+    def get(self, ids):
+        return self.client.get(reverse("save-date-batch"), {"ids": ",".join(str(pk) for pk in ids)})
+
+    def test_returns_requested_order_and_missing_ids(self):
+        """Results follow the requested order; unknown ids are listed as missing."""
+        first, second, third = (save_date.pk for save_date in self.save_dates)
+        unknown = uuid.uuid4()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get([third, unknown, first, third])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.data["results"]], [str(third), str(first)])
+        self.assertEqual(response.data["missing"], [str(unknown)])
+        self.assertEqual(len(queries), 1)
+        self.assertIn(" IN (", queries[0]["sql"])
+
+    def test_body_is_the_stored_json(self):
+        """Each result is the invitation's stored rendered JSON."""
+        response = self.get([self.save_dates[0].pk])
+        body = json.loads(response.content)
+        self.assertEqual(body["results"], [json.loads(self.save_dates[0].rendered_json)])
+
+    def test_rejects_bad_requests(self):
+        """No ids, too many ids or malformed ids are 400 without querying."""
+        too_many = [uuid.uuid4() for _ in range(101)]
+        for ids in ([], too_many, ["not-a-uuid"]):
+            with self.assertNumQueries(0):
+                response = self.get(ids)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data["status"], "error")
+
+    def test_other_owners_invitations_are_missing(self):
+        """Another user's ids are reported as missing; anonymous clients are refused."""
+        self.client.force_authenticate(self.bia)
+        response = self.get([self.save_dates[0].pk])
+        self.assertEqual(response.data, {"results": [], "missing": [str(self.save_dates[0].pk)]})
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.get([self.save_dates[0].pk]).status_code, status.HTTP_401_UNAUTHORIZED)
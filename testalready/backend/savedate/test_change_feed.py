@@ -0,0 +1,172 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import SaveDate, SaveDateTombstone
+from .pagination import decode_cursor, encode_cursor
+
+
+@override_settings(SAVEDATE_FEED_SAFETY_LAG=0)
+class SaveDateChangeFeedTest(TestCase):
+    """Test cases for the incremental change feed endpoint."""
+
+    def setUp(self):
+        """Set up the client and a few invitations."""
+        self.owner = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = reverse("save-date-changes")
+        self.save_dates = [self.create_save_date(f"Evento {i}") for i in range(3)]
+
+    def create_save_date(self, title, owner=None):
+        return SaveDate.objects.create(
+            owner=owner or self.owner,
+            title=title,
+            event_summary="Test description with more than 10 characters",
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Test Venue",
+            event_address="Test Address",
+            event_city="Test City"
+        )
+
+    def test_first_poll_returns_everything_in_change_order(self):
+        """Without a cursor the feed starts at the oldest change."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["title"] for r in response.data["results"]], ["Evento 0", "Evento 1", "Evento 2"])
+        self.assertFalse(response.data["has_more"])
+        self.assertIsNotNone(response.data["next_cursor"])
+
+    def test_pages_with_limit_and_cursor(self):
+        """The next cursor continues exactly where the previous page stopped."""
+        first = self.client.get(self.url, {"limit": 2})
+        second = self.client.get(self.url, {"limit": 2, "cursor": first.data["next_cursor"]})
+
+        self.assertTrue(first.data["has_more"])
+        self.assertEqual([r["title"] for r in second.data["results"]], ["Evento 2"])
+        self.assertFalse(second.data["has_more"])
+
+    def test_only_deltas_after_cursor(self):
+        """A poll after the cursor sees only new and updated invitations."""
+        cursor = self.client.get(self.url).data["next_cursor"]
+
+        empty = self.client.get(self.url, {"cursor": cursor})
+        self.assertEqual(empty.data["results"], [])
+        self.assertEqual(empty.data["next_cursor"], cursor)
+
+        updated = self.save_dates[0]
+        updated.title = "Evento Atualizado"
+        updated.save()
+        self.create_save_date("Evento Novo")
+
+        response = self.client.get(self.url, {"cursor": cursor})
+        self.assertEqual([r["title"] for r in response.data["results"]], ["Evento Atualizado", "Evento Novo"])
+
+    def test_recent_changes_wait_for_the_safety_lag(self):
+        """A change younger than the lag is served on a later poll, after the cursor."""
+        SaveDate.objects.update(updated_at=timezone.now() - timedelta(seconds=120))
+        late = self.create_save_date("Evento Atrasado")
+
+        with self.settings(SAVEDATE_FEED_SAFETY_LAG=60):
+            first = self.client.get(self.url)
+            self.assertEqual(len(first.data["results"]), 3)
+            cursor = first.data["next_cursor"]
+            self.assertEqual(self.client.get(self.url, {"cursor": cursor}).data["results"], [])
+
+            SaveDate.objects.filter(pk=late.pk).update(updated_at=timezone.now() - timedelta(seconds=61))
+            response = self.client.get(self.url, {"cursor": cursor})
+        self.assertEqual([r["title"] for r in response.data["results"]], ["Evento Atrasado"])
+
+    def test_deleted_and_archived_ids_are_reported(self):
+        """Deletions and archiving leave tombstones, served in change order with the updates."""
+        cursor = self.client.get(self.url).data["next_cursor"]
+        deleted, archived, updated = self.save_dates
+        deleted_pk = deleted.pk
+        deleted.delete()
+        SaveDate.objects.filter(pk=archived.pk).update(created_at=timezone.now() - timedelta(days=365))
+        call_command("archive_savedates", older_than_days=180, stdout=StringIO())
+        updated.title = "Evento Atualizado"
+        updated.save()
+
+        first = self.client.get(self.url, {"cursor": cursor, "limit": 2})
+        self.assertEqual(first.data["results"], [])
+        self.assertEqual(first.data["deleted"], [str(deleted_pk), str(archived.pk)])
+        second = self.client.get(self.url, {"cursor": first.data["next_cursor"]})
+        self.assertEqual([r["title"] for r in second.data["results"]], ["Evento Atualizado"])
+        self.assertEqual(second.data["deleted"], [])
+
+    def test_archiving_writes_tombstones_in_bulk(self):
+        """The archiver leaves one tombstone per row with a single insert."""
+        SaveDate.objects.update(created_at=timezone.now() - timedelta(days=365))
+        with CaptureQueriesContext(connection) as queries:
+            call_command("archive_savedates", sleep=0, stdout=StringIO())
+
+        self.assertEqual(SaveDateTombstone.objects.filter(owner=self.owner).count(), 3)
+        tombstone_inserts = [
+            q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "savedate_savedatetombstone"')
+        ]
+        self.assertEqual(len(tombstone_inserts), 1)
+
+    def test_old_tombstones_are_pruned_and_old_cursors_reset(self):
+        """Tombstones past the retention are deleted; a cursor that old restarts the feed."""
+        old_pk, recent_pk = (save_date.pk for save_date in self.save_dates[:2])
+        SaveDate.objects.filter(pk__in=[old_pk, recent_pk]).delete()
+        long_ago = timezone.now() - timedelta(days=31)
+        SaveDateTombstone.objects.filter(save_date_id=old_pk).update(deleted_at=long_ago)
+
+        out = StringIO()
+        call_command("prune_tombstones", sleep=0, stdout=out)
+        self.assertIn("Deleted 1 tombstones", out.getvalue())
+        self.assertEqual(list(SaveDateTombstone.objects.values_list("pk", flat=True)), [recent_pk])
+
+        response = self.client.get(self.url, {"cursor": encode_cursor(long_ago, old_pk)})
+        self.assertTrue(response.data["reset"])
+        self.assertEqual([r["title"] for r in response.data["results"]], ["Evento 2"])
+        self.assertFalse(self.client.get(self.url, {"cursor": response.data["next_cursor"]}).data["reset"])
+
+    def test_other_owners_tombstones_are_hidden(self):
+        other = self.create_save_date("Evento da Bia", get_user_model().objects.create_user("bia"))
+        SaveDate.objects.filter(pk=other.pk).delete()
+        self.assertTrue(SaveDateTombstone.objects.filter(save_date_id=other.pk).exists())
+        self.assertEqual(self.client.get(self.url).data["deleted"], [])
+
+    def test_invalid_cursor_and_limit(self):
+        """Malformed cursors and limits are rejected with 400."""
+        self.assertEqual(self.client.get(self.url, {"cursor": "garbage"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"limit": "0"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_feed_is_scoped_to_the_owner(self):
+        """Other users' changes never appear; anonymous clients are refused."""
+        self.create_save_date("Evento da Bia", get_user_model().objects.create_user("bia"))
+
+        response = self.client.get(self.url)
+        self.assertNotIn("Evento da Bia", [r["title"] for r in response.data["results"]])
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_poll_uses_updated_at_index(self):
+        """The delta query is planned as a search on the (owner, updated_at, id) index."""
+        cursor = self.client.get(self.url).data["next_cursor"]
+        updated_at, pk = decode_cursor(cursor)
+        queryset = SaveDate.objects.filter(owner=self.owner).filter(
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk)
+        ).order_by("updated_at", "pk")
+
+        self.assertIn("savedate_owner_updated_idx", queryset.explain())
+        self.assertIn(
+            "tombstone_owner_deleted_idx",
+            SaveDateTombstone.objects.filter(owner=self.owner, deleted_at__gt=updated_at)
+            .order_by("deleted_at", "pk").explain(),
+        )
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import SaveDate, normalize_key
+
+
+class CityKeyTest(TestCase):
+    """Test cases for the normalized, indexed city key."""
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create_save_date(self, city, owner=None):
+        return SaveDate.objects.create(
+            title=f"Evento em {city}",
+            event_summary="Test description with more than 10 characters",
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Test Venue",
+            event_address="Test Address",
+            event_city=city,
+            owner=owner or self.owner
+        )
+
+    def test_normalize_key(self):
+        """Case, accents and repeated spaces are ignored."""
+        for city in ["São Paulo", "sao paulo", "SAO PAULO", "  São   PAULO "]:
+            self.assertEqual(normalize_key(city), "sao paulo")
+        self.assertEqual(normalize_key("Florianópolis"), "florianopolis")
+        self.assertEqual(normalize_key(None), "")
+
+    def test_key_follows_every_write(self):
+        """The key is set on create and bulk create and follows city updates."""
+        save_date = self.create_save_date("São Paulo")
+        self.assertEqual(save_date.city_key, "sao paulo")
+
+        bulk, = SaveDate.objects.bulk_create([SaveDate(
+            title="Outro", event_summary="Test description with more than 10 characters",
+            event_times=[], event_venue="Venue", event_address="Address", event_city="Belém"
+        )])
+        bulk.refresh_from_db()
+        self.assertEqual(bulk.city_key, "belem")
+
+        self.client.patch(
+            reverse("save-date-detail", args=[save_date.pk]), {"event_city": "Goiânia"},
+            format="json", HTTP_IF_MATCH='"1"'
+        )
+        save_date.refresh_from_db()
+        self.assertEqual(save_date.city_key, "goiania")
+
+    def test_list_filters_by_city_ignoring_case_and_accents(self):
+        """?city= matches every spelling of the city among the user's invitations."""
+        self.create_save_date("São Paulo")
+        self.create_save_date("SAO PAULO")
+        self.create_save_date("Recife")
+        self.create_save_date("sao paulo", owner=get_user_model().objects.create_user("bia"))
+
+        response = self.client.get(reverse("save-date"), {"city": "são PAULO"})
+
+        self.assertEqual([row["event_city"] for row in response.data], ["SAO PAULO", "São Paulo"])
+        self.assertNotIn("city_key", response.data[0])
+
+    def test_city_lookups_are_index_seeks(self):
+        """The list filter and the admin search seek their composite indexes."""
+        cases = [
+            (SaveDate.objects.filter(owner=self.owner, city_key="recife"), "savedate_owner_city_idx"),
+            (SaveDate.objects.filter(city_key="recife"), "savedate_citykey_created_idx"),
+        ]
+        for queryset, index in cases:
+            sql, params = queryset.order_by("-created_at", "-id").query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = " ".join(row[-1] for row in cursor.fetchall())
+            self.assertIn(index, plan)
+            self.assertNotIn("TEMP B-TREE", plan)
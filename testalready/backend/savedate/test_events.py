@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import events
+from .events import OVERFLOW, EventHub, LocalBroker, SQLiteBroker
+
+
+class EventHubTest(TestCase):
+    """Test cases for the in-process event fan-out."""
+
+    def test_publish_reaches_every_subscriber(self):
+        """Each subscriber receives its own copy of a published event."""
+        hub = EventHub()
+
+        async def scenario():
+            first, second = hub.subscribe(), hub.subscribe()
+            hub.publish("savedate.created", '{"title": "Evento"}')
+            return await first.get(), await second.get()
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first, second)
+        self.assertEqual(first.id, 1)
+        self.assertEqual(first.type, "savedate.created")
+
+    def test_last_event_id_replays_missed_events(self):
+        """A reconnecting client first receives what it missed."""
+        hub = EventHub()
+        for i in range(3):
+            hub.publish("savedate.created", str(i))
+
+        async def scenario():
+            subscription = hub.subscribe(last_event_id=1)
+            return [await subscription.get(), await subscription.get()]
+
+        self.assertEqual([e.id for e in asyncio.run(scenario())], [2, 3])
+
+    def test_replay_beyond_history_sends_reset(self):
+        """When the missed events are gone the client is told to reload."""
+        hub = EventHub(history=2)
+        for i in range(5):
+            hub.publish("savedate.created", str(i))
+
+        async def scenario():
+            return await hub.subscribe(last_event_id=1).get()
+
+        self.assertEqual(asyncio.run(scenario()).type, "reset")
+
+    def test_slow_consumer_is_disconnected(self):
+        """A full subscriber queue ends the stream instead of growing."""
+        hub = EventHub(queue_size=2)
+
+        async def scenario():
+            subscription = hub.subscribe()
+            for i in range(5):
+                hub.publish("savedate.created", str(i))
+            await asyncio.sleep(0)
+            return await subscription.get()
+
+        self.assertIs(asyncio.run(scenario()), OVERFLOW)
+
+    def test_subscribers_only_receive_their_owners_events(self):
+        """Events of other owners are neither delivered nor replayed."""
+        hub = EventHub()
+        hub.publish("savedate.created", '{"n": 1}', owner=2)
+        hub.publish("savedate.created", '{"n": 2}', owner=1)
+
+        async def scenario():
+            subscription = hub.subscribe(last_event_id=0, owner=1)
+            hub.publish("savedate.created", '{"n": 3}', owner=2)
+            hub.publish("savedate.created", '{"n": 4}', owner=1)
+            return [await subscription.get(), await subscription.get()]
+
+        self.assertEqual([e.data for e in asyncio.run(scenario())], ['{"n": 2}', '{"n": 4}'])
+
+
+class SQLiteBrokerTest(TestCase):
+    """Test cases for the multi-process stand-in broker."""
+
+    def test_events_flow_through_shared_file(self):
+        """Events written by one broker are delivered by another's poller."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "events.sqlite3")
+            publisher = SQLiteBroker(EventHub(), path)
+            subscriber = SQLiteBroker(EventHub(), path, poll_interval=0.01)
+            publisher.publish("savedate.created", '{"n": 1}', owner=1)
+
+            async def scenario():
+                subscription = subscriber.subscribe(last_event_id=0, owner=1)
+                publisher.publish("savedate.created", '{"n": 0}', owner=2)
+                publisher.publish("savedate.created", '{"n": 2}', owner=1)
+                return [await asyncio.wait_for(subscription.get(), 2) for _ in range(2)]
+
+            try:
+                received = asyncio.run(scenario())
+            finally:
+                subscriber.close()
+
+        self.assertEqual([e.data for e in received], ['{"n": 1}', '{"n": 2}'])
+        self.assertEqual([e.id for e in received], [1, 3])
+
+
+@override_settings(SAVEDATE_TASKS_EAGER=True)
+class SaveDateCreatedEventTest(TestCase):
+    """Test that creating a SaveDate publishes an event."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.broker = LocalBroker(EventHub())
+        self.previous_broker, events._broker = events._broker, self.broker
+
+    def tearDown(self):
+        events._broker = self.previous_broker
+
+    def test_create_publishes_after_commit(self):
+        """The serialized invitation is published once the row is committed."""
+        payload = {
+            "title": "Casamento João e Maria",
+            "event_summary": "Venha celebrar conosco este momento especial",
+            "event_times": [{"label": "Cerimônia", "time": "14:00"}],
+            "event_venue": "Salão de Festas",
+            "event_address": "Rua das Flores, 123",
+            "event_city": "São Paulo"
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("save-date"), payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event = self.broker.hub.history[-1]
+        self.assertEqual(event.type, "savedate.created")
+        self.assertEqual(event.owner, self.user.pk)
+        self.assertEqual(json.loads(event.data)["id"], response.data["data"]["id"])
+
+    def test_stream_requires_authentication(self):
+        """Anonymous clients cannot subscribe to the stream."""
+        self.client.force_authenticate(None)
+        response = self.client.get(reverse("save-date-events"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,113 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .models import SaveDate
+
+
+class ImportSaveDatesCommandTest(TestCase):
+    """Test cases for the import_savedates management command."""
+
+    def setUp(self):
+        """Set up a temporary directory and a valid record."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.owner = get_user_model().objects.create_user("ana")
+        self.valid_record = {
+            "title": "Casamento João e Maria",
+            "event_summary": "Venha celebrar conosco este momento especial",
+            "event_times": [{"label": "Cerimônia", "time": "14:00"}],
+            "event_venue": "Salão de Festas",
+            "event_address": "Rua das Flores, 123",
+            "event_city": "São Paulo"
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_ndjson(self, lines):
+        path = os.path.join(self.tmpdir.name, "invitations.ndjson")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+        return path
+
+    def run_import(self, path, **options):
+        options.setdefault("workers", 0)
+        options.setdefault("owner", "ana")
+        out = StringIO()
+        call_command("import_savedates", path, stdout=out, **options)
+        return out.getvalue()
+
+    def test_imports_valid_records_and_rejects_invalid_ones(self):
+        """Valid rows are inserted; invalid rows end up in the sidecar file."""
+        invalid = dict(self.valid_record, title="AB")
+        path = self.write_ndjson([
+            json.dumps(self.valid_record),
+            json.dumps(invalid),
+            "not json",
+            json.dumps(dict(self.valid_record, title="Outro Evento")),
+        ])
+
+        output = self.run_import(path, batch_size=2)
+
+        self.assertEqual(SaveDate.objects.count(), 2)
+        self.assertIn("2 imported, 2 rejected", output)
+        with open(f"{path}.rejects.ndjson", encoding="utf-8") as fh:
+            rejects = [json.loads(line) for line in fh]
+        self.assertEqual([r["record"] for r in rejects], [2, 3])
+        self.assertIn("title", rejects[0]["errors"])
+        self.assertFalse(os.path.exists(f"{path}.checkpoint.json"))
+
+    def test_imports_csv_with_json_event_times(self):
+        """CSV rows carry event_times as a JSON-encoded cell."""
+        path = os.path.join(self.tmpdir.name, "invitations.csv")
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(self.valid_record))
+            writer.writeheader()
+            writer.writerow(dict(self.valid_record, event_times=json.dumps(self.valid_record["event_times"])))
+
+        self.run_import(path)
+
+        save_date = SaveDate.objects.get()
+        self.assertEqual(save_date.event_times, self.valid_record["event_times"])
+
+    def test_resume_skips_committed_records_without_duplicates(self):
+        """A resumed run continues after the checkpoint and never duplicates rows."""
+        path = self.write_ndjson([json.dumps(dict(self.valid_record, title=f"Evento {i}")) for i in range(5)])
+        self.run_import(path)
+        self.assertEqual(SaveDate.objects.count(), 5)
+
+        # Simulate a crash that happened after record 3 was committed but
+        # before the checkpoint could record it.
+        with open(f"{path}.checkpoint.json", "w", encoding="utf-8") as fh:
+            json.dump({"source_key": f"invitations.ndjson:{os.path.getsize(path)}",
+                       "records": 2, "rejects_bytes": 0}, fh)
+        output = self.run_import(path)
+
+        self.assertIn("Resuming after record 2", output)
+        self.assertIn("Done: 3 records", output)
+        self.assertEqual(SaveDate.objects.count(), 5)
+
+    def test_process_pool_validation(self):
+        """Records validated in worker processes are imported in file order."""
+        path = self.write_ndjson([json.dumps(dict(self.valid_record, title=f"Evento {i}")) for i in range(10)])
+
+        self.run_import(path, workers=2, chunk_size=3)
+
+        self.assertEqual(SaveDate.objects.count(), 10)
+
+    def test_rows_belong_to_the_owner(self):
+        """Imported invitations are owned by --owner, which must exist."""
+        path = self.write_ndjson([json.dumps(self.valid_record)])
+
+        with self.assertRaisesMessage(CommandError, "User not found: bia"):
+            self.run_import(path, owner="bia")
+        self.run_import(path)
+
+        self.assertEqual(SaveDate.objects.get().owner, self.owner)
@@ -0,0 +1,129 @@
+import json
+import logging
+import threading
+import time
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .log import REQUEST_ID_HEADER, JsonFormatter, QueueListenerHandler
+
+
+class ListHandler(logging.Handler):
+    """Collects formatted records; optionally blocks until released."""
+
+    def __init__(self, gate=None):
+        super().__init__()
+        self.lines = []
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.lines.append(self.format(record))
+
+
+class QueueListenerHandlerTest(TestCase):
+    """Test cases for the bounded, non-blocking logging queue."""
+
+    def make_logger(self, handler):
+        logger = logging.getLogger(f"savedate.test_log.{self._testMethodName}")
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        return logger
+
+    def test_records_reach_targets_as_json(self):
+        """Records are written by the listener with extras and exceptions."""
+        target = ListHandler()
+        target.setFormatter(JsonFormatter())
+        handler = QueueListenerHandler([target])
+        logger = self.make_logger(handler)
+
+        logger.info("Save Date created", extra={"save_date_id": "abc"})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed %s", "create")
+        handler.close()
+
+        first, second = [json.loads(line) for line in target.lines]
+        self.assertEqual(first["message"], "Save Date created")
+        self.assertEqual(first["save_date_id"], "abc")
+        self.assertIsNone(first["request_id"])
+        self.assertEqual(second["message"], "Failed create")
+        self.assertIn("ValueError: boom", second["exc"])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """A stalled target never blocks the caller; drops are counted and reported."""
+        gate = threading.Event()
+        target = ListHandler(gate)
+        handler = QueueListenerHandler([target], queue_size=2)
+        logger = self.make_logger(handler)
+
+        started = time.perf_counter()
+        for i in range(50):
+            logger.warning("record %d", i)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 1)
+        self.assertGreaterEqual(handler.dropped, 45)
+        gate.set()
+        deadline = time.monotonic() + 5
+        while not handler.queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        logger.warning("after the stall")
+        handler.close()
+        self.assertTrue(any("dropped" in line for line in target.lines), target.lines)
+        self.assertEqual(target.lines[-1], "after the stall")
+
+    def test_stop_gives_up_on_a_stalled_target(self):
+        """Closing waits at most the timeout for a stuck target and says so on stderr."""
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        handler = QueueListenerHandler([ListHandler(gate)])
+        listener = handler.listener
+        handler.listener = None
+        self.make_logger(handler).warning("stuck")
+
+        started = time.perf_counter()
+        with mock.patch.object(logging.lastResort, "handle") as last_resort:
+            listener.stop(timeout=0.1)
+        self.assertLess(time.perf_counter() - started, 1)
+        (record,), _ = last_resort.call_args
+        self.assertIn("still busy after 0.1s", record.getMessage())
+
+
+class RequestIdMiddlewareTest(TestCase):
+    """Test cases for per-request correlation ids."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_generates_and_returns_request_id(self):
+        """Each response carries a fresh request id."""
+        first = self.client.get(reverse("save-date"))[REQUEST_ID_HEADER]
+        second = self.client.get(reverse("save-date"))[REQUEST_ID_HEADER]
+        self.assertRegex(first, r"^[0-9a-f]{32}$")
+        self.assertNotEqual(first, second)
+
+    def test_accepts_sane_incoming_id_only(self):
+        """An upstream id is kept when well formed and replaced otherwise."""
+        kept = self.client.get(reverse("save-date"), HTTP_X_REQUEST_ID="lb-1234.abc")
+        replaced = self.client.get(reverse("save-date"), HTTP_X_REQUEST_ID="bad id\nwith newline")
+        self.assertEqual(kept[REQUEST_ID_HEADER], "lb-1234.abc")
+        self.assertRegex(replaced[REQUEST_ID_HEADER], r"^[0-9a-f]{32}$")
+
+    def test_log_records_carry_request_id(self):
+        """Records logged while serving the request are tagged with its id."""
+        with self.assertLogs("django.request", "WARNING") as logs:
+            response = self.client.get(reverse("save-date-changes"), {"limit": 0}, HTTP_X_REQUEST_ID="req-42")
+
+        self.assertEqual(response[REQUEST_ID_HEADER], "req-42")
+        handler = QueueListenerHandler([ListHandler()])
+        self.addCleanup(handler.close)
+        record = logs.records[0]
+        handler.filter(record)
+        self.assertEqual(record.request_id, "req-42")
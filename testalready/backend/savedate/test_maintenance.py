@@ -0,0 +1,70 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from .maintenance import MaintenanceScheduler, measure, run
+from .models import SaveDate
+
+
+def create_save_dates(count):
+    for n in range(count):
+        SaveDate.objects.create(
+            title=f"Evento {n}",
+            event_summary="Test description with more than 10 characters " * 20,
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Test Venue",
+            event_address="Test Address",
+            event_city="São Paulo",
+        )
+
+
+class MaintainDbCommandTest(TransactionTestCase):
+    """Test cases for the maintain_db management command."""
+
+    def test_frees_pages_and_reports(self):
+        """Deleted rows' pages are returned, and the report compares before and after."""
+        create_save_dates(200)
+        out = StringIO()
+        call_command("maintain_db", enable_incremental=True, pause=0, stdout=out, stderr=StringIO())
+        SaveDate.objects.all().delete()
+
+        out = StringIO()
+        call_command("maintain_db", vacuum_pages=5, pause=0, stdout=out)
+        report = json.loads(out.getvalue().splitlines()[0])
+        self.assertEqual(report["auto_vacuum"], "incremental")
+        self.assertGreater(report["before"]["free_pages"], 5)
+        self.assertEqual(report["after"]["free_pages"], 0)
+        self.assertEqual(report["freed_pages"], report["before"]["free_pages"])
+        self.assertLess(report["after"]["size_bytes"], report["before"]["size_bytes"])
+        self.assertEqual(set(report["after"]["query_ms"]), {"newest", "by_city", "by_owner", "changes"})
+
+
+class MaintenanceSchedulerTest(TestCase):
+    """Test cases for the in-process maintenance schedule."""
+
+    def test_runs_once_per_interval(self):
+        scheduler = MaintenanceScheduler(interval=3600, idle_seconds=1)
+        self.assertEqual(scheduler.run_if_due("default")["database"], "default")
+        self.assertIsNone(scheduler.run_if_due("default"))
+
+    def test_vacuum_stops_at_its_time_budget(self):
+        """With no time left the vacuum step frees nothing, whatever the mode."""
+        create_save_dates(5)
+        report = run("default", vacuum_seconds=0)
+        self.assertEqual(report["freed_pages"], 0)
+
+    def test_probes_are_bounded(self):
+        """The timed queries never count the table and each reads a limited index range."""
+        create_save_dates(5)
+        with CaptureQueriesContext(connection) as queries:
+            report = measure("default")
+
+        probes = [q["sql"] for q in queries.captured_queries if "savedate_savedate" in q["sql"]]
+        self.assertEqual(len(probes), 1 + 3 * len(report["query_ms"]))
+        self.assertFalse(any("COUNT(" in sql for sql in probes), probes)
+        self.assertTrue(all("LIMIT" in sql for sql in probes), probes)
+        self.assertIn("'sao paulo'", probes[4])
@@ -0,0 +1,70 @@
+import json
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import SaveDate
+
+
+class MemoryProfileTest(TestCase):
+    """Test cases for per-request memory profiling."""
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        for n in range(20):
+            SaveDate.objects.create(
+                owner=self.owner,
+                title=f"Evento {n}",
+                event_summary="Test description with more than 10 characters",
+                event_times=[{"label": "Cerimônia", "time": "14:00"}],
+                event_venue="Test Venue",
+                event_address="Test Address",
+                event_city="Recife",
+            )
+
+    def profiles(self, logs):
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    @override_settings(SAVEDATE_MEMORY_PROFILE_RATE=1.0)
+    def test_list_is_profiled_by_stage(self):
+        """A sampled list reports its peak and the top sites of each stage."""
+        with self.assertLogs("savedate.memory_profile", "INFO") as logs:
+            response = self.client.get(reverse("save-date"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [profile] = self.profiles(logs)
+        self.assertEqual(profile["route"], "api/save-date/")
+        self.assertEqual(profile["status"], 200)
+        self.assertGreater(profile["peak_kb"], 0)
+        self.assertEqual(response["X-Memory-Peak-KB"], str(profile["peak_kb"]))
+        self.assertEqual(list(profile["stages"]), ["query", "render"])
+        for stage in profile["stages"].values():
+            self.assertLessEqual(stage["peak_kb"], profile["peak_kb"])
+            self.assertTrue(stage["top"])
+            self.assertTrue(all("memory_profile.py" not in site["site"] for site in stage["top"]))
+        self.assertFalse(tracemalloc.is_tracing())
+
+    @override_settings(SAVEDATE_MEMORY_PROFILE_RATE=0.0, SAVEDATE_MEMORY_PROFILE_KEY="s3cret")
+    def test_header_with_the_key_forces_a_profile(self):
+        """Only a request carrying the configured key is profiled at a zero rate."""
+        with self.assertNoLogs("savedate.memory_profile", "INFO"):
+            response = self.client.get(reverse("save-date"), HTTP_X_MEMORY_PROFILE="guess")
+        self.assertNotIn("X-Memory-Peak-KB", response)
+
+        with self.assertLogs("savedate.memory_profile", "INFO") as logs:
+            self.client.get(reverse("save-date"), HTTP_X_MEMORY_PROFILE="s3cret")
+        self.assertEqual(len(self.profiles(logs)), 1)
+
+    @override_settings(SAVEDATE_MEMORY_PROFILE_RATE=None)
+    def test_disabled_profiling_adds_nothing(self):
+        """With no rate the middleware is removed and nothing is traced."""
+        with self.assertNoLogs("savedate.memory_profile", "INFO"):
+            response = self.client.get(reverse("save-date"), HTTP_X_MEMORY_PROFILE="")
+        self.assertNotIn("X-Memory-Peak-KB", response)
+        self.assertFalse(tracemalloc.is_tracing())
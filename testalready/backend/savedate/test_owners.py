@@ -0,0 +1,122 @@
+import uuid
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .models import ArchivedSaveDate, SaveDate
+
+
+class OwnerScopedListTest(TestCase):
+    """Test cases for invitations scoped to their owner."""
+
+    payload = {
+        "title": "Casamento João e Maria",
+        "event_summary": "Venha celebrar conosco este momento especial",
+        "event_times": [{"label": "Cerimônia", "time": "14:00"}],
+        "event_venue": "Salão de Festas",
+        "event_address": "Rua das Flores, 123",
+        "event_city": "São Paulo"
+    }
+
+    def setUp(self):
+        User = get_user_model()
+        self.ana = User.objects.create_user("ana")
+        self.bia = User.objects.create_user("bia")
+        self.client = APIClient()
+
+    def create_save_date(self, owner, title):
+        return SaveDate.objects.create(**dict(self.payload, title=title), owner=owner)
+
+    def test_requires_authentication(self):
+        """Anonymous clients can neither list nor create."""
+        self.assertEqual(self.client.get(reverse("save-date")).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(reverse("save-date"), self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(SaveDate.objects.exists())
+
+    def test_lists_only_own_invitations(self):
+        """Each user lists their own invitations, newest first."""
+        self.create_save_date(self.ana, "Primeiro da Ana")
+        self.create_save_date(self.bia, "Evento da Bia")
+        self.create_save_date(self.ana, "Segundo da Ana")
+        self.client.force_authenticate(self.ana)
+
+        response = self.client.get(reverse("save-date"))
+
+        self.assertEqual([row["title"] for row in response.data], ["Segundo da Ana", "Primeiro da Ana"])
+        self.assertNotIn("owner", response.data[0])
+
+    def test_list_pages_with_a_cursor(self):
+        """The list returns ``limit`` rows and links to the next page until the last."""
+        for title in ["Um", "Dois", "Três", "Quatro", "Cinco"]:
+            self.create_save_date(self.ana, title)
+        self.client.force_authenticate(self.ana)
+
+        titles, url = [], f"{reverse('save-date')}?limit=2"
+        while url:
+            response = self.client.get(url)
+            titles += [row["title"] for row in response.data]
+            url = response.headers.get("Link", "").partition("<")[2].partition(">")[0]
+
+        self.assertEqual(titles, ["Cinco", "Quatro", "Três", "Dois", "Um"])
+        self.assertEqual(self.client.get(reverse("save-date"), {"limit": 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("save-date"), {"cursor": "x"}).status_code, 400)
+
+    def test_create_sets_owner(self):
+        """A created invitation belongs to the requesting user."""
+        token = Token.objects.create(user=self.bia)
+        response = self.client.post(
+            reverse("save-date"), self.payload, format="json", HTTP_AUTHORIZATION=f"Token {token.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SaveDate.objects.get(pk=response.data["data"]["id"]).owner, self.bia)
+
+    def test_listing_uses_owner_index(self):
+        """The owner's rows are read in order from the composite index, without a sort."""
+        queryset = SaveDate.objects.filter(owner=self.ana).order_by("-created_at", "-id")
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+
+        self.assertIn("savedate_owner_created_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class AssignOwnerCommandTest(TestCase):
+    """Test cases for the assign_owner management command."""
+
+    def test_gives_unowned_invitations_to_the_user(self):
+        """Rows created before owners existed are listed for the user afterwards."""
+        ana = get_user_model().objects.create_user("ana")
+        bia = get_user_model().objects.create_user("bia")
+        legacy = SaveDate.objects.create(**OwnerScopedListTest.payload, owner=None)
+        SaveDate.objects.create(**OwnerScopedListTest.payload, owner=bia)
+        ArchivedSaveDate.objects.create(
+            id=uuid.uuid4(), created_at=legacy.created_at, updated_at=legacy.updated_at,
+            **{name: value for name, value in OwnerScopedListTest.payload.items()},
+        )
+
+        out = StringIO()
+        call_command("assign_owner", owner="ana", batch_size=1, stdout=out)
+
+        self.assertIn("Assigned 1 invitations and 1 archived ones to ana.", out.getvalue())
+        legacy.refresh_from_db()
+        self.assertEqual((legacy.owner, legacy.version), (ana, 2))
+        self.assertEqual(SaveDate.objects.filter(owner=bia).count(), 1)
+        self.assertFalse(ArchivedSaveDate.objects.filter(owner=None).exists())
+        client = APIClient()
+        client.force_authenticate(ana)
+        self.assertEqual([row["id"] for row in client.get(reverse("save-date")).data], [str(legacy.pk)])
+
+    def test_unknown_owner(self):
+        with self.assertRaisesMessage(CommandError, "User not found: nobody"):
+            call_command("assign_owner", owner="nobody", stdout=StringIO())
@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import ArchivedSaveDate, SaveDate
+from .testing import QueryBudgetMixin
+
+
+def create_save_date(n, owner=None):
+    return SaveDate.objects.create(
+        owner=owner,
+        title=f"Evento {n}",
+        event_summary="Test description with more than 10 characters",
+        event_times=[{"label": "Cerimônia", "time": "14:00"}],
+        event_venue="Test Venue",
+        event_address="Test Address",
+        event_city=["São Paulo", "Recife", "Natal"][n % 3]
+    )
+
+
+class EndpointQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    Query budgets of every SaveDate endpoint.
+
+    Each endpoint runs a fixed number of queries whatever the table size;
+    raising a budget needs a reason in the commit that does it.
+    """
+
+    sizes = (1, 10, 50)
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.rows = 0
+
+    def add_rows(self, count):
+        for _ in range(count):
+            self.rows += 1
+            create_save_date(self.rows, self.owner)
+
+    def add_archived_rows(self, count):
+        now = timezone.now()
+        for _ in range(count):
+            self.rows += 1
+            ArchivedSaveDate.objects.create(
+                id=f"00000000-0000-0000-0000-{self.rows:012d}",
+                owner=self.owner,
+                title=f"Evento {self.rows}",
+                event_summary="Test description with more than 10 characters",
+                event_times=[{"label": "Cerimônia", "time": "14:00"}],
+                event_venue="Test Venue",
+                event_address="Test Address",
+                event_city="Recife",
+                created_at=now - timedelta(days=400 + self.rows),
+                updated_at=now - timedelta(days=400 + self.rows),
+            )
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_list(self):
+        self.assertQueriesDoNotScale(lambda: self.get(reverse("save-date")), self.add_rows, self.sizes, budget=1)
+
+    @override_settings(SAVEDATE_FEED_SAFETY_LAG=0)
+    def test_change_feed(self):
+        # Changed rows, then tombstones.
+        self.assertQueriesDoNotScale(
+            lambda: self.get(reverse("save-date-changes"), limit=1000), self.add_rows, self.sizes, budget=2
+        )
+
+    def test_stats(self):
+        self.client.force_authenticate(get_user_model().objects.create_user("admin", is_staff=True))
+        self.assertQueriesDoNotScale(lambda: self.get(reverse("save-date-stats")), self.add_rows, self.sizes, budget=2)
+
+    def test_archive_list(self):
+        self.assertQueriesDoNotScale(
+            lambda: self.get(reverse("save-date-archive")), self.add_archived_rows, self.sizes, budget=1
+        )
+
+    def test_detail(self):
+        self.add_rows(1)
+        save_date = SaveDate.objects.first()
+        self.assertQueriesDoNotScale(
+            lambda: self.get(reverse("save-date-detail", args=[save_date.pk])), self.add_rows, self.sizes, budget=1
+        )
+
+    def test_batch(self):
+        def batch():
+            ids = SaveDate.objects.order_by("-created_at").values_list("pk", flat=True)[:20]
+            self.get(reverse("save-date-batch"), ids=",".join(str(pk) for pk in ids))
+
+        # Plus the id lookup above.
+        self.assertQueriesDoNotScale(batch, self.add_rows, self.sizes, budget=2)
+
+    def test_view_count(self):
+        self.add_rows(1)
+        save_date = SaveDate.objects.first()
+        self.assertQueriesDoNotScale(
+            lambda: self.get(reverse("save-date-views", args=[save_date.pk])), self.add_rows, self.sizes, budget=1
+        )
+
+    def test_hit(self):
+        self.add_rows(1)
+        url = reverse("save-date-hit", args=[SaveDate.objects.first().pk])
+
+        def hit():
+            self.assertEqual(self.client.post(url).status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertQueriesDoNotScale(hit, self.add_rows, self.sizes, budget=1)
+
+    def test_archive_detail(self):
+        self.add_archived_rows(1)
+        archived = ArchivedSaveDate.objects.first()
+        self.assertQueriesDoNotScale(
+            lambda: self.get(reverse("save-date-archive-detail", args=[archived.pk])),
+            self.add_archived_rows, self.sizes, budget=1,
+        )
+
+    def test_create(self):
+        def create():
+            response = self.client.post(reverse("save-date"), {
+                "title": "Casamento João e Maria",
+                "event_summary": "Venha celebrar conosco este momento especial",
+                "event_times": [{"label": "Cerimônia", "time": "14:00"}],
+                "event_venue": "Salão de Festas",
+                "event_address": "Rua das Flores, 123",
+                "event_city": "São Paulo"
+            }, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # INSERT, two stats UPDATEs and the task INSERT, plus two savepoint pairs.
+        self.assertQueriesDoNotScale(create, self.add_rows, self.sizes, budget=8)
+
+    def test_update(self):
+        self.add_rows(1)
+        save_date = SaveDate.objects.first()
+        url = reverse("save-date-detail", args=[save_date.pk])
+
+        def update():
+            version = SaveDate.objects.values_list("version", flat=True).get(pk=save_date.pk)
+            with self.assertMaxQueries(3):
+                response = self.client.patch(url, {"title": "Novo título"}, format="json", HTTP_IF_MATCH=f'"{version}"')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # One conditional UPDATE in a savepoint pair, plus the version read above.
+        self.assertQueriesDoNotScale(update, self.add_rows, self.sizes, budget=4)
+
+    def test_admin_changelist(self):
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(user)
+        url = reverse("admin:savedate_savedate_changelist")
+        self.assertQueriesDoNotScale(lambda: self.get(url), self.add_rows, self.sizes, budget=5)
+
+
+class QueryBudgetMixinTest(QueryBudgetMixin, TestCase):
+    """Test that the budget helpers catch what they are meant to."""
+
+    def add_rows(self, count):
+        for n in range(count):
+            create_save_date(n)
+
+    def test_n_plus_one_is_reported(self):
+        """A query per row fails even when every count is under the budget."""
+        def n_plus_one():
+            for pk in SaveDate.objects.values_list("pk", flat=True):
+                SaveDate.objects.get(pk=pk)
+
+        with self.assertRaisesMessage(AssertionError, "Query count grows with the rows"):
+            self.assertQueriesDoNotScale(n_plus_one, self.add_rows, sizes=(1, 2), budget=100)
+
+    def test_budget_is_enforced(self):
+        """Going over the declared limit fails and lists the statements."""
+        with self.assertRaisesMessage(AssertionError, "2 queries executed, the budget is 1"):
+            with self.assertMaxQueries(1):
+                SaveDate.objects.count()
+                SaveDate.objects.exists()
@@ -0,0 +1,101 @@
+import importlib
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import SaveDate
+from .rendering import render
+from .serializers import SaveDateReadSerializer
+
+
+class RenderedJSONTest(TestCase):
+    """Test cases for the pre-rendered SaveDate JSON."""
+
+    def setUp(self):
+        owner = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+        self.save_date = SaveDate.objects.create(
+            owner=owner,
+            title="Casamento João e Maria",
+            event_subtitle="Uma celebração de amor",
+            event_summary="Venha celebrar conosco este momento especial",
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Salão de Festas",
+            event_address="Rua das Flores, 123",
+            event_city="São Paulo"
+        )
+
+    def assertFresh(self, save_date):
+        save_date.refresh_from_db()
+        self.assertEqual(save_date.rendered_json, render(save_date))
+        self.assertEqual(json.loads(save_date.rendered_json), SaveDateReadSerializer(save_date).data)
+
+    def test_every_write_path_renders(self):
+        """save(), save(update_fields), bulk_create and the update endpoint keep the JSON in sync."""
+        self.assertFresh(self.save_date)
+
+        self.save_date.title = "Título Novo"
+        self.save_date.save(update_fields=["title"])
+        self.assertFresh(self.save_date)
+
+        bulk, = SaveDate.objects.bulk_create([SaveDate(
+            title="Outro Evento",
+            event_summary="Test description with more than 10 characters",
+            event_times=[],
+            event_venue="Test Venue",
+            event_address="Test Address",
+            event_city="Recife"
+        )])
+        self.assertFresh(bulk)
+
+        self.client.patch(
+            reverse("save-date-detail", args=[self.save_date.pk]),
+            {"event_city": "Olinda"}, format="json", HTTP_IF_MATCH='"1"'
+        )
+        self.assertFresh(self.save_date)
+        self.assertEqual(json.loads(self.save_date.rendered_json)["version"], 2)
+
+    def test_responses_send_the_stored_bytes(self):
+        """List and detail bodies are the stored JSON, byte for byte."""
+        detail = self.client.get(reverse("save-date-detail", args=[self.save_date.pk]))
+        listing = self.client.get(reverse("save-date"))
+
+        self.assertEqual(detail["Content-Type"], "application/json")
+        self.assertEqual(detail.content, self.save_date.rendered_json.encode())
+        self.assertEqual(listing.content, f"[{self.save_date.rendered_json}]".encode())
+        self.assertEqual(detail.data["title"], "Casamento João e Maria")
+
+    def test_other_renderers_still_work(self):
+        """Indented JSON is rendered from the parsed data."""
+        response = self.client.get(
+            reverse("save-date-detail", args=[self.save_date.pk]), HTTP_ACCEPT="application/json; indent=2"
+        )
+        self.assertIn(b'\n  "title"', response.content)
+
+    def test_check_command_finds_and_fixes_stale_rows(self):
+        """check_rendered_json fails on stale rows and --fix rewrites them."""
+        SaveDate.objects.filter(pk=self.save_date.pk).update(rendered_json="{}")
+
+        with self.assertRaises(CommandError):
+            call_command("check_rendered_json", stdout=StringIO(), stderr=StringIO())
+        out = StringIO()
+        call_command("check_rendered_json", fix=True, stdout=out, stderr=StringIO())
+
+        self.assertIn("1 stale, 1 fixed", out.getvalue())
+        self.assertFresh(self.save_date)
+        call_command("check_rendered_json", stdout=StringIO())
+
+    def test_data_migration_renders_like_the_serializer(self):
+        """The migration that filled rendered_json wrote what the read serializer sends."""
+        migration = importlib.import_module("savedate.migrations.0010_savedate_rendered_json")
+        SaveDate.objects.filter(pk=self.save_date.pk).update(event_subtitle="Linha\u2028quebrada")
+        self.save_date.refresh_from_db()
+
+        self.assertEqual(migration.render(self.save_date), render(self.save_date))
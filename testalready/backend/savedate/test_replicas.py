@@ -0,0 +1,222 @@
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, transaction
+from django.http import HttpResponse
+from rest_framework.authtoken.models import Token
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from . import routers
+from .models import SaveDate
+from .routers import PIN_COOKIE, PrimaryReplicaRouter, ReplicaHealth, ReplicaRoutingMiddleware, use_replica
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@override_settings(SAVEDATE_DB_REPLICAS=["replica"])
+class PrimaryReplicaRouterTest(TransactionTestCase):
+    """Test cases for the primary/replica database router."""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        patcher = mock.patch.object(routers.health, "is_healthy", return_value=True)
+        self.is_healthy = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_use_primary_unless_allowed(self):
+        """Outside a replica-enabled request reads stay on the primary."""
+        self.assertIsNone(self.router.db_for_read(SaveDate))
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(SaveDate), "replica")
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        """A replica that fails its health check is not used."""
+        self.is_healthy.return_value = False
+        with use_replica():
+            self.assertIsNone(self.router.db_for_read(SaveDate))
+
+    def test_reads_inside_transaction_use_primary(self):
+        """Reads in a transaction see its own uncommitted writes."""
+        with use_replica(), transaction.atomic():
+            self.assertIsNone(self.router.db_for_read(SaveDate))
+
+    def test_writes_and_migrations_target_primary(self):
+        """Writes always go to the primary; replicas are never migrated."""
+        with use_replica():
+            self.assertEqual(self.router.db_for_write(SaveDate), "default")
+        self.assertTrue(self.router.allow_migrate("default", "savedate"))
+        self.assertFalse(self.router.allow_migrate("replica", "savedate"))
+
+
+class ReplicaHealthTest(TestCase):
+    """Test cases for the replica lag check."""
+
+    @override_settings(SAVEDATE_DB_REPLICA_MAX_LAG=10)
+    def test_lag_threshold(self):
+        """Replicas within the allowed lag are healthy, others are not."""
+        health = ReplicaHealth()
+        with mock.patch.object(health, "lag", return_value=3.0):
+            self.assertTrue(health.check("replica"))
+        with mock.patch.object(health, "lag", return_value=30.0):
+            self.assertFalse(health.check("replica"))
+        with mock.patch.object(health, "lag", side_effect=DatabaseError):
+            self.assertFalse(health.check("replica"))
+
+    @override_settings(SAVEDATE_DB_REPLICA_CHECK_INTERVAL=60)
+    def test_result_is_cached(self):
+        """The lag queries run at most once per check interval."""
+        health = ReplicaHealth()
+        with mock.patch.object(health, "check", return_value=True) as check:
+            for _ in range(3):
+                self.assertTrue(health.is_healthy("replica"))
+        self.assertEqual(check.call_count, 1)
+
+    def test_lag_against_itself_is_zero(self):
+        """Lag compares the newest update on each database."""
+        SaveDate.objects.create(
+            title="Test Event",
+            event_summary="Test description with more than 10 characters",
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Test Venue",
+            event_address="Test Address",
+            event_city="Recife"
+        )
+        self.assertEqual(ReplicaHealth().lag("default"), 0.0)
+
+
+@override_settings(SAVEDATE_DB_REPLICAS=["replica"], SAVEDATE_DB_PIN_SECONDS=15)
+class ReplicaRoutingMiddlewareTest(TestCase):
+    """Test cases for replica selection and read-your-writes pinning."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+
+        def get_response(request):
+            self.seen.append(routers._use_replica.get())
+            return HttpResponse(status=201 if request.method == "POST" else 200)
+
+        self.middleware = ReplicaRoutingMiddleware(get_response)
+        routers.pin_cache().clear()
+        self.addCleanup(routers.pin_cache().clear)
+
+    def request(self, method, user=None, **headers):
+        request = getattr(self.factory, method)("/", **headers)
+        request.user = user or AnonymousUser()
+        return request
+
+    def test_safe_requests_may_use_replicas(self):
+        """GET requests read from replicas; writes do not."""
+        self.middleware(self.factory.get("/"))
+        response = self.middleware(self.factory.post("/"))
+
+        self.assertEqual(self.seen, [True, False])
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 15)
+
+    def test_pin_cookie_reads_from_primary(self):
+        """A client that just wrote reads from the primary until the pin expires."""
+        pinned = self.factory.get("/")
+        pinned.COOKIES[PIN_COOKIE] = str(int(time.time()) + 15)
+        expired = self.factory.get("/")
+        expired.COOKIES[PIN_COOKIE] = str(int(time.time()) - 1)
+
+        self.middleware(pinned)
+        self.middleware(expired)
+
+        self.assertEqual(self.seen, [False, True])
+
+    def test_pin_follows_the_user_without_cookies(self):
+        """After a write, the same user reads from the primary by session or token; others do not."""
+        ana, bia = (get_user_model().objects.create_user(name) for name in ("ana", "bia"))
+        token = Token.objects.create(user=ana)
+        self.middleware(self.request("post", ana))
+
+        self.middleware(self.request("get", ana))
+        self.middleware(self.request("get", HTTP_AUTHORIZATION=f"Token {token.key}"))
+        self.middleware(self.request("get", bia))
+        self.middleware(self.request("get"))
+
+        self.assertEqual(self.seen, [False, False, False, True, True])
+
+    @override_settings(SAVEDATE_DB_PIN_CACHE="default")
+    def test_serve_refuses_per_process_pins_with_several_workers(self):
+        """Several workers cannot share pins kept in local memory."""
+        with self.assertRaisesMessage(CommandError, "local-memory cache"):
+            call_command("serve", workers=2)
+
+    @override_settings(SAVEDATE_DB_REPLICAS=[])
+    def test_disabled_without_replicas(self):
+        """The middleware removes itself when no replica is configured."""
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(lambda request: HttpResponse())
+
+
+SCRIPT = """
+import json, os, sys, tempfile
+os.environ["DJANGO_SETTINGS_MODULE"] = "backend.settings"
+from django.conf import settings
+tmpdir = tempfile.mkdtemp()
+settings.DATABASES["default"]["NAME"] = os.path.join(tmpdir, "primary.sqlite3")
+settings.DATABASES["replica"] = {"ENGINE": "django.db.backends.sqlite3", "NAME": os.path.join(tmpdir, "replica.sqlite3")}
+settings.SAVEDATE_DB_REPLICAS = ["replica"]
+settings.CACHES["savedate_pins"]["LOCATION"] = os.path.join(tmpdir, "pins")
+settings.SAVEDATE_TASKS_EAGER = True
+import django
+django.setup()
+from django.core.management import call_command
+from django.test import Client
+call_command("migrate", verbosity=0)
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+auth = {"HTTP_HOST": "localhost", "HTTP_AUTHORIZATION": f"Token {Token.objects.create(user=User.objects.create_user('ana')).key}"}
+staff_token = Token.objects.create(user=User.objects.create_user("admin", is_staff=True))
+writer, other_device = Client(**auth), Client(**auth)
+staff = Client(HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Token {staff_token.key}")
+payload = {
+    "title": "Evento", "event_summary": "Um resumo válido para teste de réplica",
+    "event_times": [{"label": "Festa", "time": "20:00"}], "event_venue": "Salão Central",
+    "event_address": "Rua Exemplo, 123", "event_city": "Recife",
+}
+Client(**auth).post("/api/save-date/", payload, content_type="application/json")
+call_command("sync_replicas", stdout=open(os.devnull, "w"))
+
+created = writer.post("/api/save-date/", payload, content_type="application/json")
+
+def recife_total():
+    return staff.get("/api/save-date/stats/").json()["cities"][0]["total"]
+
+before_sync = {
+    "writer": len(writer.get("/api/save-date/").json()),
+    "other_device": len(other_device.get("/api/save-date/").json()),
+    "staff": recife_total(),
+}
+call_command("sync_replicas", stdout=open(os.devnull, "w"))
+print(json.dumps({
+    "create": created.status_code,
+    "before_sync": before_sync,
+    "after_sync": recife_total(),
+}))
+"""
+
+
+class ReplicaRoutingEndToEndTest(SimpleTestCase):
+    """Test replica routing against real SQLite files in a fresh interpreter."""
+
+    def test_read_your_writes_with_stale_replica(self):
+        """The writer sees its row at once, on any device; others see it once the replica syncs."""
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        self.assertEqual(result["create"], 201)
+        self.assertEqual(result["before_sync"], {"writer": 2, "other_device": 2, "staff": 1})
+        self.assertEqual(result["after_sync"], 2)
@@ -0,0 +1,88 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import urllib.request
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SCRIPT = """
+import os, sys
+os.environ["DJANGO_SETTINGS_MODULE"] = "backend.settings"
+from django.conf import settings
+settings.DATABASES["default"]["NAME"] = os.environ["SERVE_TEST_DB"]
+settings.ALLOWED_HOSTS = ["*"]
+settings.SAVEDATE_VIEW_FLUSH_INTERVAL = None
+settings.SAVEDATE_SERVE_TIMEOUT = 1
+import django
+django.setup()
+from django.core.management import call_command
+call_command("migrate", verbosity=0)
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+admin, _ = User.objects.get_or_create(username="admin", defaults={"is_staff": True})
+Token.objects.get_or_create(user=admin, key=os.environ["SERVE_TEST_TOKEN"])
+call_command("serve", bind="127.0.0.1:0", workers=2, max_requests=3, max_requests_jitter=0)
+"""
+
+
+class ServeCommandTest(SimpleTestCase):
+    """Test the pre-forking server in a separate process."""
+
+    def setUp(self):
+        self.token = "0" * 40
+        env = dict(
+            os.environ, SERVE_TEST_DB=os.path.join(tempfile.mkdtemp(), "db.sqlite3"), SERVE_TEST_TOKEN=self.token
+        )
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        self.addCleanup(self.process.kill)
+        self.url = self.expect("listening on").rsplit(" ", 1)[1]
+
+    def expect(self, text):
+        for line in self.process.stdout:
+            if text in line:
+                return line.strip()
+        self.fail(f"Server exited before printing {text!r}")
+
+    def get(self):
+        request = urllib.request.Request(
+            f"{self.url}api/save-date/stats/", headers={"Authorization": f"Token {self.token}"}
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.load(response)
+
+    def test_serves_recycles_reloads_and_stops(self):
+        """Workers answer, restart after their limit, survive a reload and stop on SIGTERM."""
+        for _ in range(8):
+            self.assertEqual(self.get(), (200, {"cities": [], "daily": []}))
+        self.expect("recycled after its request limit")
+
+        self.process.send_signal(signal.SIGHUP)
+        self.expect("Reloaded")
+        self.assertEqual(self.get()[0], 200)
+
+        self.process.send_signal(signal.SIGTERM)
+        self.expect("Shutting down")
+        self.assertEqual(self.process.wait(timeout=30), 0)
+
+    def test_idle_connections_do_not_hold_workers(self):
+        """Connections that never send a request are dropped after the timeout."""
+        host, port = self.url.split("//")[1].rstrip("/").rsplit(":", 1)
+        idle = [socket.create_connection((host, int(port))) for _ in range(2)]
+        try:
+            self.assertEqual(self.get()[0], 200)
+            for sock in idle:
+                sock.settimeout(10)
+                self.assertEqual(sock.recv(1), b"")
+        finally:
+            for sock in idle:
+                sock.close()
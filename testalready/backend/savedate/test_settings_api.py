@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SCRIPT = """
+import json, os, sys
+os.environ["DJANGO_SETTINGS_MODULE"] = "backend.settings_api"
+from django.conf import settings
+settings.DATABASES["default"]["NAME"] = ":memory:"
+settings.SAVEDATE_TASKS_EAGER = True
+import backend.wsgi
+from django.core.management import call_command
+call_command("migrate", verbosity=0)
+from django.contrib.auth.models import User
+from django.test import Client
+User.objects.create_user("ana", password="s3nha-segura")
+client = Client(HTTP_HOST="localhost")
+anonymous = client.get("/api/save-date/").status_code
+token = client.post("/api/token/", {"username": "ana", "password": "s3nha-segura"}, content_type="application/json")
+client = Client(HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Token {token.json()['token']}")
+payload = {
+    "title": "Evento API", "event_summary": "Um resumo válido para teste de API",
+    "event_times": [{"label": "Festa", "time": "20:00"}], "event_venue": "Salão Central",
+    "event_address": "Rua Exemplo, 123", "event_city": "São Paulo",
+}
+print(json.dumps({
+    "anonymous": anonymous,
+    "create": client.post("/api/save-date/", payload, content_type="application/json").status_code,
+    "list": client.get("/api/save-date/").status_code,
+    "admin": client.get("/admin/").status_code,
+    "apps": [app for app in settings.INSTALLED_APPS if app.startswith("django.contrib.")],
+    "middleware": len(settings.MIDDLEWARE),
+    "sessions": "django.contrib.sessions" in sys.modules,
+}))
+"""
+
+
+class ApiSettingsProfileTest(SimpleTestCase):
+    """Test the API-only settings profile in a fresh interpreter."""
+
+    def test_serves_api_without_admin_or_sessions(self):
+        """The API works without the admin, sessions or messages."""
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        self.assertEqual(result["anonymous"], 401)
+        self.assertEqual(result["create"], 201)
+        self.assertEqual(result["list"], 200)
+        self.assertEqual(result["admin"], 404)
+        self.assertEqual(result["apps"], ["django.contrib.contenttypes", "django.contrib.auth"])
+        self.assertEqual(result["middleware"], 8)
+        self.assertFalse(result["sessions"])
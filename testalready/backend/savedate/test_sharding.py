@@ -0,0 +1,148 @@
+import json
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from .models import SaveDate
+from .sharding import ShardRouter, group_by_shard, is_sharded, shard_for
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@override_settings(SAVEDATE_SHARDS=["default", "shard1", "shard2"])
+class ShardSelectionTest(SimpleTestCase):
+    """Test cases for mapping SaveDate ids to shards."""
+
+    def test_shard_is_a_stable_hash_of_the_id(self):
+        """The same id always maps to the same shard, and ids spread evenly."""
+        ids = [uuid.uuid4() for _ in range(3000)]
+        self.assertEqual([shard_for(pk) for pk in ids], [shard_for(str(pk)) for pk in ids])
+
+        groups = group_by_shard([SaveDate(id=pk) for pk in ids])
+        self.assertEqual(set(groups), {"default", "shard1", "shard2"})
+        for rows in groups.values():
+            self.assertGreater(len(rows), 800)
+
+    def test_router_follows_the_instance(self):
+        """Saving an instance without an alias targets its shard."""
+        save_date = SaveDate(id=uuid.uuid4())
+        self.assertEqual(ShardRouter().db_for_write(SaveDate, instance=save_date), shard_for(save_date.pk))
+
+    def test_extra_shards_only_get_sharded_tables(self):
+        """Extra shards hold SaveDate, stats and tasks; data migrations skip them."""
+        router = ShardRouter()
+        self.assertTrue(router.allow_migrate("shard1", "savedate", model_name="savedate"))
+        self.assertTrue(router.allow_migrate("shard1", "savedate", model_name="backgroundtask"))
+        self.assertFalse(router.allow_migrate("shard1", "savedate", model_name="archivedsavedate"))
+        self.assertFalse(router.allow_migrate("shard1", "auth", model_name="user"))
+        self.assertFalse(router.allow_migrate("shard1", "savedate"))
+        self.assertIsNone(router.allow_migrate("default", "savedate", model_name="archivedsavedate"))
+
+    @override_settings(SAVEDATE_SHARDS=["shard1", "default"])
+    def test_default_must_come_first(self):
+        """Misordered shards are rejected instead of silently rehashing rows."""
+        with self.assertRaises(ImproperlyConfigured):
+            shard_for(uuid.uuid4())
+
+    @override_settings(SAVEDATE_SHARDS=["default"])
+    def test_single_shard_is_not_sharded(self):
+        """With one shard everything stays on default."""
+        self.assertFalse(is_sharded())
+        self.assertEqual(shard_for(uuid.uuid4()), "default")
+
+
+SCRIPT = """
+import json, os, tempfile
+os.environ["DJANGO_SETTINGS_MODULE"] = "backend.settings"
+from django.conf import settings
+tmpdir = tempfile.mkdtemp()
+aliases = ["default", "shard1", "shard2"]
+for alias in aliases:
+    settings.DATABASES[alias] = {"ENGINE": "django.db.backends.sqlite3", "NAME": os.path.join(tmpdir, alias)}
+settings.SAVEDATE_SHARDS = aliases
+settings.SAVEDATE_FEED_SAFETY_LAG = 0
+import django
+django.setup()
+from django.core.management import call_command
+from django.test import Client
+from savedate import tasks
+from savedate.models import SaveDate
+for alias in aliases:
+    call_command("migrate", database=alias, verbosity=0)
+tasks._runner = tasks.TaskRunner()  # Not started: tasks are run below.
+
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+token = Token.objects.create(user=User.objects.create_user("ana"))
+client = Client(HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Token {token.key}")
+created = []
+for i in range(30):
+    response = client.post("/api/save-date/", {
+        "title": f"Evento {i}", "event_summary": "Um resumo válido para teste de shards",
+        "event_times": [{"label": "Festa", "time": "20:00"}], "event_venue": "Salão Central",
+        "event_address": "Rua Exemplo, 123", "event_city": ["Recife", "Natal"][i % 2],
+    }, content_type="application/json")
+    created.append(response.json()["data"])
+
+feed, cursor = [], ""
+while True:
+    page = client.get("/api/save-date/changes/", {"limit": 7, "cursor": cursor}).json()
+    feed += [row["id"] for row in page["results"]]
+    cursor = page["next_cursor"]
+    if not page["has_more"]:
+        break
+
+target = created[0]
+detail = client.get(f"/api/save-date/{target['id']}/")
+patched = client.patch(
+    f"/api/save-date/{target['id']}/", {"event_city": "Natal"},
+    content_type="application/json", HTTP_IF_MATCH=detail["ETag"],
+)
+staff = Client(HTTP_HOST="localhost")
+staff.force_login(User.objects.create_user("admin", is_staff=True))
+stats = staff.get("/api/save-date/stats/").json()
+call_command("rebuild_city_stats", stdout=open(os.devnull, "w"))
+
+print(json.dumps({
+    "per_shard": {alias: SaveDate.objects.using(alias).count() for alias in aliases},
+    "list": [row["id"] for row in client.get("/api/save-date/").json()],
+    "newest_first": [row["id"] for row in sorted(created, key=lambda r: (r["created_at"], r["id"]), reverse=True)],
+    "feed": feed,
+    "batch": [row["id"] for row in client.get(
+        "/api/save-date/batch/", {"ids": ",".join(row["id"] for row in created[:10])}
+    ).json()["results"]],
+    "created": [row["id"] for row in created],
+    "detail": detail.status_code,
+    "patched": patched.status_code,
+    "stats": stats["cities"],
+    "rebuilt": staff.get("/api/save-date/stats/").json()["cities"],
+    "tasks_run": tasks._runner.run_pending(),
+}))
+"""
+
+
+class ShardedApiEndToEndTest(SimpleTestCase):
+    """Test the API against three SQLite shards in a fresh interpreter."""
+
+    def test_api_over_shards(self):
+        """Rows spread over shards; lists, feed, detail and stats stay consistent."""
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        self.assertEqual(sum(result["per_shard"].values()), 30)
+        self.assertTrue(all(result["per_shard"].values()), result["per_shard"])
+        self.assertEqual(result["list"], result["newest_first"])
+        self.assertEqual(result["feed"], result["newest_first"][::-1])
+        self.assertEqual(result["batch"], result["created"][:10])
+        self.assertEqual(result["detail"], 200)
+        self.assertEqual(result["patched"], 200)
+        expected = [{"event_city": "Natal", "total": 16}, {"event_city": "Recife", "total": 14}]
+        self.assertEqual(result["stats"], expected)
+        self.assertEqual(result["rebuilt"], expected)
+        self.assertEqual(result["tasks_run"], 30)
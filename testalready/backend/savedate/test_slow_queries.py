@@ -0,0 +1,68 @@
+import json
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import SaveDate
+from .slow_queries import param_shape
+
+
+class SlowQueryLogTest(TestCase):
+    """Test cases for the slow-query log."""
+
+    def setUp(self):
+        owner = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+        self.save_date = SaveDate.objects.create(
+            owner=owner,
+            title="Test Event",
+            event_summary="Test description with more than 10 characters",
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Test Venue",
+            event_address="Test Address",
+            event_city="Recife"
+        )
+
+    def entries(self, logs):
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    @override_settings(SAVEDATE_SLOW_QUERY_MS=0)
+    def test_entry_has_view_params_and_plan(self):
+        """Each entry names the view and carries the parameter types and query plan."""
+        with self.assertLogs("savedate.slow_queries", "WARNING") as logs:
+            self.client.get(reverse("save-date-detail", args=[self.save_date.pk]))
+
+        entry = next(e for e in self.entries(logs) if "savedate_savedate" in e["sql"])
+        self.assertEqual(entry["view"], "save-date-detail")
+        self.assertEqual(entry["database"], "default")
+        self.assertEqual(entry["params"], ["int", "str"])
+        self.assertIn("%s", entry["sql"])
+        self.assertNotIn(self.save_date.pk.hex, json.dumps(entry))
+        self.assertTrue(any("USING INDEX" in step for step in entry["plan"]), entry["plan"])
+        self.assertGreaterEqual(entry["duration_ms"], 0)
+
+    @override_settings(SAVEDATE_SLOW_QUERY_MS=0)
+    def test_queries_outside_requests_have_no_view(self):
+        """Queries from commands or tasks are logged without a view."""
+        with self.assertLogs("savedate.slow_queries", "WARNING") as logs:
+            SaveDate.objects.filter(event_city="Recife").count()
+
+        entry = self.entries(logs)[-1]
+        self.assertIsNone(entry["view"])
+        self.assertTrue(entry["plan"])
+
+    @override_settings(SAVEDATE_SLOW_QUERY_MS=10_000)
+    def test_fast_queries_are_not_logged(self):
+        """Only statements above the threshold are logged."""
+        with self.assertNoLogs("savedate.slow_queries", "WARNING"):
+            self.client.get(reverse("save-date"))
+
+    def test_param_shape(self):
+        """Parameters are reduced to their types."""
+        self.assertEqual(param_shape(["Recife", 3, datetime(2026, 1, 1)]), ["str", "int", "datetime"])
+        self.assertEqual(param_shape([("a", 1), ("b", 2)], many=True), {"rows": 2, "first": ["str", "int"]})
+        self.assertEqual(param_shape(None), [])
@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+import uuid
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import snapshots
+from .models import SaveDate
+
+@override_settings(SAVEDATE_TASKS_EAGER=True)
+class SnapshotTest(TestCase):
+    """Test cases for the static invitation snapshots."""
+
+    payload = {
+        "title": "Casamento <João> & Maria",
+        "event_summary": "Venha celebrar conosco este momento especial",
+        "event_times": [{"label": "Cerimônia", "time": "14:00"}],
+        "event_venue": "Salão de Festas",
+        "event_address": "Rua das Flores, 123",
+        "event_city": "São Paulo"
+    }
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        snapshot_dir = override_settings(SAVEDATE_SNAPSHOT_DIR=tmpdir.name)
+        snapshot_dir.enable()
+        self.addCleanup(snapshot_dir.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user("ana"))
+
+    def create(self):
+        response = self.client.post(reverse("save-date"), self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()["data"]
+
+    def read(self, pk):
+        html_path, json_path = snapshots.paths(pk)
+        return html_path.read_text(encoding="utf-8"), json.loads(json_path.read_text(encoding="utf-8"))
+
+    def test_create_writes_html_and_json(self):
+        """The JSON is the detail body and the HTML page escapes user input."""
+        data = self.create()
+        html, stored = self.read(data["id"])
+        self.assertEqual(stored, self.client.get(reverse("save-date-detail", args=[data["id"]])).json())
+        self.assertIn("<h1>Casamento &lt;João&gt; &amp; Maria</h1>", html)
+        self.assertIn("<li><time>14:00</time> Cerimônia</li>", html)
+        self.assertIn(f'navigator.sendBeacon("/api/save-date/{data["id"]}/hit/")', html)
+        self.assertEqual(sorted(path.name for path in self.root.iterdir()),
+                         sorted([f"{data['id']}.html", f"{data['id']}.json", ".locks"]))
+
+    def test_update_replaces_the_snapshot(self):
+        data = self.create()
+        url = reverse("save-date-detail", args=[data["id"]])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {"title": "Novo título"}, format="json", HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        html, stored = self.read(data["id"])
+        self.assertEqual((stored["version"], stored["title"]), (2, "Novo título"))
+        self.assertIn("<h1>Novo título</h1>", html)
+
+    def test_older_versions_never_replace_newer_ones(self):
+        """A late task for an old version leaves the newer snapshot, and invalidation spares it."""
+        data = self.create()
+        old = SaveDate.objects.get(pk=data["id"]).rendered_json
+        self.client.patch(
+            reverse("save-date-detail", args=[data["id"]]), {"title": "Novo título"}, format="json",
+            HTTP_IF_MATCH='"1"',
+        )
+        self.assertFalse(snapshots.write(old))
+        snapshots.invalidate(data["id"], below_version=2)
+        self.assertEqual(self.read(data["id"])[1]["version"], 2)
+
+    def test_writes_outside_the_api_refresh_the_snapshot(self):
+        """Model saves, check_rendered_json --fix and imports all write snapshots."""
+        data = self.create()
+        save_date = SaveDate.objects.get(pk=data["id"])
+        save_date.title = "Editado no admin"
+        with self.captureOnCommitCallbacks(execute=True):
+            save_date.save()
+        self.assertEqual(self.read(data["id"])[1]["title"], "Editado no admin")
+
+        SaveDate.objects.filter(pk=data["id"]).update(rendered_json=json.dumps(dict(data, title="Antigo")))
+        for path in snapshots.paths(data["id"]):
+            path.unlink()
+        call_command("check_rendered_json", fix=True, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(self.read(data["id"])[1]["title"], "Editado no admin")
+
+        path = self.root / "import.ndjson"
+        path.write_text(json.dumps(self.payload) + "\n", encoding="utf-8")
+        call_command("import_savedates", str(path), owner="ana", workers=0, stdout=StringIO())
+        imported = SaveDate.objects.exclude(pk=data["id"]).get()
+        self.assertEqual(self.read(imported.pk)[1], json.loads(imported.rendered_json))
+
+    def test_delete_removes_the_snapshot(self):
+        data = self.create()
+        with self.captureOnCommitCallbacks(execute=True):
+            SaveDate.objects.filter(pk=data["id"]).delete()
+        self.assertFalse(any(path.exists() for path in snapshots.paths(data["id"])))
+
+    def test_rebuild_rewrites_and_prunes(self):
+        """The rebuild restores every snapshot and removes orphans and leftovers."""
+        first, second = self.create(), self.create()
+        for path in snapshots.paths(first["id"]):
+            path.unlink()
+        orphan = self.root / "00000000-0000-0000-0000-000000000000.html"
+        leftover = self.root / f".{second['id']}.json.x.tmp"
+        for path in (orphan, leftover):
+            path.write_text("old")
+            os.utime(path, (0, 0))
+
+        out = StringIO()
+        call_command("rebuild_snapshots", workers=2, chunk_size=1, stdout=out)
+        self.assertIn("Wrote 2 of 2 snapshots and removed 1 orphaned ones", out.getvalue())
+        self.assertEqual(self.read(first["id"])[1]["id"], first["id"])
+        self.assertFalse(orphan.exists())
+        self.assertFalse(leftover.exists())
+
+    def test_writes_of_other_invitations_do_not_wait_for_a_lock(self):
+        """The lock is taken per invitation, not for the whole directory."""
+        data = self.create()
+        rendered = SaveDate.objects.get(pk=data["id"]).rendered_json
+        neighbour = uuid.UUID(int=(uuid.UUID(data["id"]).int + 1) % 2 ** 128)
+        with snapshots._locked(self.root, neighbour):
+            self.assertTrue(snapshots.write(rendered))
+
+    def test_guest_page_serves_the_snapshot_html(self):
+        """Django's /i/<id> fallback sends the snapshot's page, built from the row."""
+        data = self.create()
+        response = APIClient().get(reverse("save-date-page", args=[data["id"]]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content.decode(), self.read(data["id"])[0])
+        self.assertEqual(APIClient().get(reverse("save-date-page", args=[uuid.uuid4()])).status_code, 404)
+
+    def test_disabled_snapshots_write_nothing(self):
+        with self.settings(SAVEDATE_SNAPSHOT_DIR=None):
+            self.create()
+        self.assertEqual(list(self.root.iterdir()), [])
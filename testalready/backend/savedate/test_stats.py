@@ -0,0 +1,106 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import stats
+from .models import CityDailyStats, CityStats, SaveDate
+
+
+class CityStatsTest(TestCase):
+    """Test cases for the incrementally maintained city statistics."""
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user("ana", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = reverse("save-date-stats")
+
+    def create_save_date(self, city):
+        return SaveDate.objects.create(
+            owner=self.owner,
+            title="Test Event",
+            event_summary="Test description with more than 10 characters",
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Test Venue",
+            event_address="Test Address",
+            event_city=city
+        )
+
+    def totals(self):
+        return dict(CityStats.objects.values_list("event_city", "total"))
+
+    def test_create_and_delete_update_counts(self):
+        """Counts follow creates and deletes without touching SaveDate."""
+        first = self.create_save_date("São Paulo")
+        self.create_save_date("São Paulo")
+        self.create_save_date("Recife")
+        self.assertEqual(self.totals(), {"São Paulo": 2, "Recife": 1})
+        self.assertEqual(CityDailyStats.objects.get(event_city="São Paulo").count, 2)
+
+        first.delete()
+        self.assertEqual(self.totals(), {"São Paulo": 1, "Recife": 1})
+
+    def test_deleting_rows_of_the_same_city_and_day_counts_each(self):
+        """record_deleted subtracts one per row, not one per city and day."""
+        save_dates = [self.create_save_date("Recife") for _ in range(3)]
+        stats.record_deleted(save_dates[:2])
+        self.assertEqual(self.totals(), {"Recife": 1})
+        self.assertEqual(CityDailyStats.objects.get(event_city="Recife").count, 1)
+
+    def test_city_change_moves_the_count(self):
+        """Changing event_city through PATCH moves one count between cities."""
+        save_date = self.create_save_date("São Paulo")
+        self.client.patch(
+            reverse("save-date-detail", args=[save_date.pk]),
+            {"event_city": "Recife"}, format="json", HTTP_IF_MATCH='"1"'
+        )
+        self.assertEqual(self.totals(), {"São Paulo": 0, "Recife": 1})
+
+    def test_archiving_keeps_counts(self):
+        """Archived invitations still count."""
+        save_date = self.create_save_date("Recife")
+        SaveDate.objects.filter(pk=save_date.pk).update(created_at=timezone.now() - timedelta(days=400))
+        call_command("archive_savedates", sleep=0, stdout=StringIO())
+
+        self.assertFalse(SaveDate.objects.exists())
+        self.assertEqual(self.totals(), {"Recife": 1})
+
+    def test_rebuild_matches_incremental_counts(self):
+        """The rebuild command recomputes the same numbers from scratch."""
+        for city in ["São Paulo", "São Paulo", "Recife"]:
+            self.create_save_date(city)
+        before = self.totals()
+        CityStats.objects.update(total=0)
+
+        call_command("rebuild_city_stats", stdout=StringIO())
+        self.assertEqual(self.totals(), before)
+
+    def test_endpoint_reads_only_stats_tables(self):
+        """The endpoint never queries the SaveDate table."""
+        self.create_save_date("São Paulo")
+        self.create_save_date("Recife")
+        self.create_save_date("Recife")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"city": "Recife"})
+
+        self.assertEqual(response.data["cities"][0], {"event_city": "Recife", "total": 2})
+        self.assertEqual(len(response.data["daily"]), 1)
+        self.assertEqual(response.data["daily"][0]["count"], 2)
+        self.assertFalse(any("savedate_savedate" in q["sql"] for q in queries.captured_queries))
+        self.assertEqual(self.client.get(self.url, {"days": "0"}).status_code, 400)
+
+    def test_endpoint_is_staff_only(self):
+        """Anonymous users and users who are not staff cannot read the stats."""
+        self.assertEqual(APIClient().get(self.url).status_code, 401)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user("bia"))
+        self.assertEqual(client.get(self.url).status_code, 403)
@@ -0,0 +1,160 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import BackgroundTask
+from .tasks import TaskRunner, enqueue, task
+
+calls = []
+
+
+@task("tests.record", max_attempts=2)
+def record(value, fail=False):
+    calls.append(value)
+    if fail:
+        raise RuntimeError("boom")
+
+
+class BackgroundTaskTest(TestCase):
+    """Test cases for the durable background task queue."""
+
+    def setUp(self):
+        calls.clear()
+        self.runner = TaskRunner(concurrency=2)
+
+    def test_enqueue_persists_and_runner_executes(self):
+        """Queued tasks are stored, then run with their payload and timing."""
+        background_task = enqueue("tests.record", value=1)
+        self.assertEqual(background_task.status, BackgroundTask.PENDING)
+
+        self.assertEqual(self.runner.run_pending(), 1)
+
+        background_task.refresh_from_db()
+        self.assertEqual(calls, [1])
+        self.assertEqual(background_task.status, BackgroundTask.DONE)
+        self.assertEqual(background_task.attempts, 1)
+        self.assertIsNotNone(background_task.duration_ms)
+        self.assertEqual(self.runner.metrics()["tests.record"]["runs"], 1)
+
+    def test_failed_task_is_retried_then_marked_failed(self):
+        """Failures back off and retry until max_attempts is reached."""
+        background_task = enqueue("tests.record", value=2, fail=True)
+
+        self.runner.run_pending()
+        background_task.refresh_from_db()
+        self.assertEqual(background_task.status, BackgroundTask.PENDING)
+        self.assertGreater(background_task.run_after, timezone.now())
+        self.assertIn("boom", background_task.last_error)
+
+        BackgroundTask.objects.filter(pk=background_task.pk).update(run_after=timezone.now())
+        self.runner.run_pending()
+        background_task.refresh_from_db()
+        self.assertEqual(background_task.status, BackgroundTask.FAILED)
+        self.assertEqual(calls, [2, 2])
+        self.assertEqual(self.runner.metrics()["tests.record"]["failures"], 2)
+
+    def test_expired_lease_is_reclaimed(self):
+        """A task left running by a dead worker runs again after its lease."""
+        background_task = enqueue("tests.record", value=3)
+        BackgroundTask.objects.filter(pk=background_task.pk).update(
+            status=BackgroundTask.RUNNING, attempts=1, run_after=timezone.now() + timedelta(minutes=5)
+        )
+        self.assertEqual(self.runner.run_pending(), 0)
+
+        BackgroundTask.objects.filter(pk=background_task.pk).update(run_after=timezone.now())
+        self.assertEqual(self.runner.run_pending(), 1)
+        self.assertEqual(calls, [3])
+
+    def test_expired_last_attempt_is_failed_not_reclaimed(self):
+        """A worker dying on the last attempt leaves the task failed instead of running it again."""
+        background_task = enqueue("tests.record", value=5)
+        BackgroundTask.objects.filter(pk=background_task.pk).update(
+            status=BackgroundTask.RUNNING, attempts=2, run_after=timezone.now()
+        )
+
+        self.assertEqual(self.runner.run_pending(), 0)
+        background_task.refresh_from_db()
+        self.assertEqual((background_task.status, background_task.attempts), (BackgroundTask.FAILED, 2))
+        self.assertEqual(calls, [])
+
+    def test_running_tasks_keep_their_lease(self):
+        """The heartbeat pushes back the lease of tasks still running here, and only theirs."""
+        running, other = enqueue("tests.record", value=6), enqueue("tests.record", value=7)
+        soon = timezone.now() + timedelta(seconds=1)
+        BackgroundTask.objects.update(status=BackgroundTask.RUNNING, attempts=1, run_after=soon)
+        self.runner._running.add(("default", running.pk, 1))
+
+        self.runner.renew_leases()
+        running.refresh_from_db()
+        other.refresh_from_db()
+        self.assertGreater(running.run_after, timezone.now() + timedelta(seconds=200))
+        self.assertEqual(other.run_after, soon)
+
+    def test_stale_claim_does_not_overwrite_a_newer_attempt(self):
+        """A worker that lost its lease cannot mark the reclaimed task done."""
+        background_task = enqueue("tests.record", value=8)
+        stale = self.runner.claim(limit=1)[0]
+        BackgroundTask.objects.filter(pk=background_task.pk).update(attempts=2)
+
+        self.runner.execute(stale)
+        background_task.refresh_from_db()
+        self.assertEqual(background_task.status, BackgroundTask.RUNNING)
+
+    def test_prune_deletes_old_finished_tasks(self):
+        """Done and failed tasks are deleted after their retention; recent and pending ones stay."""
+        old_done, old_failed, recent_done, pending = (enqueue("tests.record", value=value) for value in range(4))
+        long_ago = timezone.now() - timedelta(days=40)
+        BackgroundTask.objects.filter(pk=old_done.pk).update(status=BackgroundTask.DONE, updated_at=long_ago)
+        BackgroundTask.objects.filter(pk=old_failed.pk).update(status=BackgroundTask.FAILED, updated_at=long_ago)
+        BackgroundTask.objects.filter(pk=recent_done.pk).update(status=BackgroundTask.DONE)
+        BackgroundTask.objects.filter(pk=pending.pk).update(updated_at=long_ago)
+
+        out = StringIO()
+        call_command("prune_tasks", sleep=0, stdout=out)
+        self.assertIn("Deleted 1 done and 1 failed tasks.", out.getvalue())
+        self.assertEqual(set(BackgroundTask.objects.values_list("pk", flat=True)), {recent_done.pk, pending.pk})
+
+    def test_dispatch_claims_only_free_slots(self):
+        """The dispatcher leaves tasks pending rather than claiming more than it can start."""
+        for value in range(3):
+            enqueue("tests.record", value=value)
+        submitted = []
+        self.runner._executor = type("Executor", (), {"submit": lambda _, fn, arg: submitted.append(arg)})()
+        self.runner._slots.acquire()
+
+        self.assertEqual(len(self.runner._dispatch_once()), 1)
+        self.assertEqual(len(submitted), 1)
+        self.assertEqual(BackgroundTask.objects.filter(status=BackgroundTask.PENDING).count(), 2)
+
+    @override_settings(SAVEDATE_TASKS_EAGER=True)
+    def test_eager_mode_runs_inline(self):
+        """Eager mode skips the queue."""
+        self.assertIsNone(enqueue("tests.record", value=4))
+        self.assertEqual(calls, [4])
+        self.assertFalse(BackgroundTask.objects.exists())
+
+    def test_create_queues_audit_task(self):
+        """Creating a SaveDate queues its side effects instead of running them."""
+        payload = {
+            "title": "Casamento João e Maria",
+            "event_summary": "Venha celebrar conosco este momento especial",
+            "event_times": [{"label": "Cerimônia", "time": "14:00"}],
+            "event_venue": "Salão de Festas",
+            "event_address": "Rua das Flores, 123",
+            "event_city": "São Paulo"
+        }
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user("ana"))
+        response = client.post(reverse("save-date"), payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        background_task = BackgroundTask.objects.get()
+        self.assertEqual(background_task.name, "savedate.audit_created")
+        self.assertEqual(background_task.payload["save_date_id"], response.data["data"]["id"])
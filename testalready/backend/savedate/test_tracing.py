@@ -0,0 +1,90 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import SaveDate
+
+
+class TracingTest(TestCase):
+    """Test cases for request tracing spans."""
+
+    payload = {
+        "title": "Casamento João e Maria",
+        "event_summary": "Venha celebrar conosco este momento especial",
+        "event_times": [{"label": "Cerimônia", "time": "14:00"}, {"label": "Festa", "time": "20:00"}],
+        "event_venue": "Salão de Festas",
+        "event_address": "Rua das Flores, 123",
+        "event_city": "São Paulo"
+    }
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def spans(self, logs):
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    @override_settings(SAVEDATE_TRACE_SAMPLE_RATE=1.0)
+    def test_create_is_traced_stage_by_stage(self):
+        """A sampled create exports nested spans for each stage."""
+        with self.assertLogs("savedate.tracing", "INFO") as logs:
+            response = self.client.post(reverse("save-date"), self.payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        spans = self.spans(logs)
+        by_name = {}
+        for span in spans:
+            by_name.setdefault(span["name"], span)
+        root = by_name["POST /api/save-date/"]
+        self.assertEqual(response["X-Trace-ID"], root["trace_id"])
+        self.assertEqual({span["trace_id"] for span in spans}, {root["trace_id"]})
+        self.assertIsNone(root["parent_span_id"])
+        self.assertEqual(root["attributes"]["http.status_code"], 201)
+        self.assertEqual(root["attributes"]["http.route"], "api/save-date/")
+
+        is_valid = by_name["SaveDateWriteSerializer.is_valid"]
+        self.assertEqual(by_name["EventTimeSerializer"]["parent_span_id"], is_valid["span_id"])
+        self.assertEqual(by_name["EventTimeSerializer"]["attributes"]["savedate.event_times"], 2)
+        for name in ("parse", "save"):
+            self.assertIn(name, by_name)
+
+        insert = next(
+            span for span in spans
+            if span["name"] == "db.query" and span["attributes"]["db.statement"].startswith('INSERT INTO "savedate_savedate"')
+        )
+        self.assertEqual(insert["parent_span_id"], by_name["save"]["span_id"])
+        self.assertEqual(insert["attributes"]["db.rows_affected"], 1)
+        self.assertLessEqual(insert["duration_ms"], root["duration_ms"])
+
+    @override_settings(SAVEDATE_TRACE_SAMPLE_RATE=1.0)
+    def test_list_span_counts_rows(self):
+        """The list stages record how many rows they handled."""
+        SaveDate.objects.create(**self.payload, owner=self.owner)
+        with self.assertLogs("savedate.tracing", "INFO") as logs:
+            self.client.get(reverse("save-date"))
+
+        render = next(span for span in self.spans(logs) if span["name"] == "render")
+        self.assertEqual(render["attributes"]["savedate.rows"], 1)
+
+    @override_settings(SAVEDATE_TRACE_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_export_nothing(self):
+        """With a zero rate only explicitly sampled requests are traced."""
+        with self.assertNoLogs("savedate.tracing", "INFO"):
+            response = self.client.get(reverse("save-date"))
+        self.assertNotIn("X-Trace-ID", response)
+
+    @override_settings(SAVEDATE_TRACE_SAMPLE_RATE=0.0)
+    def test_sampled_traceparent_continues_the_trace(self):
+        """A caller's sampled traceparent is honoured and becomes the parent."""
+        trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+        with self.assertLogs("savedate.tracing", "INFO") as logs:
+            self.client.get(reverse("save-date"), HTTP_TRACEPARENT=f"00-{trace_id}-{parent_id}-01")
+
+        root = self.spans(logs)[-1]
+        self.assertEqual(root["trace_id"], trace_id)
+        self.assertEqual(root["parent_span_id"], parent_id)
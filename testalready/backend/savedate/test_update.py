@@ -0,0 +1,167 @@
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import SaveDate
+from .rendering import render
+
+
+class SaveDateUpdateAPITest(TestCase):
+    """Test cases for updating SaveDates with optimistic concurrency."""
+
+    def setUp(self):
+        """Set up the client and an invitation."""
+        User = get_user_model()
+        self.ana = User.objects.create_user("ana")
+        self.bia = User.objects.create_user("bia")
+        self.client = APIClient()
+        self.client.force_authenticate(self.ana)
+        self.save_date = SaveDate.objects.create(
+            owner=self.ana,
+            title="Casamento João e Maria",
+            event_subtitle="Uma celebração de amor",
+            event_summary="Venha celebrar conosco este momento especial",
+            event_times=[{"label": "Cerimônia", "time": "14:00"}],
+            event_venue="Salão de Festas",
+            event_address="Rua das Flores, 123",
+            event_city="São Paulo"
+        )
+        self.url = reverse("save-date-detail", args=[self.save_date.pk])
+
+    def test_retrieve_returns_version_etag(self):
+        """GET exposes the current version as ETag."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], '"1"')
+        self.assertEqual(response.data["version"], 1)
+
+    def test_patch_updates_only_submitted_columns(self):
+        """PATCH issues one conditional UPDATE listing only the changed columns."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {"title": "Novo Título"}, format="json", HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], '"2"')
+        self.assertEqual(response.data["data"]["title"], "Novo Título")
+        self.assertEqual(response.data["data"]["event_subtitle"], "Uma celebração de amor")
+
+        updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title" =', updates[0])
+        self.assertIn('"rendered_json" =', updates[0])
+        # The rendered JSON names every field, so look for assignments only.
+        self.assertNotIn('"event_summary" =', updates[0])
+        self.assertIn('"version" =', updates[0].split("WHERE")[1])
+
+    def test_stale_version_is_rejected(self):
+        """A write based on an old version gets 412 and changes nothing."""
+        self.client.patch(self.url, {"title": "Primeira Edição"}, format="json", HTTP_IF_MATCH='"1"')
+        response = self.client.patch(self.url, {"title": "Segunda Edição"}, format="json", HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.save_date.refresh_from_db()
+        self.assertEqual(self.save_date.title, "Primeira Edição")
+        self.assertEqual(self.save_date.version, 2)
+
+    def test_if_match_is_required(self):
+        """Updates without If-Match are refused with 428."""
+        response = self.client.patch(self.url, {"title": "Novo Título"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_428_PRECONDITION_REQUIRED)
+
+    def test_put_replaces_the_invitation(self):
+        """PUT requires every field and resets omitted optional ones."""
+        payload = {
+            "title": "Evento Substituído",
+            "event_summary": "Uma nova descrição com mais de 10 caracteres",
+            "event_times": [{"label": "Festa", "time": "20:00"}],
+            "event_venue": "Outro Salão",
+            "event_address": "Outra Rua, 456",
+            "event_city": "Rio de Janeiro"
+        }
+        response = self.client.put(self.url, payload, format="json", HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["data"]["event_subtitle"])
+        self.assertEqual(response.data["data"]["event_times"], payload["event_times"])
+
+        incomplete = self.client.put(self.url, {"title": "Só Título"}, format="json", HTTP_IF_MATCH='"2"')
+        self.assertEqual(incomplete.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_data_and_unknown_id(self):
+        """Validation errors give 400; unknown ids give 404."""
+        invalid = self.client.patch(self.url, {"title": "AB"}, format="json", HTTP_IF_MATCH='"1"')
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("title", invalid.data)
+
+        missing_url = reverse("save-date-detail", args=[uuid.uuid4()])
+        missing = self.client.patch(missing_url, {"title": "Novo Título"}, format="json", HTTP_IF_MATCH='"1"')
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_patch_keeps_rendering_identical_to_serializer(self):
+        """The JSON patched in the UPDATE matches a fresh rendering byte for byte."""
+        changes = {
+            "title": 'Aspas " e barra \\ e \u2028 linha',
+            "event_subtitle": None,
+            "event_times": [{"label": "Festa\n", "time": "21:30"}],
+            "event_city": "Olinda",
+        }
+        response = self.client.patch(self.url, changes, format="json", HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.save_date.refresh_from_db()
+        self.assertEqual(self.save_date.version, 2)
+        self.assertEqual(self.save_date.city_key, "olinda")
+        self.assertEqual(self.save_date.rendered_json, render(self.save_date))
+
+    def test_fallback_without_json_set_renders_after_the_update(self):
+        """Without in-place patching the update still bumps the version and re-renders the row."""
+        with mock.patch("savedate.updates.patches_in_place", return_value=False):
+            response = self.client.patch(
+                self.url, {"title": "Novo Título", "event_city": "Olinda"}, format="json", HTTP_IF_MATCH='"1"'
+            )
+            stale = self.client.patch(self.url, {"title": "Outro"}, format="json", HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["title"], "Novo Título")
+        self.assertEqual(stale.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.save_date.refresh_from_db()
+        self.assertEqual((self.save_date.version, self.save_date.city_key), (2, "olinda"))
+        self.assertEqual(self.save_date.rendered_json, render(self.save_date))
+
+    def test_save_with_update_fields_writes_updated_at(self):
+        """save(update_fields=...) stores the updated_at its rendering shows."""
+        self.save_date.title = "Novo Título"
+        self.save_date.save(update_fields=["title"])
+
+        stored = SaveDate.objects.get(pk=self.save_date.pk)
+        self.assertEqual(stored.updated_at, self.save_date.updated_at)
+        self.assertEqual(stored.rendered_json, render(stored))
+
+    def test_requires_authentication(self):
+        """Anonymous clients can neither read nor update an invitation."""
+        self.client.force_authenticate(None)
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.patch(self.url, {"title": "Novo Título"}, format="json", HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.save_date.refresh_from_db()
+        self.assertEqual(self.save_date.version, 1)
+
+    def test_other_owners_invitation_is_not_found(self):
+        """Another user gets 404 on GET and PATCH, and the row is left alone."""
+        self.client.force_authenticate(self.bia)
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.patch(self.url, {"title": "Título da Bia"}, format="json", HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.save_date.refresh_from_db()
+        self.assertEqual(self.save_date.title, "Casamento João e Maria")
+        self.assertEqual(self.save_date.version, 1)
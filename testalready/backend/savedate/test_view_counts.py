@@ -0,0 +1,122 @@
+import time
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import view_counts
+from .models import SaveDate, ViewCount
+from .view_counts import ViewCounter
+
+
+def create_save_date(owner=None):
+    return SaveDate.objects.create(
+        owner=owner,
+        title="Test Event",
+        event_summary="Test description with more than 10 characters",
+        event_times=[{"label": "Cerimônia", "time": "14:00"}],
+        event_venue="Test Venue",
+        event_address="Test Address",
+        event_city="Recife"
+    )
+
+
+class ViewCountTest(TestCase):
+    """Test cases for buffered invitation view counts."""
+
+    def setUp(self):
+        owner = get_user_model().objects.create_user("ana")
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+        self.guest = APIClient()
+        self.save_date = create_save_date(owner)
+        # Discard views buffered by other tests.
+        view_counts.counter.take()
+
+    def hit(self, pk):
+        return self.guest.post(reverse("save-date-hit", args=[pk]))
+
+    def test_views_are_buffered_until_flushed(self):
+        """A guest's hit only counts in memory; a flush writes the batch."""
+        for _ in range(3):
+            self.assertEqual(self.hit(self.save_date.pk).status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertFalse(ViewCount.objects.exists())
+        self.assertEqual(view_counts.counter.flush(), 1)
+        self.assertEqual(ViewCount.objects.get(save_date_id=self.save_date.pk).views, 3)
+
+    def test_flushes_add_to_existing_counts(self):
+        """Each flush adds its views to the stored count in one upsert."""
+        other = create_save_date()
+        counter = ViewCounter()
+        counter.increment(self.save_date.pk, 2)
+        counter.flush()
+        counter.increment(self.save_date.pk, 5)
+        counter.increment(other.pk)
+
+        with self.assertNumQueries(3):  # SAVEPOINT, the batched upsert, RELEASE
+            counter.flush()
+
+        self.assertEqual(ViewCount.objects.get(save_date_id=self.save_date.pk).views, 7)
+        self.assertEqual(ViewCount.objects.get(save_date_id=other.pk).views, 1)
+        self.assertEqual(counter.flush(), 0)
+
+    def test_failed_flush_keeps_views(self):
+        """Views are put back for the next flush when the write fails."""
+        counter = ViewCounter()
+        counter.increment(self.save_date.pk, 4)
+        with mock.patch.object(view_counts, "write", side_effect=DatabaseError("locked")):
+            with self.assertLogs("savedate.view_counts", "ERROR"):
+                counter.flush()
+
+        counter.flush()
+        self.assertEqual(ViewCount.objects.get(save_date_id=self.save_date.pk).views, 4)
+
+    def test_endpoint_returns_flushed_views(self):
+        """The views endpoint reports the stored count, zero before any flush."""
+        url = reverse("save-date-views", args=[self.save_date.pk])
+        self.assertEqual(self.client.get(url).data, {"save_date_id": str(self.save_date.pk), "views": 0})
+
+        self.hit(self.save_date.pk)
+        view_counts.counter.flush()
+        self.assertEqual(self.client.get(url).data["views"], 1)
+
+    def test_owner_reads_are_not_views(self):
+        """The owner opening their invitation through the API is not counted."""
+        self.client.get(reverse("save-date-detail", args=[self.save_date.pk]))
+        self.assertEqual(view_counts.counter.take(), {})
+
+    def test_hits_of_unknown_invitations_are_ignored(self):
+        self.assertEqual(self.hit(uuid.uuid4()).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(view_counts.counter.take(), {})
+
+    def test_endpoint_unknown_invitation(self):
+        """Counts of unknown invitations are 404."""
+        response = self.client.get(reverse("save-date-views", args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ViewCounterThreadTest(TransactionTestCase):
+    """Test cases for the background flusher."""
+
+    def test_flushes_periodically_and_on_stop(self):
+        """The flusher writes every interval, and stopping flushes the rest."""
+        save_date = create_save_date()
+        counter = ViewCounter(interval=0.05)
+        counter.start()
+        self.addCleanup(counter.stop)
+        counter.increment(save_date.pk)
+
+        deadline = time.monotonic() + 5
+        while not ViewCount.objects.exists() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(ViewCount.objects.get().views, 1)
+
+        counter.increment(save_date.pk, 2)
+        counter.stop()
+        self.assertEqual(ViewCount.objects.get().views, 3)
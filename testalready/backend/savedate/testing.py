@@ -0,0 +1,55 @@
+"""
+Test helpers shared by the savedate test suite.
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+def _format_queries(context):
+    return "\n".join(f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, start=1))
+
+
+class QueryBudgetMixin:
+    """
+    Assertions on how many SQL statements a block runs, for ``TestCase``.
+
+    ``assertMaxQueries`` caps one call; ``assertQueriesDoNotScale`` repeats a
+    call at several table sizes and fails if the count changes, which is how
+    an N+1 shows up.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        if len(context) > budget:
+            self.fail(f"{len(context)} queries executed, the budget is {budget}:\n{_format_queries(context)}")
+
+    def assertQueriesDoNotScale(self, func, add_rows, sizes=(1, 10, 50), budget=None, using=DEFAULT_DB_ALIAS):
+        """
+        Call ``add_rows(n)`` to grow the data to each of ``sizes`` rows, then
+        ``func()``; every call must run the same number of queries (and at
+        most ``budget``, if given). Returns the query count.
+
+        ``func`` runs once unmeasured first, so per-process caches such as
+        content types are already filled.
+        """
+        counts, current = {}, 0
+        for size in sizes:
+            add_rows(size - current)
+            current = size
+            if not counts:
+                func()
+            with CaptureQueriesContext(connections[using]) as context:
+                func()
+            counts[size] = context
+        lengths = {size: len(context) for size, context in counts.items()}
+        if len(set(lengths.values())) > 1:
+            largest = counts[sizes[-1]]
+            self.fail(f"Query count grows with the rows {lengths}; at {sizes[-1]} rows:\n{_format_queries(largest)}")
+        count = lengths[sizes[0]]
+        if budget is not None and count > budget:
+            self.fail(f"{count} queries executed, the budget is {budget}:\n{_format_queries(counts[sizes[0]])}")
+        return count
@@ -0,0 +1,52 @@
+"""
+Tombstones of invitations that left the hot table, deleted or archived.
+
+The change feed serves them so clients drop those ids. A ``post_delete``
+receiver leaves one per deleted row; the archiver deletes its batches inside
+``suspended()`` and writes their tombstones with one ``bulk_create`` instead.
+
+Tombstones are kept for ``SAVEDATE_TOMBSTONE_RETENTION_DAYS`` and then
+deleted by ``manage.py prune_tombstones``. A feed cursor older than that may
+have missed deletions, so the feed answers it with ``reset``: the client
+drops what it holds and reads the feed again from the start.
+"""
+import contextvars
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SaveDateTombstone
+
+_suspended = contextvars.ContextVar("savedate_tombstones_suspended", default=False)
+
+
+@contextmanager
+def suspended():
+    """Leave no tombstone for rows deleted inside the block; the caller writes them."""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def is_suspended():
+    return _suspended.get()
+
+
+def leave(rows, using):
+    """Write tombstones for ``(save_date_id, owner_id)`` pairs in one statement."""
+    now = timezone.now()
+    SaveDateTombstone.objects.using(using).bulk_create(
+        [SaveDateTombstone(save_date_id=pk, owner_id=owner_id, deleted_at=now) for pk, owner_id in rows],
+        update_conflicts=True,
+        unique_fields=["save_date_id"],
+        update_fields=["owner", "deleted_at"],
+    )
+
+
+def retained_since():
+    """The oldest deletion time still covered by tombstones."""
+    return timezone.now() - timedelta(days=getattr(settings, "SAVEDATE_TOMBSTONE_RETENTION_DAYS", 30))
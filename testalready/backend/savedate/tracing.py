@@ -0,0 +1,175 @@
+"""
+Request tracing, modelled on OpenTelemetry spans.
+
+``TracingMiddleware`` starts a root span for a sampled request: a fraction
+``SAVEDATE_TRACE_SAMPLE_RATE`` of requests, plus every request whose W3C
+``traceparent`` header has the sampled flag (which also continues the
+caller's trace). Code marks stages with ``span(name, attributes)`` and every
+SQL statement becomes a ``db.query`` child span; outside a sampled trace
+these are no-ops.
+
+When the root span ends, the trace's spans are exported as JSON lines to the
+``savedate.tracing`` logger, which ``LOGGING`` sends to ``traces.jsonl``
+through a background queue.
+"""
+import contextvars
+import json
+import logging
+import random
+import re
+import secrets
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+exporter = logging.getLogger("savedate.tracing")
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current = contextvars.ContextVar("savedate_current_span", default=None)
+
+
+class Span:
+    def __init__(self, name, trace_id, parent_id=None, attributes=None, trace=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = "UNSET"
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self.duration_ns = None
+        # Finished spans of the whole trace, exported with the root.
+        self.trace = trace if trace is not None else []
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self):
+        self.duration_ns = time.perf_counter_ns() - self._started
+        self.trace.append(self)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.start_ns + self.duration_ns,
+            "duration_ms": round(self.duration_ns / 1e6, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+def current_span():
+    return _current.get()
+
+
+@contextmanager
+def _activate(span_):
+    token = _current.set(span_)
+    try:
+        yield span_
+    except BaseException as exc:
+        span_.status = "ERROR"
+        span_.set_attribute("exception.type", type(exc).__name__)
+        raise
+    finally:
+        span_.end()
+        _current.reset(token)
+
+
+@contextmanager
+def span(name, attributes=None):
+    """A child of the current span; yields ``None`` when not tracing."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    with _activate(Span(name, parent.trace_id, parent.span_id, attributes, parent.trace)) as child:
+        yield child
+
+
+@contextmanager
+def start_trace(name, attributes=None, traceparent=None):
+    """
+    A root span if this trace is sampled, else ``None``. Exports the trace
+    when the block exits.
+    """
+    match = TRACEPARENT.match(traceparent or "")
+    if match and int(match.group(3), 16) & 1:
+        trace_id, parent_id = match.group(1), match.group(2)
+    elif random.random() < getattr(settings, "SAVEDATE_TRACE_SAMPLE_RATE", 0.0):
+        trace_id, parent_id = secrets.token_hex(16), None
+    else:
+        yield None
+        return
+
+    root = Span(name, trace_id, parent_id, attributes)
+    try:
+        with _activate(root):
+            yield root
+    finally:
+        export(root.trace)
+
+
+def export(spans):
+    for finished in spans:
+        exporter.info(json.dumps(finished.to_dict(), ensure_ascii=False, default=str))
+
+
+def trace_queries(execute, sql, params, many, context):
+    """Execute wrapper turning each statement of a sampled trace into a span."""
+    if _current.get() is None:
+        return execute(sql, params, many, context)
+    connection = context["connection"]
+    attributes = {"db.system": connection.vendor, "db.name": connection.alias, "db.statement": sql}
+    with span("db.query", attributes) as query:
+        result = execute(sql, params, many, context)
+        query.set_attribute("db.rows_affected", context["cursor"].rowcount)
+        return result
+
+
+def install(sender, connection, **kwargs):
+    """``connection_created`` receiver adding the wrapper once per connection."""
+    if trace_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(trace_queries)
+
+
+class TracingMiddleware:
+    """
+    Trace sampled requests from the first middleware to the response.
+
+    Disabled when ``SAVEDATE_TRACE_SAMPLE_RATE`` is ``None``.
+    """
+
+    def __init__(self, get_response):
+        if getattr(settings, "SAVEDATE_TRACE_SAMPLE_RATE", None) is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        attributes = {"http.method": request.method, "http.target": request.path}
+        request_id = getattr(request, "request_id", None)
+        if request_id:
+            attributes["savedate.request_id"] = request_id
+        with start_trace(f"{request.method} {request.path}", attributes, request.headers.get("traceparent")) as root:
+            response = self.get_response(request)
+            if root is not None:
+                root.set_attribute("http.status_code", response.status_code)
+                if response.status_code >= 500:
+                    root.status = "ERROR"
+                response["X-Trace-ID"] = root.trace_id
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        root = _current.get()
+        match = request.resolver_match
+        if root is not None and match is not None:
+            root.name = f"{request.method} /{match.route}"
+            root.set_attribute("http.route", match.route)
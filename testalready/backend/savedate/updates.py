@@ -0,0 +1,142 @@
+"""
+Versioned updates of SaveDate rows.
+
+:func:`update` changes one invitation with a single conditional statement::
+
+    UPDATE savedate_savedate
+       SET <changed columns>, version = version + 1, updated_at = %s,
+           rendered_json = json_set(rendered_json, '$.<field>', json(%s), ...)
+     WHERE id = %s AND version = %s
+    RETURNING rendered_json
+
+The stored rendering is patched in place (SQLite's ``json_set``) with each
+changed field rendered exactly as ``SaveDateReadSerializer`` and
+``JSONRenderer`` would, so the row is never read and re-rendered in Python
+and no other write can land between a read and the write. A writer that
+lost the race updates nothing.
+
+That needs SQLite 3.38 or later (``json_set`` and ``RETURNING``). Elsewhere
+the same conditional UPDATE runs without the patch, and the row is then read
+back and rendered in Python within the same transaction.
+
+The row is only read first when ``event_city`` changes, to move the
+invitation between cities in the stats; that read is pinned to the same
+version as the update, so both see the same row.
+"""
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from . import snapshots, stats
+from .models import SaveDate, normalize_key
+from .rendering import render
+from .serializers import SaveDateReadSerializer
+from .sharding import shard_for
+
+_renderer = JSONRenderer()
+
+# json_set is built into SQLite from 3.38 on, RETURNING from 3.35.
+IN_PLACE_SQLITE_VERSION = (3, 38, 0)
+
+
+def patches_in_place(connection):
+    """Whether the rendering can be patched by the UPDATE itself on ``connection``."""
+    return connection.vendor == "sqlite" and connection.Database.sqlite_version_info >= IN_PLACE_SQLITE_VERSION
+
+
+def _rendered(field, value):
+    if value is None:
+        # JSONRenderer renders None as an empty body.
+        return "null"
+    return _renderer.render(field.to_representation(value)).decode()
+
+
+def update(pk, changes, expected_version, owner=None):
+    """
+    Apply ``changes`` (field name -> value) to the SaveDate ``pk`` if it is
+    still at ``expected_version`` and, when given, belongs to ``owner``.
+
+    Returns the row's new ``rendered_json``, or ``None`` if no such row
+    exists. Keeps the city stats in step and schedules the
+    row's snapshot in the same transaction.
+    """
+    changes = dict(changes)
+    if "event_city" in changes:
+        changes["city_key"] = normalize_key(changes["event_city"])
+    db = shard_for(pk)
+    now = timezone.now()
+    rows = SaveDate.objects.using(db).filter(pk=pk, version=expected_version)
+    if owner is not None:
+        rows = rows.filter(owner=owner)
+
+    with transaction.atomic(using=db):
+        previous = None
+        if "event_city" in changes:
+            previous = rows.values_list("event_city", "created_at").first()
+            if previous is None:
+                return None
+        if patches_in_place(connections[db]):
+            rendered = _update_in_place(db, pk, changes, expected_version, owner, now)
+        else:
+            rendered = _update_and_render(rows, db, pk, changes, now)
+        if rendered is None:
+            return None
+        snapshots.schedule(pk, expected_version + 1, db)
+        if previous is not None and previous[0] != changes["event_city"]:
+            day = timezone.localdate(previous[1])
+            stats.record({(previous[0], day): -1, (changes["event_city"], day): 1}, db)
+    return rendered
+
+
+def _update_in_place(db, pk, changes, expected_version, owner, now):
+    connection = connections[db]
+    qn = connection.ops.quote_name
+    meta = SaveDate._meta
+    fields = SaveDateReadSerializer().fields
+
+    version, updated_at, rendered_json = qn("version"), qn("updated_at"), qn("rendered_json")
+    assignments, params = [], []
+    patches, patch_params = [], []
+    for name, value in changes.items():
+        field = meta.get_field(name)
+        assignments.append(f"{qn(field.column)} = %s")
+        # A foreign key's column holds the related object's pk.
+        column_value = value.pk if field.is_relation and value is not None else value
+        params.append(field.get_db_prep_save(column_value, connection))
+        if name in fields:
+            patches.append("%s, json(%s)")
+            patch_params += [f"$.{name}", _rendered(fields[name], value)]
+    patches += [f"'$.version', {version} + 1", "'$.updated_at', json(%s)"]
+    patch_params.append(_rendered(fields["updated_at"], now))
+    assignments += [
+        f"{version} = {version} + 1",
+        f"{updated_at} = %s",
+        f"{rendered_json} = json_set({rendered_json}, {', '.join(patches)})",
+    ]
+    params += [meta.get_field("updated_at").get_db_prep_save(now, connection), *patch_params]
+    sql = (
+        f"UPDATE {qn(meta.db_table)} SET {', '.join(assignments)} "
+        f"WHERE {qn(meta.pk.column)} = %s AND {version} = %s"
+    )
+    params += [meta.pk.get_db_prep_save(pk, connection), expected_version]
+    if owner is not None:
+        sql += f" AND {qn(meta.get_field('owner').column)} = %s"
+        params.append(owner.pk)
+    sql += f" RETURNING {rendered_json}"
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _update_and_render(rows, db, pk, changes, now):
+    # Any other database: the same conditional UPDATE, then the row is read
+    # back and rendered in Python, still inside the caller's transaction.
+    if not rows.update(**changes, version=F("version") + 1, updated_at=now):
+        return None
+    save_dates = SaveDate.objects.using(db)
+    rendered = render(save_dates.get(pk=pk))
+    save_dates.filter(pk=pk).update(rendered_json=rendered)
+    return rendered
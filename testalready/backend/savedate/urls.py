@@ -1,6 +1,28 @@
 from django.urls import path
-from .views import SaveDateListCreateView
+from rest_framework.authtoken.views import obtain_auth_token
+from .views import (
+    ArchivedSaveDateDetailView,
+    ArchivedSaveDateListView,
+    SaveDateBatchView,
+    SaveDateChangeFeedView,
+    SaveDateDetailView,
+    SaveDateHitView,
+    SaveDateListCreateView,
+    SaveDateStatsView,
+    SaveDateViewCountView,
+    save_date_events,
+)
 
 urlpatterns = [
+    path("token/", obtain_auth_token, name="api-token"),
     path("save-date/", SaveDateListCreateView.as_view(), name="save-date"),
+    path("save-date/<uuid:pk>/", SaveDateDetailView.as_view(), name="save-date-detail"),
+    path("save-date/<uuid:pk>/hit/", SaveDateHitView.as_view(), name="save-date-hit"),
+    path("save-date/<uuid:pk>/views/", SaveDateViewCountView.as_view(), name="save-date-views"),
+    path("save-date/batch/", SaveDateBatchView.as_view(), name="save-date-batch"),
+    path("save-date/changes/", SaveDateChangeFeedView.as_view(), name="save-date-changes"),
+    path("save-date/events/", save_date_events, name="save-date-events"),
+    path("save-date/stats/", SaveDateStatsView.as_view(), name="save-date-stats"),
+    path("save-date/archive/", ArchivedSaveDateListView.as_view(), name="save-date-archive"),
+    path("save-date/archive/<uuid:pk>/", ArchivedSaveDateDetailView.as_view(), name="save-date-archive-detail"),
 ]
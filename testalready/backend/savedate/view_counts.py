@@ -0,0 +1,131 @@
+"""
+Buffered invitation view counters.
+
+Counting a view with an ``UPDATE`` per request would queue every guest behind
+SQLite's write lock. Instead ``record`` only adds to an in-memory counter of
+the worker process, and a background thread flushes it every
+``SAVEDATE_VIEW_FLUSH_INTERVAL`` seconds: one transaction per shard, with a
+single batched ``INSERT ... ON CONFLICT DO UPDATE SET views = views + ...``.
+
+A crashed worker loses at most the views since its last flush; a clean exit
+flushes what is left. Counts read through the API lag by up to one interval.
+An interval of ``None`` turns view counting off.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from .models import ViewCount
+from .sharding import shard_for
+
+logger = logging.getLogger(__name__)
+
+
+def _upsert_sql(connection):
+    quote = connection.ops.quote_name
+    table = quote(ViewCount._meta.db_table)
+    return (
+        f"INSERT INTO {table} ({quote('save_date_id')}, {quote('views')}, {quote('updated_at')}) "
+        f"VALUES (%s, %s, %s) "
+        f"ON CONFLICT ({quote('save_date_id')}) DO UPDATE SET "
+        f"{quote('views')} = {table}.{quote('views')} + excluded.{quote('views')}, "
+        f"{quote('updated_at')} = excluded.{quote('updated_at')}"
+    )
+
+
+def write(counts, using):
+    """Add ``{save_date_id: views}`` to the counters of the database ``using``."""
+    connection = connections[using]
+    pk_field = ViewCount._meta.get_field("save_date_id")
+    updated_at = ViewCount._meta.get_field("updated_at").get_db_prep_value(timezone.now(), connection)
+    rows = [(pk_field.get_db_prep_value(pk, connection), views, updated_at) for pk, views in counts.items()]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.executemany(_upsert_sql(connection), rows)
+
+
+class ViewCounter:
+    def __init__(self, interval=5.0):
+        self.interval = interval
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def increment(self, pk, views=1):
+        with self._lock:
+            self._pending[pk] += views
+
+    def take(self):
+        """Remove and return the views counted since the last flush."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        return pending
+
+    def flush(self):
+        """Write the pending views; returns how many invitations were updated."""
+        with self._flush_lock:
+            pending = self.take()
+            by_shard = defaultdict(dict)
+            for pk, views in pending.items():
+                by_shard[shard_for(pk)][pk] = views
+            for alias, counts in by_shard.items():
+                try:
+                    write(counts, alias)
+                except Exception:
+                    # Keep them for the next flush rather than lose them.
+                    logger.exception("Failed to flush %d view counts to %s", len(counts), alias)
+                    with self._lock:
+                        self._pending.update(counts)
+            return len(pending)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="savedate-view-counts", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write what it has not flushed yet."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.flush()
+            close_old_connections()
+
+    def _reset_in_child(self):
+        # The parent flushes its own pending views, and its thread is gone.
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+
+counter = ViewCounter(getattr(settings, "SAVEDATE_VIEW_FLUSH_INTERVAL", 5.0))
+atexit.register(counter.stop)
+os.register_at_fork(after_in_child=counter._reset_in_child)
+
+
+def record(pk):
+    """Count one view of the invitation ``pk``."""
+    if counter.interval is None:
+        return
+    counter.increment(pk)
+    # Like the task runner, the flusher starts once the caller's transaction
+    # (if any) has committed, so it never runs under TestCase.
+    transaction.on_commit(counter.start)
@@ -1,40 +1,140 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
-from rest_framework.exceptions import ValidationError
-from .models import SaveDate
-from .serializers import SaveDateWriteSerializer, SaveDateReadSerializer
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from .models import (
+    ArchivedSaveDate, CityDailyStats, CityStats, SaveDate, SaveDateTombstone, ViewCount, normalize_key,
+)
+from . import updates, view_counts
+from .serializers import SaveDateWriteSerializer, SaveDateReadSerializer, ArchivedSaveDateReadSerializer
+from .rendering import PrerenderedResponse, render_list
+from .pagination import ArchiveCursorPagination, InvalidCursor, decode_cursor, encode_cursor
+from .events import OVERFLOW, format_sse, get_broker, publish_created
+from .tasks import enqueue
+from .sharding import for_pk, merged, on_shards, shard_for
+from .snapshots import render_html
+from .tombstones import retained_since
+from . import memory_profile, tracing
+import asyncio
+import heapq
+import json
 import logging
-from django.db import IntegrityError, DatabaseError
+import uuid
+from collections import Counter, defaultdict
+from itertools import islice
+from django.conf import settings
+from django.db import IntegrityError, DatabaseError, transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from datetime import timedelta
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from asgiref.sync import sync_to_async
 
 logger = logging.getLogger(__name__)
 
 
 class SaveDateListCreateView(generics.ListCreateAPIView):
     """
-    Handles listing and creating SaveDate invitations.
+    Handles listing and creating the requesting user's SaveDate invitations.
 
-    - GET: Returns all SaveDate invitations
-    - POST: Creates a new SaveDate invitation
+    - GET: Returns up to ``limit`` of the user's SaveDate invitations, newest
+      first, optionally only those in ``city`` (ignoring case and accents).
+      When more follow, a ``Link: <...>; rel="next"`` header carries the
+      ``cursor`` of the next page.
+    - POST: Creates a new SaveDate invitation owned by the user
+
+    The listing is a range scan of the ``(owner, created_at, id)`` index, or of
+    ``(owner, city_key, created_at, id)`` when filtered by city, that stops
+    after ``limit + 1`` rows on each shard. The list joins the rows' stored
+    ``rendered_json`` instead of serializing them. The id is chosen before
+    the insert so the row, its stats and its tasks are written in one
+    transaction on the row's shard.
     """
-    permission_classes = [AllowAny]
+    permission_classes = [IsAuthenticated]
     queryset = SaveDate.objects.all()
+    ordering = ("-created_at", "-id")
+    default_limit = 100
+    max_limit = 1000
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(owner=self.request.user)
+        city = self.request.query_params.get("city")
+        if city:
+            queryset = queryset.filter(city_key=normalize_key(city))
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method == "POST":
             return SaveDateWriteSerializer
         return SaveDateReadSerializer
 
+    def list(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.max_limit:
+            return Response({
+                "status": "error",
+                "message": f"limit must be an integer between 1 and {self.max_limit}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        with tracing.span("query") as span, memory_profile.stage("query"):
+            queryset = self.filter_queryset(self.get_queryset()).only("id", "created_at", "rendered_json")
+            cursor = request.query_params.get("cursor")
+            if cursor:
+                try:
+                    position, pk = decode_cursor(cursor)
+                except InvalidCursor as exc:
+                    return Response({
+                        "status": "error",
+                        "message": str(exc)
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(Q(created_at__lt=position) | Q(created_at=position, pk__lt=pk))
+            save_dates = merged(queryset, self.ordering, limit + 1)
+            has_more = len(save_dates) > limit
+            save_dates = save_dates[:limit]
+            if span:
+                span.set_attribute("savedate.rows", len(save_dates))
+        with tracing.span("render", {"savedate.rows": len(save_dates)}), memory_profile.stage("render"):
+            content = render_list(save_date.rendered_json for save_date in save_dates)
+
+        headers = {}
+        if has_more:
+            last = save_dates[-1]
+            params = request.query_params.copy()
+            params["cursor"] = encode_cursor(last.created_at, last.pk)
+            headers["Link"] = f'<{request.build_absolute_uri(request.path)}?{params.urlencode()}>; rel="next"'
+        return PrerenderedResponse(content, headers=headers)
+
     def create(self, request, *args, **kwargs):
         try:
-            serializer = self.get_serializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
-            save_date = serializer.save()
+            with tracing.span("parse", {"http.request_content_length": request.META.get("CONTENT_LENGTH")}):
+                payload = request.data
+            serializer = self.get_serializer(data=payload)
+            with tracing.span("SaveDateWriteSerializer.is_valid"):
+                serializer.is_valid(raise_exception=True)
+            pk = uuid.uuid4()
+            db = shard_for(pk)
+            with tracing.span("save", {"savedate.shard": db}), transaction.atomic(using=db):
+                save_date = serializer.save(id=pk, owner=request.user)
+                # Side effects run on the background runner once committed.
+                enqueue(
+                    "savedate.audit_created",
+                    using=db,
+                    save_date_id=str(save_date.pk),
+                    title=save_date.title,
+                    event_city=save_date.event_city,
+                )
 
-            read_serializer = SaveDateReadSerializer(save_date)
+            data = json.loads(save_date.rendered_json)
+            transaction.on_commit(lambda: publish_created(data, request.user.pk))
             return Response({
                 "status": "success",
-                "data": read_serializer.data,
+                "data": data,
                 "message": "Save Date successfully created! Now you can start sharing it."
             }, status=status.HTTP_201_CREATED)
 
@@ -56,3 +156,436 @@ class SaveDateListCreateView(generics.ListCreateAPIView):
                 "status": "error",
                 "message": f"An unexpected error occurred: {str(e)}"
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SaveDateDetailView(generics.RetrieveUpdateAPIView):
+    """
+    Retrieves and updates a single SaveDate invitation of the requesting user.
+
+    - GET: Returns the invitation with its version as the ``ETag`` header
+    - PUT/PATCH: Updates the invitation if ``If-Match`` carries the current version
+
+    Other users' invitations answer 404, as if they did not exist. GET sends
+    the stored ``rendered_json`` as is. The update is one conditional
+    ``UPDATE ... WHERE id = %s AND version = %s`` touching only the submitted
+    columns and patching the stored JSON in place (see ``savedate.updates``),
+    so concurrent writers never need row locks: a writer that lost the race
+    updates nothing and gets 412.
+    """
+    permission_classes = [IsAuthenticated]
+    queryset = SaveDate.objects.all()
+
+    def get_serializer_class(self):
+        if self.request.method in ("PUT", "PATCH"):
+            return SaveDateWriteSerializer
+        return SaveDateReadSerializer
+
+    def get_queryset(self):
+        queryset = for_pk(super().get_queryset(), self.kwargs["pk"]).filter(owner=self.request.user)
+        return queryset.only("id", "version", "rendered_json")
+
+    def retrieve(self, request, *args, **kwargs):
+        save_date = self.get_object()
+        return PrerenderedResponse(save_date.rendered_json, headers={"ETag": f'"{save_date.version}"'})
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        if_match = request.headers.get("If-Match")
+        if not if_match:
+            return Response({
+                "status": "error",
+                "message": "The If-Match header with the current version is required."
+            }, status=status.HTTP_428_PRECONDITION_REQUIRED)
+        try:
+            expected_version = int(if_match.removeprefix("W/").strip('"'))
+        except ValueError:
+            return Response({
+                "status": "error",
+                "message": "The If-Match header must carry a version number."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        if not partial:
+            # PUT replaces the invitation: omitted optional fields are reset.
+            for name, field in serializer.fields.items():
+                if not field.read_only and name not in changes:
+                    changes[name] = SaveDate._meta.get_field(name).get_default()
+        try:
+            rendered = updates.update(kwargs["pk"], changes, expected_version, owner=request.user)
+            if rendered is None:
+                # Other users' invitations are reported as missing, not as conflicts.
+                if not self.get_queryset().filter(pk=kwargs["pk"]).exists():
+                    return Response({
+                        "status": "error",
+                        "message": "Save Date not found."
+                    }, status=status.HTTP_404_NOT_FOUND)
+                return Response({
+                    "status": "error",
+                    "message": "The Save Date was modified by someone else. Reload it and try again."
+                }, status=status.HTTP_412_PRECONDITION_FAILED)
+
+        except IntegrityError:
+            return Response({
+                "status": "error",
+                "message": "The update violates database constraints."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        except DatabaseError:
+            return Response({
+                "status": "error",
+                "message": "A database error occurred while updating the Save Date."
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        data = json.loads(rendered)
+        return Response({
+            "status": "success",
+            "data": data,
+            "message": "Save Date successfully updated."
+        }, headers={"ETag": f'"{data["version"]}"'})
+
+
+class SaveDateBatchView(generics.GenericAPIView):
+    """
+    Fetches many SaveDate invitations by id in one request.
+
+    - GET: ``?ids=<uuid>,<uuid>,...`` (at most ``max_ids``) returns the
+      requesting user's invitations in the requested order, plus the ids
+      that do not exist or belong to someone else
+
+    One ``WHERE id IN (...)`` primary-key lookup per shard holding any of the
+    ids; the bodies are the rows' stored ``rendered_json``.
+    """
+    permission_classes = [IsAuthenticated]
+    queryset = SaveDate.objects.all()
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user)
+
+    max_ids = 100
+
+    def get(self, request, *args, **kwargs):
+        raw = [value.strip() for value in request.query_params.get("ids", "").split(",") if value.strip()]
+        if not 1 <= len(raw) <= self.max_ids:
+            return Response({
+                "status": "error",
+                "message": f"ids must list between 1 and {self.max_ids} comma-separated ids."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Duplicates are answered once, at their first position.
+            ids = list(dict.fromkeys(uuid.UUID(value) for value in raw))
+        except ValueError:
+            return Response({
+                "status": "error",
+                "message": "ids must be valid UUIDs."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        by_shard = defaultdict(list)
+        for pk in ids:
+            by_shard[shard_for(pk)].append(pk)
+        found = {}
+        for shard_ids in by_shard.values():
+            rows = for_pk(self.get_queryset(), shard_ids[0]).filter(pk__in=shard_ids)
+            found.update(rows.values_list("pk", "rendered_json"))
+
+        results = render_list(found[pk] for pk in ids if pk in found)
+        missing = [str(pk) for pk in ids if pk not in found]
+        return PrerenderedResponse(f'{{"results":{results},"missing":{json.dumps(missing)}}}')
+
+
+class SaveDateHitView(generics.GenericAPIView):
+    """
+    Counts a guest's view of a SaveDate invitation.
+
+    - POST: Adds one view (see ``savedate.view_counts``); 404 for unknown
+      invitations
+
+    Guests read the invitation's page, usually a static snapshot that never
+    reaches Django (see ``savedate.snapshots``); the page reports the view
+    here with ``navigator.sendBeacon``. Open to anyone and unauthenticated,
+    so the beacon needs no CSRF token.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    queryset = SaveDate.objects.all()
+
+    def post(self, request, *args, **kwargs):
+        pk = kwargs["pk"]
+        if not for_pk(self.get_queryset(), pk).filter(pk=pk).exists():
+            return Response({
+                "status": "error",
+                "message": "Save Date not found."
+            }, status=status.HTTP_404_NOT_FOUND)
+        view_counts.record(pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@require_safe
+def save_date_page(request, pk):
+    """
+    The guest page of a SaveDate invitation, at ``/i/<id>``.
+
+    The same HTML as the invitation's static snapshot, rendered from its
+    stored ``rendered_json``, for when the snapshot is missing or snapshots
+    are off. The page's beacon counts the view, not this request.
+    """
+    rendered = for_pk(SaveDate.objects.all(), pk).filter(pk=pk).values_list("rendered_json", flat=True).first()
+    if rendered is None:
+        raise Http404("Save Date not found.")
+    return HttpResponse(render_html(json.loads(rendered)))
+
+
+class SaveDateViewCountView(generics.GenericAPIView):
+    """
+    How often a SaveDate invitation was opened.
+
+    - GET: Returns the number of views of one of the requesting user's
+      invitations as of the last flush of the workers' view counters (see
+      ``savedate.view_counts``)
+    """
+    permission_classes = [IsAuthenticated]
+    queryset = SaveDate.objects.all()
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        pk = kwargs["pk"]
+        views = ViewCount.objects.filter(save_date_id=OuterRef("pk")).values("views")
+        count = (
+            for_pk(self.get_queryset(), pk).filter(pk=pk)
+            .annotate(views=Coalesce(Subquery(views), 0))
+            .values_list("views", flat=True)
+            .first()
+        )
+        if count is None:
+            return Response({
+                "status": "error",
+                "message": "Save Date not found."
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response({"save_date_id": str(pk), "views": count})
+
+
+class SaveDateChangeFeedView(generics.GenericAPIView):
+    """
+    Incremental change feed of SaveDate invitations.
+
+    - GET: Returns the requesting user's invitations modified after
+      ``cursor`` and the ids of those deleted or archived since, oldest
+      change first, together with the cursor to use on the next poll.
+
+    The cursor is an opaque ``(timestamp, id)`` position, so each poll is a
+    range scan over the ``(owner, updated_at, id)`` and ``(owner,
+    deleted_at, id)`` indexes of each shard and costs O(changes). Only
+    changes older than ``SAVEDATE_FEED_SAFETY_LAG`` seconds are served, so
+    a transaction still committing behind the cursor is not skipped.
+
+    A cursor older than the tombstone retention is answered from the start
+    with ``reset`` set: the client must drop what it holds first, since
+    deletions it missed are no longer recorded.
+    """
+    permission_classes = [IsAuthenticated]
+    queryset = SaveDate.objects.all()
+    serializer_class = SaveDateReadSerializer
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user)
+
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.max_limit:
+            return Response({
+                "status": "error",
+                "message": f"limit must be an integer between 1 and {self.max_limit}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        cursor = request.query_params.get("cursor")
+        horizon = timezone.now() - timedelta(seconds=getattr(settings, "SAVEDATE_FEED_SAFETY_LAG", 5))
+        queryset = self.get_queryset().filter(updated_at__lt=horizon)
+        tombstones = SaveDateTombstone.objects.filter(owner=request.user, deleted_at__lt=horizon)
+        reset = False
+        if cursor:
+            try:
+                position, pk = decode_cursor(cursor)
+            except InvalidCursor as exc:
+                return Response({
+                    "status": "error",
+                    "message": str(exc)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if position < retained_since():
+                # Tombstones behind this cursor may be pruned: start over.
+                reset, cursor = True, None
+            else:
+                queryset = queryset.filter(Q(updated_at__gt=position) | Q(updated_at=position, pk__gt=pk))
+                tombstones = tombstones.filter(Q(deleted_at__gt=position) | Q(deleted_at=position, pk__gt=pk))
+
+        changes = heapq.merge(
+            ((row.updated_at, row.pk, row) for row in merged(queryset, ("updated_at", "pk"), limit + 1)),
+            ((gone.deleted_at, gone.pk, None) for gone in merged(tombstones, ("deleted_at", "pk"), limit + 1)),
+            key=lambda change: change[:2],
+        )
+        changes = list(islice(changes, limit + 1))
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if changes:
+            next_cursor = encode_cursor(*changes[-1][:2])
+        else:
+            next_cursor = cursor
+
+        return Response({
+            "results": self.get_serializer([row for _, _, row in changes if row is not None], many=True).data,
+            "deleted": [str(pk) for _, pk, row in changes if row is None],
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "reset": reset,
+        })
+
+
+class SaveDateStatsView(generics.GenericAPIView):
+    """
+    Per-city invitation statistics.
+
+    - GET: Returns the all-time total per city and the daily creation counts
+      of the last ``days`` days (optionally for one ``city``)
+
+    Served from the incrementally maintained stats tables, never from a
+    GROUP BY over SaveDate. The tables count every user's invitations, so
+    only staff may read them.
+    """
+    permission_classes = [IsAdminUser]
+    max_days = 366
+
+    def get(self, request, *args, **kwargs):
+        try:
+            days = int(request.query_params.get("days", 30))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= self.max_days:
+            return Response({
+                "status": "error",
+                "message": f"days must be an integer between 1 and {self.max_days}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        since = timezone.localdate() - timedelta(days=days - 1)
+        daily = CityDailyStats.objects.filter(day__gte=since, count__gt=0)
+        city = request.query_params.get("city")
+        if city:
+            daily = daily.filter(event_city=city)
+
+        # Each shard counts its own rows.
+        totals, counts = Counter(), Counter()
+        for shard in on_shards(CityStats.objects.filter(total__gt=0).values_list("event_city", "total")):
+            for event_city, total in shard:
+                totals[event_city] += total
+        for shard in on_shards(daily.values_list("event_city", "day", "count")):
+            for event_city, day, count in shard:
+                counts[(day, event_city)] += count
+
+        return Response({
+            "cities": [
+                {"event_city": event_city, "total": total}
+                for event_city, total in sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+            ],
+            "daily": [
+                {"event_city": event_city, "day": day.isoformat(), "count": count}
+                for (day, event_city), count in sorted(counts.items())
+            ],
+        })
+
+
+class ArchivedSaveDateListView(generics.ListAPIView):
+    """
+    Lists the requesting user's archived SaveDate invitations.
+
+    - GET: Returns archived invitations, newest first, one cursor page at a time
+    """
+    permission_classes = [IsAuthenticated]
+    queryset = ArchivedSaveDate.objects.all()
+    serializer_class = ArchivedSaveDateReadSerializer
+    pagination_class = ArchiveCursorPagination
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user)
+
+
+class ArchivedSaveDateDetailView(generics.RetrieveAPIView):
+    """
+    Retrieves one of the requesting user's archived SaveDate invitations by
+    its original id.
+    """
+    permission_classes = [IsAuthenticated]
+    queryset = ArchivedSaveDate.objects.all()
+    serializer_class = ArchivedSaveDateReadSerializer
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user)
+
+
+async def _authenticated_user(request):
+    """The user of a token or session, or None; this view is not a DRF view."""
+    try:
+        result = await sync_to_async(TokenAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    if result is not None:
+        return result[0]
+    if hasattr(request, "auser"):
+        user = await request.auser()
+        if user.is_authenticated:
+            return user
+    return None
+
+
+async def save_date_events(request):
+    """
+    Server-Sent Events stream of the requesting user's newly created SaveDate
+    invitations.
+
+    Must be served through ASGI (``backend.asgi``). Clients authenticate with
+    a token or a session, and only receive events of their own invitations.
+    They resume after a reconnect by sending the ``Last-Event-ID`` header; a
+    client that falls too far behind is disconnected and catches up the same way.
+    """
+    user = await _authenticated_user(request)
+    if user is None:
+        return JsonResponse({
+            "status": "error",
+            "message": "Authentication credentials were not provided."
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    subscription = get_broker().subscribe(last_event_id, owner=user.pk)
+    heartbeat = getattr(settings, "SAVEDATE_EVENTS_HEARTBEAT", 15)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is OVERFLOW:
+                    break
+                yield format_sse(event)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
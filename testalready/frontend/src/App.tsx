@@ -4,6 +4,8 @@ import { useState } from 'react';
 import axios from 'axios';
 
 import CreateSaveDateForm from './forms/SaveDateForm';
+import LoginForm from './forms/LoginForm';
+import { api, clearToken, getToken } from './lib/api';
 import { SaveDateFormValues, saveDateSchema } from './forms/schemas/SaveDateSchema';
 import { Button } from './components/ui/button';
 import './App.css';
@@ -22,19 +24,29 @@ function App() {
 
   const [loading, setLoading] = useState<boolean>(false);
   const [successMessage, setSuccessMessage] = useState<string | null>(null);
+  const [token, setToken] = useState<string | null>(getToken());
+
+  const logout = () => {
+    clearToken();
+    setToken(null);
+  };
 
   // Función al enviar el formulario
   const onSubmit = async (data: SaveDateFormValues) => {
     setLoading(true);
     
     try {
-      const response = await axios.post('http://127.0.0.1:8000/api/save-date/', data);
+      const response = await api.post('/save-date/', data);
       if(response.status === 201){
         setSuccessMessage(response.data.message); // mostrar mensaje
         console.log('Form submitted successfully:', response.data);
         reset(); // limpia el formulario
       }
     } catch (error) {
+      // Token revoked or expired: log in again
+      if (axios.isAxiosError(error) && error.response?.status === 401) {
+        logout();
+      }
       console.error('Error submitting form:', error);
       // Aquí puedes mostrar una notificación de error
     } finally {
@@ -42,8 +54,18 @@ function App() {
     }
   };
 
+  if (!token) {
+    return <LoginForm onLogin={setToken} />;
+  }
+
   return (
     <section className="w-[70%] mx-auto">
+      <div className="mt-4 flex justify-end">
+        <Button type="button" variant="outline" onClick={logout}>
+          Log out
+        </Button>
+      </div>
+
       {successMessage && (
           <div className="my-4 p-4 bg-green-100 border border-green-300 text-green-800 rounded">
             {successMessage}
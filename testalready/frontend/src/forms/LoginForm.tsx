@@ -0,0 +1,77 @@
+import { useState } from "react";
+import { useForm } from "react-hook-form";
+import { zodResolver } from "@hookform/resolvers/zod";
+import InputField from "@/components/InputField";
+import { Button } from "@/components/ui/button";
+import { login } from "@/lib/api";
+import { LoginFormValues, loginSchema } from "./schemas/LoginSchema";
+
+/**
+ * Props for the LoginForm component.
+ */
+interface LoginFormProps {
+  /** Called with the API token once the user logged in */
+  onLogin: (token: string) => void;
+}
+
+/**
+ * LoginForm
+ *
+ * Logs the user in with their username and password.
+ * - Exchanges them for an API token (stored in localStorage by `login`).
+ * - Shows an error when the credentials are rejected.
+ *
+ * @param onLogin - Called with the token on success
+ */
+const LoginForm = ({ onLogin }: LoginFormProps) => {
+  const {
+    control,
+    handleSubmit,
+    formState: { errors, isSubmitting },
+  } = useForm<LoginFormValues>({
+    resolver: zodResolver(loginSchema),
+    defaultValues: { username: "", password: "" },
+  });
+
+  const [error, setError] = useState<string | null>(null);
+
+  const onSubmit = async ({ username, password }: LoginFormValues) => {
+    setError(null);
+    try {
+      onLogin(await login(username, password));
+    } catch {
+      setError("Invalid username or password.");
+    }
+  };
+
+  return (
+    <form className="space-y-6 max-w-sm mx-auto mt-10" onSubmit={handleSubmit(onSubmit)}>
+      <div className="pb-2 border-b border-gray-200">
+        <h2 className="text-xl font-semibold text-gray-900">Log in</h2>
+        <p className="text-sm text-gray-500 mt-1">Log in to create and manage your invitations.</p>
+      </div>
+
+      {error && (
+        <div className="p-4 bg-red-100 border border-red-300 text-red-800 rounded">{error}</div>
+      )}
+
+      <InputField name="username" control={control} label="Username" autocomplete="username" error={errors.username?.message} />
+      <InputField
+        name="password"
+        control={control}
+        label="Password"
+        type="password"
+        autocomplete="current-password"
+        error={errors.password?.message}
+      />
+
+      <div className="flex justify-end">
+        <Button type="submit" disabled={isSubmitting}>
+          {isSubmitting ? "Logging in..." : "Log in"}
+        </Button>
+      </div>
+    </form>
+  );
+};
+
+export default LoginForm;
@@ -0,0 +1,13 @@
+import { z } from "zod";
+
+/**
+ * loginSchema
+ *
+ * Validation schema for the login form.
+ */
+export const loginSchema = z.object({
+  username: z.string().min(1, "Username is required."),
+  password: z.string().min(1, "Password is required."),
+});
+
+export type LoginFormValues = z.infer<typeof loginSchema>;
@@ -0,0 +1,38 @@
+import axios from "axios";
+
+/** Base URL of the Save the Date API. */
+export const API_URL = "http://127.0.0.1:8000/api";
+
+/** localStorage key holding the user's API token. */
+export const TOKEN_KEY = "savedate_token";
+
+export const getToken = () => localStorage.getItem(TOKEN_KEY);
+
+export const setToken = (token: string) => localStorage.setItem(TOKEN_KEY, token);
+
+export const clearToken = () => localStorage.removeItem(TOKEN_KEY);
+
+/**
+ * Axios instance for the API.
+ * Sends the stored token as `Authorization: Token <key>` on every request.
+ */
+export const api = axios.create({ baseURL: API_URL });
+
+api.interceptors.request.use((config) => {
+  const token = getToken();
+  if (token) {
+    config.headers.Authorization = `Token ${token}`;
+  }
+  return config;
+});
+
+/**
+ * Exchanges a username and password for an API token and stores it.
+ *
+ * @returns The token
+ */
+export async function login(username: string, password: string): Promise<string> {
+  const response = await axios.post(`${API_URL}/token/`, { username, password });
+  setToken(response.data.token);
+  return response.data.token;
+}
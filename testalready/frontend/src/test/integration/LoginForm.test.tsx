@@ -0,0 +1,38 @@
+import { render, screen } from '@testing-library/react'
+import userEvent from '@testing-library/user-event'
+import LoginForm from '@/forms/LoginForm'
+import { login } from '@/lib/api'
+
+vi.mock('@/lib/api', () => ({ login: vi.fn() }))
+
+describe('LoginForm', () => {
+  beforeEach(() => vi.mocked(login).mockReset())
+
+  it('troca usuário e senha por um token', async () => {
+    const user = userEvent.setup()
+    const onLogin = vi.fn()
+    vi.mocked(login).mockResolvedValue('abc123')
+    render(<LoginForm onLogin={onLogin} />)
+
+    await user.type(screen.getByPlaceholderText('Username'), 'ana')
+    await user.type(screen.getByPlaceholderText('Password'), 'segredo')
+    await user.click(screen.getByText('Log in', { selector: 'button' }))
+
+    expect(login).toHaveBeenCalledWith('ana', 'segredo')
+    expect(onLogin).toHaveBeenCalledWith('abc123')
+  })
+
+  it('mostra um erro quando as credenciais são recusadas', async () => {
+    const user = userEvent.setup()
+    const onLogin = vi.fn()
+    vi.mocked(login).mockRejectedValue(new Error('400'))
+    render(<LoginForm onLogin={onLogin} />)
+
+    await user.type(screen.getByPlaceholderText('Username'), 'ana')
+    await user.type(screen.getByPlaceholderText('Password'), 'errada')
+    await user.click(screen.getByText('Log in', { selector: 'button' }))
+
+    expect(await screen.findByText('Invalid username or password.')).toBeInTheDocument()
+    expect(onLogin).not.toHaveBeenCalled()
+  })
+})